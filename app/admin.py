@@ -0,0 +1,21 @@
+# app/admin.py
+from __future__ import annotations
+import hmac
+
+from fastapi import HTTPException, Request
+from app.sharedVars import SharedVars
+
+# header an admin request carries the ADMIN_TOKEN value in
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def require_admin_token(request: Request) -> None:
+    """
+    FastAPI dependency for /admin/* endpoints. Anything but the configured
+    token (or any request at all while ADMIN_TOKEN is unset) gets a 404, so
+    the endpoint doesn't reveal that it exists.
+    """
+    expected = SharedVars().ADMIN_TOKEN
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER, '')
+    if not expected or not hmac.compare_digest(expected.encode(), supplied.encode()):
+        raise HTTPException(status_code=404)
@@ -2,6 +2,7 @@
 from __future__ import annotations
 from typing import Callable, Dict, Optional, Any
 from datetime import datetime
+import inspect
 from nicegui import ui
 
 from .reminder_event import ReminderComponent
@@ -89,8 +90,8 @@ def _clear_error(inp: ui.input) -> None:
 
 def open_edit_dialog(
     event: Optional[Dict[str, Any]],
-    on_save: Callable[[Dict[str, Any]], None],
-    on_delete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_save: Callable[[Dict[str, Any]], Any],
+    on_delete: Optional[Callable[[Dict[str, Any]], Any]] = None,
 ) -> None:
     """Compose Event + Recurrence + Reminders into a single dialog."""
     original = event or {}
@@ -155,12 +156,16 @@ def open_edit_dialog(
             with ui.row().classes(f'{field_w} justify-end q-gutter-sm q-mt-md'):
                 ui.button('Cancel', on_click=dialog.close).props('flat')
                 if event and on_delete:
-                    ui.button(
-                        'Delete',
-                        on_click=lambda: (on_delete(original), dialog.close()),
-                    ).props('flat color=negative')
+                    async def do_delete() -> None:
+                        dialog.close()
+                        # handlers may be async (they write to the DB off the event loop)
+                        result = on_delete(original)
+                        if inspect.isawaitable(result):
+                            await result
 
-                def do_save() -> None:
+                    ui.button('Delete', on_click=do_delete).props('flat color=negative')
+
+                async def do_save() -> None:
                     ok = True
 
                     # Field-level validation first
@@ -257,6 +262,7 @@ def open_edit_dialog(
                             recurring_end_option_index = 0
 
                     updated = {
+                        'id': original.get('id'),                           # DB event id (None when new)
                         'title': (title_inp.value or '').strip(),
 
                         # store dates back in both legacy + new forms
@@ -285,8 +291,10 @@ def open_edit_dialog(
                         'recurring_end_count': recurring_end_count,     # int or None
                     }
 
-                    on_save(updated)
                     dialog.close()
+                    result = on_save(updated)
+                    if inspect.isawaitable(result):
+                        await result
 
                 ui.button('Save', on_click=do_save).props('color=primary')
 
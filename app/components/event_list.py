@@ -0,0 +1,249 @@
+# app/components/event_list.py
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from nicegui import ui
+
+# lists with at least this many events switch from the card grid to the virtual list
+VIRTUAL_LIST_MIN_EVENTS = 100
+
+# virtual list geometry (px); its cards have a fixed height so a scroll
+# position maps straight to a row index
+VIRTUAL_CARD_HEIGHT = 144
+VIRTUAL_ROW_HEIGHT = 160
+VIRTUAL_VIEWPORT_HEIGHT = 640
+# cards kept bound above and below the viewport so fast scrolling doesn't show gaps
+VIRTUAL_OVERSCAN = 3
+# seconds between scroll events sent by the browser
+VIRTUAL_SCROLL_THROTTLE = 0.05
+
+CARD_CLASSES = (
+    'w-full max-w-[95%] md:max-w-[90%] rounded-xl bg-gray-200 shadow-sm q-pa-md '
+    'hover:shadow-md transition-all duration-200 z-0 box-border'
+)
+GRID_CLASSES = 'grid grid-cols-1 md:grid-cols-2 gap-6 justify-items-center w-full'
+
+
+def _date_badge(iso_date: str) -> str:
+    d = datetime.fromisoformat(iso_date).date()
+    return f"{d.strftime('%b').upper()} {d.day}"
+
+
+class EventCard:
+    """
+    One event card. The elements are built once; bind() points the card at
+    another event, so the virtual list can recycle it while scrolling.
+    Edit/delete act on whichever event is bound when clicked.
+    """
+
+    def __init__(self, on_edit: Callable[[Dict[str, Any]], Any], on_delete: Callable[[Dict[str, Any]], Any],
+                 time_separator: str = '→', fixed_height: bool = False):
+        self.evt: Optional[Dict[str, Any]] = None
+        self.time_separator = time_separator
+
+        with ui.card().classes(CARD_CLASSES) as self.card:
+            if fixed_height:
+                self.card.style(f'height: {VIRTUAL_CARD_HEIGHT}px')
+            with ui.row().classes('items-start justify-between w-full min-w-0 no-wrap'):
+                self.title = ui.label().classes(
+                    'text-body1 text-weight-medium truncate break-words max-w-[240px] md:max-w-[260px]'
+                )
+                self.badge = ui.label().classes('text-weight-bold text-grey-7')
+
+            ui.separator().classes('q-my-sm')
+
+            with ui.row().classes('items-center justify-between text-grey-8 text-caption w-full min-w-0 no-wrap'):
+                self.times = ui.label().classes('truncate')
+                with ui.row().classes('items-center gap-1 min-w-0') as self.recurring_row:
+                    ui.icon('autorenew').classes('text-[16px]')
+                    self.recurring = ui.label().classes('truncate')
+
+            ui.separator().classes('q-my-sm')
+
+            with ui.row().classes('items-center justify-around text-grey-7'):
+                ui.icon('edit_note').classes('cursor-pointer hover:text-primary text-2xl').on(
+                    'click', lambda: on_edit(self.evt) if self.evt is not None else None
+                )
+                ui.icon('delete').classes('cursor-pointer hover:text-negative text-2xl').on(
+                    'click', lambda: on_delete(self.evt) if self.evt is not None else None
+                )
+
+    def bind(self, evt: Optional[Dict[str, Any]]) -> None:
+        """Show evt on this card (None hides the card)."""
+        self.evt = evt
+        if evt is None:
+            self.card.set_visibility(False)
+            return
+        self.title.set_text(evt.get('title', ''))
+        self.badge.set_text(_date_badge(evt['start_date']))
+        self.times.set_text(f"{evt.get('start', '')} {self.time_separator} {evt.get('end', '')}")
+        self.recurring.set_text(evt.get('recurring') or '')
+        self.recurring_row.set_visibility(bool(evt.get('recurring')))
+        self.card.set_visibility(True)
+
+
+class EventCardList:
+    """
+    Cards for a list of event dicts, drawn into container.
+    Short lists are a plain card grid. Long ones are a virtual list: a fixed
+    pool of cards covering the viewport is re-bound to whichever events are
+    scrolled into view, and spacers stand in for the rest, so the number of
+    elements per client doesn't grow with the list.
+    """
+
+    def __init__(self, container: ui.element, on_edit: Callable[[Dict[str, Any]], Any],
+                 on_delete: Callable[[Dict[str, Any]], Any], time_separator: str = '→',
+                 grid_classes: str = GRID_CLASSES,
+                 on_end_reached: Optional[Callable[[], Any]] = None):
+        self.container = container
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.time_separator = time_separator
+        self.grid_classes = grid_classes
+        self.on_end_reached = on_end_reached   # virtual list scrolled to its last rows
+
+        self.events: List[Dict[str, Any]] = []
+        self.mode: Optional[str] = None        # 'grid' or 'virtual'
+        self.grid: Optional[ui.element] = None
+        self.cards_by_id: Dict[Any, List[EventCard]] = {}   # grid mode: event id -> its cards
+        self.pool: List[EventCard] = []
+        self.first = 0
+        self.top_spacer: Optional[ui.element] = None
+        self.bottom_spacer: Optional[ui.element] = None
+
+    def _card(self, fixed_height: bool = False) -> EventCard:
+        return EventCard(self.on_edit, self.on_delete, self.time_separator, fixed_height)
+
+    def set_events(self, events: List[Dict[str, Any]]) -> None:
+        """Show this list of events (the list is kept by reference, not copied)."""
+        self.events = events
+        if len(events) >= VIRTUAL_LIST_MIN_EVENTS:
+            if self.mode != 'virtual':
+                self._build_virtual()
+            self._bind_window(min(self.first, self._max_first()))
+        else:
+            self._build_grid()
+
+    def extend(self, new_events: List[Dict[str, Any]]) -> None:
+        """Show events that were appended to the list passed to set_events()."""
+        if self.mode == 'grid' and len(self.events) < VIRTUAL_LIST_MIN_EVENTS:
+            with self.grid:
+                for evt in new_events:
+                    self._grid_card(evt)
+        else:
+            self.set_events(self.events)
+
+    def patch(self, event_id: Any) -> None:
+        """
+        Rows of the event with this id were inserted into, changed in or
+        removed from the list passed to set_events(); update only their cards
+        (a recurring event can have a row per occurrence). In the virtual
+        list only the bound window is re-bound.
+        """
+        self.patch_many([event_id])
+
+    def patch_many(self, event_ids: Iterable[Any]) -> None:
+        """patch() for several events at once; the other rows must be unchanged."""
+        event_ids = set(event_ids)
+        if None in event_ids or self.mode is None:
+            self.set_events(self.events)
+            return
+        virtual = len(self.events) >= VIRTUAL_LIST_MIN_EVENTS
+        if virtual != (self.mode == 'virtual'):
+            self.set_events(self.events)        # crossed the threshold
+            return
+        if virtual:
+            self._bind_window(min(self.first, self._max_first()))
+            return
+
+        indexes = [i for i, e in enumerate(self.events) if e.get('id') in event_ids]
+        wanted = {event_id: 0 for event_id in event_ids}
+        for index in indexes:
+            wanted[self.events[index]['id']] += 1
+        # park the kept cards at the end, then insert each at its index in
+        # ascending order: everything before the target is then already final
+        kept: Dict[Any, List[EventCard]] = {}
+        for event_id in event_ids:
+            cards = self.cards_by_id.pop(event_id, [])
+            for card in cards[wanted[event_id]:]:
+                card.card.delete()
+            kept[event_id] = cards[:wanted[event_id]]
+            for card in kept[event_id]:
+                card.card.move(self.grid)
+        for index in indexes:
+            evt = self.events[index]
+            cards = kept[evt['id']]
+            if cards:
+                card = cards.pop(0)
+                card.bind(evt)
+                self.cards_by_id.setdefault(evt['id'], []).append(card)
+            else:
+                with self.grid:
+                    card = self._grid_card(evt)
+            card.card.move(self.grid, target_index=index)
+
+    # ---- grid mode ----
+    def _grid_card(self, evt: Dict[str, Any]) -> EventCard:
+        card = self._card()
+        card.bind(evt)
+        if evt.get('id') is not None:
+            self.cards_by_id.setdefault(evt['id'], []).append(card)
+        return card
+
+    def _build_grid(self) -> None:
+        self.mode = 'grid'
+        self.pool = []
+        self.cards_by_id = {}
+        self.container.clear()
+        with self.container:
+            with ui.element('div').classes(self.grid_classes) as self.grid:
+                for evt in self.events:
+                    self._grid_card(evt)
+
+    # ---- virtual mode ----
+    def _pool_size(self) -> int:
+        return VIRTUAL_VIEWPORT_HEIGHT // VIRTUAL_ROW_HEIGHT + 1 + 2 * VIRTUAL_OVERSCAN
+
+    def _max_first(self) -> int:
+        return max(0, len(self.events) - self._pool_size())
+
+    def _build_virtual(self) -> None:
+        self.mode = 'virtual'
+        self.grid = None
+        self.cards_by_id = {}
+        self.first = 0
+        self.container.clear()
+        with self.container:
+            scroll = ui.scroll_area().classes('w-full').style(f'height: {VIRTUAL_VIEWPORT_HEIGHT}px')
+            scroll.on('scroll', self._on_scroll, args=['verticalPosition'], throttle=VIRTUAL_SCROLL_THROTTLE)
+            with scroll:
+                with ui.column().classes('w-full items-center gap-0'):
+                    self.top_spacer = ui.element('div')
+                    self.pool = []
+                    for _ in range(self._pool_size()):
+                        # each card sits in a fixed-height row so positions are exact
+                        with ui.element('div').classes('w-full flex justify-center') \
+                                .style(f'height: {VIRTUAL_ROW_HEIGHT}px'):
+                            self.pool.append(self._card(fixed_height=True))
+                    self.bottom_spacer = ui.element('div')
+
+    def _on_scroll(self, e: Any) -> Any:
+        position = float(e.args.get('verticalPosition') or 0)
+        first = min(max(0, int(position // VIRTUAL_ROW_HEIGHT) - VIRTUAL_OVERSCAN), self._max_first())
+        if first != self.first:
+            self._bind_window(first)
+        if self.on_end_reached is not None and first >= self._max_first():
+            return self.on_end_reached()
+        return None
+
+    def _bind_window(self, first: int) -> None:
+        self.first = first
+        shown = min(len(self.pool), len(self.events) - first)
+        self.top_spacer.style(f'height: {first * VIRTUAL_ROW_HEIGHT}px')
+        self.bottom_spacer.style(f'height: {(len(self.events) - first - shown) * VIRTUAL_ROW_HEIGHT}px')
+        for i, card in enumerate(self.pool):
+            index = first + i
+            card.bind(self.events[index] if index < len(self.events) else None)
+            # hide the whole row, not just the card, so no blank rows are left
+            card.card.parent_slot.parent.set_visibility(index < len(self.events))
@@ -0,0 +1,149 @@
+# app/components/event_search.py
+from __future__ import annotations
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import unicodedata
+
+MONTHS_FULL = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+MONTHS_ABBR = [
+    'jan', 'feb', 'mar', 'apr', 'may', 'jun',
+    'jul', 'aug', 'sep', 'oct', 'nov', 'dec'
+]
+
+# formats tried by parse_search_date, in order
+SEARCH_DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%b %d %Y',
+    '%B %d %Y',
+    '%d %b %Y',
+    '%d %B %Y',
+    '%b %d',
+    '%B %d',
+    '%d %b',
+    '%d %B',
+]
+
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form used for haystacks and queries."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+
+def parse_search_month(q: str) -> Optional[int]:
+    """Try to interpret the search query as a month (e.g. 'november', 'nov').
+
+    Returns the month number 1–12 if it matches, otherwise None.
+    """
+    q = (q or '').strip().lower()
+    if q in MONTHS_FULL:
+        return MONTHS_FULL.index(q) + 1
+    if q in MONTHS_ABBR:
+        return MONTHS_ABBR.index(q) + 1
+    return None
+
+
+@lru_cache(maxsize=512)
+def _parse_search_date_parts(q: str) -> Optional[Tuple[Optional[int], int, int]]:
+    # (year or None, month, day); cached because every keystroke re-asks
+    # for the same prefixes and each miss costs ten strptime attempts
+    q_norm = q.replace(',', ' ')
+    for fmt in SEARCH_DATE_FORMATS:
+        try:
+            dt = datetime.strptime(q_norm, fmt)
+        except ValueError:
+            continue
+        return (dt.year if '%Y' in fmt else None, dt.month, dt.day)
+    return None
+
+
+def parse_search_date(q: str) -> Optional[date]:
+    """Try to interpret the search query as a date in common formats.
+
+    Supported examples:
+      '2025-01-08', '2025/01/08',
+      'Jan 8', 'January 8', 'Jan 8 2025', '8 Jan 2025', etc.
+    Returns a date object if parsing succeeds, otherwise None.
+    """
+    q = (q or '').strip()
+    if not q:
+        return None
+    parts = _parse_search_date_parts(q)
+    if parts is None:
+        return None
+    year, month, day = parts
+    # If year not provided, assume current year
+    try:
+        return date(year or date.today().year, month, day)
+    except ValueError:
+        return None
+
+
+class EventSearchIndex:
+    """
+    Search over one page's event dicts (the Events page shape), built once
+    per version of that list. Haystacks are normalized up front and events
+    are bucketed by start month and date, so a keystroke is a substring scan
+    plus dict lookups. When the new query extends the previous one, only the
+    previous hits are rescanned.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], version: Any = None):
+        self.version = version
+        self.events = list(events)
+        self._haystacks: List[str] = []
+        self._by_month: Dict[int, List[int]] = {}
+        self._by_date: Dict[date, List[int]] = {}
+        for i, e in enumerate(self.events):
+            self._haystacks.append(normalize(' '.join([
+                str(e.get('title', '')),
+                str(e.get('start_date', '')),
+                str(e.get('start', '')),
+                str(e.get('end', '')),
+                str(e.get('recurring', '')),
+            ])))
+            try:
+                start_day = date.fromisoformat(str(e.get('start_date', '')).strip())
+            except ValueError:
+                continue
+            self._by_month.setdefault(start_day.month, []).append(i)
+            self._by_date.setdefault(start_day, []).append(i)
+
+        # last substring-only query and the positions it matched
+        self._last_query: Optional[str] = None
+        self._last_hits: List[int] = []
+
+    def search(self, raw_query: str) -> List[Dict[str, Any]]:
+        """Events matching the query, in list order."""
+        q = normalize(raw_query)
+        if not q:
+            return list(self.events)
+
+        query_month = parse_search_month(raw_query)
+        query_date = parse_search_date(raw_query)
+
+        # every haystack containing q also contains any substring of q, so a
+        # longer query only needs to look at the last query's hits
+        if self._last_query is not None and self._last_query in q:
+            candidates = self._last_hits
+        else:
+            candidates = range(len(self.events))
+        text_hits = [i for i in candidates if q in self._haystacks[i]]
+        self._last_query = q
+        self._last_hits = text_hits
+
+        if query_month is None and query_date is None:
+            return [self.events[i] for i in text_hits]
+
+        hits = set(text_hits)
+        if query_month is not None:
+            hits.update(self._by_month.get(query_month, ()))
+        if query_date is not None:
+            hits.update(self._by_date.get(query_date, ()))
+        return [self.events[i] for i in sorted(hits)]
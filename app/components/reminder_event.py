@@ -2,17 +2,8 @@
 from __future__ import annotations
 from typing import Dict, List, Optional, Tuple
 from nicegui import ui
+from dbmodule.alerts import REMINDER_OPTIONS
 
-REMINDER_OPTIONS: Dict[str, int] = {
-    'At time of event': 0,
-    '5 minutes before': 5,
-    '10 minutes before': 10,
-    '15 minutes before': 15,
-    '30 minutes before': 30,
-    '1 hour before': 60,
-    '2 hours before': 120,
-    '1 day before': 1440,
-}
 ALL_LABELS: List[str] = list(REMINDER_OPTIONS.keys())
 
 def _minutes_from_labels(labels: List[str]) -> List[int]:
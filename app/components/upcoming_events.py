@@ -1,27 +1,15 @@
 # app/pages/upcoming_events.py
 from __future__ import annotations
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional
-import json
+from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Set
 
 from nicegui import ui
 from app.components.edit_event import open_edit_dialog
+from app.components.event_list import EventCardList
+from app.live_updates import subscribe_view
 from app.sharedVars import AddEditEventData  # same DTO used in events.py
 
 
-def _date_badge(iso_date: str) -> str:
-    d = datetime.fromisoformat(iso_date).date()
-    return f"{d.strftime('%b').upper()} {d.day}"
-
-
-def _format_time_12h(dt: datetime) -> str:
-    """Return times like '9:00 AM' / '1:05 PM' (no leading zero on hour)."""
-    s = dt.strftime('%I:%M %p')  # e.g. '09:00 AM'
-    if s.startswith('0'):
-        s = s[1:]
-    return s
-
-
 def _event_date(evt: Dict[str, Any]) -> Optional[date]:
     # Prefer start_date, fall back to legacy 'date'
     d = evt.get('start_date') or evt.get('date')
@@ -53,97 +41,13 @@ def build_upcoming_events(calendar_data: Optional[Any] = None) -> None:
     """
     Component-only builder used inside the Home 'Upcoming Events' tab.
     - Uses DB if calendar_data is provided
-    - Shows only this month's upcoming events (today and later in same month)
+    - Shows the next 30 days of events, recurring ones once per occurrence
     """
 
-    # ---- DB row -> UI dict ----
-    def _from_data_frame(df: Any) -> Dict[str, Any]:
-        start_dt = datetime.fromtimestamp(df.eventStartDate)
-        end_dt = datetime.fromtimestamp(df.eventEndDate)
-
-        start_date_str = start_dt.strftime('%Y-%m-%d')
-        end_date_str = end_dt.strftime('%Y-%m-%d')
-        start_str = _format_time_12h(start_dt)
-        end_str = _format_time_12h(end_dt)
-
-        # Frequency index -> label
-        idx = int(getattr(df, 'recurringEventOptionIndex', 0) or 0)
-        freq_labels = ['None', 'Daily', 'Weekly', 'Monthly', 'Yearly']
-        freq_label = freq_labels[idx] if 0 <= idx < len(freq_labels) else 'None'
-
-        # Interval / recurringInterval (for "Every N days/weeks/months/years")
-        recurring_interval = int(getattr(df, 'recurringInterval', 1) or 1)
-
-        # Human-readable recurring text for UI + RecurringComponent
-        rec_text: Optional[str] = None
-        if freq_label != 'None':
-            if recurring_interval <= 1:
-                rec_text = freq_label  # 'Daily', 'Weekly', 'Monthly', 'Yearly'
-            else:
-                unit_map = {'Daily': 'day', 'Weekly': 'week', 'Monthly': 'month', 'Yearly': 'year'}
-                unit = unit_map.get(freq_label, 'time')
-                plural = 's' if recurring_interval != 1 else ''
-                rec_text = f'Every {recurring_interval} {unit}{plural}'
-
-        # End options from DB
-        end_opt_idx = int(getattr(df, 'recurringEndOptionIndex', 0) or 0)
-
-        raw_end_ts = getattr(df, 'recurringEndDate', None)
-        if isinstance(raw_end_ts, (int, float)) and raw_end_ts > 0:
-            end_date_iso = datetime.fromtimestamp(raw_end_ts).strftime('%Y-%m-%d')
-        else:
-            end_date_iso = None
-
-        end_count = getattr(df, 'recurringEndCount', None)
-        try:
-            if end_count is not None:
-                end_count = int(end_count)
-        except Exception:
-            end_count = None
-
-        raw_alert = getattr(df, 'selectedAlertCheckboxes', []) or []
-        if isinstance(raw_alert, str):
-            try:
-                alert_labels = json.loads(raw_alert)
-            except Exception:
-                alert_labels = []
-        else:
-            alert_labels = list(raw_alert)
-
-        return {
-            'id': f'{df.eventStartDate}-{df.eventEndDate}',
-            'title': df.eventName,
-            'start_date': start_date_str,
-            'end_date': end_date_str,
-            'start': start_str,
-            'end': end_str,
-            'recurring': rec_text,
-            '_start_ts': df.eventStartDate,
-            '_end_ts': df.eventEndDate,
-            'description': getattr(df, 'eventDescription', '') or '',
-            'is_recurring': bool(getattr(df, 'isRecurringEvent', False)),
-            'is_alerting': bool(getattr(df, 'isAlerting', False)),
-            'recurring_option_index': idx,
-            'recurring_interval': recurring_interval,
-            'recurring_end_option_index': end_opt_idx,
-            'recurring_end_date': end_date_iso,
-            'recurring_end_count': end_count,
-            'selectedAlertCheckboxes': alert_labels,
-            'reminders': alert_labels,
-        }
-
     use_db = calendar_data is not None
 
-    frames = calendar_data.get_all_data() if use_db else []
-    events: List[Dict[str, Any]] = [_from_data_frame(f) for f in frames]
-
-    # Always keep DB events sorted by start timestamp
-    if use_db:
-        events.sort(
-            key=lambda e: (
-                e.get('_start_ts') if isinstance(e.get('_start_ts'), (int, float)) else 0
-            )
-        )
+    # local mode only (no DB): the events this component was given or created
+    events: List[Dict[str, Any]] = []
 
     # ---- Header ----
     with ui.row().classes('items-center justify-between w-full px-4 pt-4'):
@@ -164,16 +68,10 @@ def build_upcoming_events(calendar_data: Optional[Any] = None) -> None:
                 return i
         return -1
 
-    def refresh_from_db():
-        nonlocal events
-        if use_db:
-            frames2 = calendar_data.getAllData()
-            events = [_from_data_frame(f) for f in frames2]
-            events.sort(
-                key=lambda e: (
-                    e.get('_start_ts') if isinstance(e.get('_start_ts'), (int, float)) else 0
-                )
-            )
+    async def fetch_upcoming() -> List[Dict[str, Any]]:
+        # one windowed query, already sorted: one-off events plus occurrences
+        # (EventRecords, which read like the event dicts built here)
+        return await calendar_data.upcoming_async()
 
     def _update_month_label(current_events: List[Dict[str, Any]]) -> None:
         if not current_events:
@@ -183,63 +81,50 @@ def build_upcoming_events(calendar_data: Optional[Any] = None) -> None:
             d = min(dates) if dates else date.today()
         month_label.text = f"{d.strftime('%b').upper()} {d.year}"
 
+    def sort_key(e: Dict[str, Any]):
+        evd = _event_date(e) or date.max
+        return (evd.isoformat(), str(e.get('start', '')))
+
+    # events shown right now, in display order (the card list holds this list)
+    window_list: List[Dict[str, Any]] = []
+
     def refresh():
-        container.clear()
-        base_list: List[Dict[str, Any]] = events
-
-        # default: show everything
-        window_list: List[Dict[str, Any]] = base_list
-
-        if use_db:
-            now = datetime.now()
-            today = now.date()
-            now_ts = now.timestamp()
-            cutoff_date = today + timedelta(days=30)
-            window_list = []
-
-            for e in base_list:
-                evd = _event_date(e)
-                if evd is None:
-                    continue
-
-                # Only show events in the next 30 days (including today)
-                if evd < today or evd > cutoff_date:
-                    continue
-
-                # Same day → only include if start timestamp is after now
-                if evd == today:
-                    start_ts = e.get('_start_ts')
-                    if isinstance(start_ts, (int, float)) and start_ts >= now_ts:
-                        window_list.append(e)
-                else:
-                    # Any future day within the 30-day window
-                    window_list.append(e)
-
-        # --- Sorting and draw ---
-        def sort_key(e: Dict[str, Any]):
-            evd = _event_date(e) or date.max
-            return (evd.isoformat(), str(e.get('start', '')))
-
-        window_list.sort(key=sort_key)
+        """Local mode (no DB): show every event in events."""
+        window_list[:] = sorted(events, key=sort_key)
+        _update_month_label(window_list)
+        card_list.set_events(window_list)
+
+    def _row_keys(rows: List[Dict[str, Any]], skip_ids: Set[Any]) -> List[Any]:
+        return [(e.get('id'), e.get('_start_ts')) for e in rows if e.get('id') not in skip_ids]
+
+    async def sync_events(event_ids: Set[Any]) -> None:
+        """
+        Re-read the window after writes. When only the written events' rows
+        changed, patch just their cards; otherwise (the limit pushed other
+        rows in or out) redraw the list.
+        """
+        fresh = await fetch_upcoming()
+        others_unchanged = _row_keys(fresh, event_ids) == _row_keys(window_list, event_ids)
+        window_list[:] = fresh
         _update_month_label(window_list)
+        if others_unchanged:
+            card_list.patch_many(event_ids)
+        else:
+            card_list.set_events(window_list)
 
-        with container:
-            with ui.element('div').classes(
-                'grid grid-cols-1 md:grid-cols-2 gap-6 justify-items-center w-full pl-0 md:pl-0'
-            ):
-                for evt in window_list:
-                    _event_card(evt)
+    async def sync_event(event_id: Any) -> None:
+        await sync_events({event_id})
 
     # --------------------------------------------
-    # CRUD handlers
+    # CRUD handlers (with a DB they just write; on_change redraws the window
+    # when the change bus delivers the write)
     # --------------------------------------------
-    def _update_event(original: Dict[str, Any], updated: Dict[str, Any]) -> None:
+    async def _update_event(original: Dict[str, Any], updated: Dict[str, Any]) -> None:
         """Edit -> Save"""
         if calendar_data is not None:
-            old_start_ts = original.get('_start_ts')
-            old_end_ts = original.get('_end_ts')
+            event_id = original.get('id')
 
-            if old_start_ts is not None and old_end_ts is not None:
+            if event_id is not None:
                 try:
                     # Build new timestamps
                     start_date_str = (
@@ -301,24 +186,14 @@ def build_upcoming_events(calendar_data: Optional[Any] = None) -> None:
                     except Exception:
                         frame.recurringEndCount = None
 
-                    calendar_data.updateEvent(
-                        old_start_ts,  # original keys
-                        old_end_ts,
-                        frame,  # new data
-                    )
-
-                    # Update UI hidden keys
-                    updated['_start_ts'] = new_start_ts
-                    updated['_end_ts'] = new_end_ts
-                    updated['id'] = f'{new_start_ts}-{new_end_ts}'
-
+                    await calendar_data.update_event_async(event_id, frame)
                 except Exception as e:
                     print(f"[UPCOMING] updateEvent error: {e}")
                     ui.notify(
                         'Failed to update event in the database (upcoming_events).',
                         color='negative',
                     )
-                    return
+                return
 
         # Local update
         i = _find_index(original)
@@ -326,39 +201,32 @@ def build_upcoming_events(calendar_data: Optional[Any] = None) -> None:
             events[i] = updated
         else:
             events.append(updated)
-
-        if calendar_data is not None:
-            refresh_from_db()
         refresh()
 
-    def _remove_event(original: Dict[str, Any]) -> None:
+    async def _remove_event(original: Dict[str, Any]) -> None:
         """Delete"""
 
         if calendar_data is not None:
-            old_start_ts = original.get('_start_ts')
-            old_end_ts = original.get('_end_ts')
+            event_id = original.get('id')
 
-            if old_start_ts is not None and old_end_ts is not None:
+            if event_id is not None:
                 try:
-                    calendar_data.deleteEvent(old_start_ts, old_end_ts)
+                    await calendar_data.delete_event_async(event_id)
                 except Exception as e:
                     print(f"[UPCOMING] deleteEvent error: {e}")
                     ui.notify(
                         'Error deleting event from database (upcoming_events).',
                         color='negative',
                     )
-                    return
+                return
 
         # Local list sync
         i = _find_index(original)
         if i >= 0:
             events.pop(i)
-
-        if calendar_data is not None:
-            refresh_from_db()
         refresh()
 
-    def _create_event(new_ev: Dict[str, Any]) -> None:
+    async def _create_event(new_ev: Dict[str, Any]) -> None:
         """New -> Save"""
 
         if calendar_data is not None:
@@ -415,71 +283,80 @@ def build_upcoming_events(calendar_data: Optional[Any] = None) -> None:
                 frame.recurringEndCount = None
 
             try:
-                calendar_data.addData(frame)
+                await calendar_data.add_data_async(frame)
             except Exception as e:
                 print(f"[UPCOMING] DB create error: {e}")
                 ui.notify('Error saving new event to database.', color='negative')
+        else:
+            events.append(new_ev)
+            refresh()
+
+    # ---- Event cards (a virtual list once there are many) ----
+    async def _edit(ev: Dict[str, Any]) -> None:
+        if use_db and ev.get('id') is not None:
+            # a card may show a later occurrence; edit the series as stored
+            series = await calendar_data.get_event_async(ev['id'])
+            if series is None:
+                await sync_event(ev['id'])
                 return
+            ev = series
+        open_edit_dialog(
+            ev,
+            on_save=lambda updated, original=ev: _update_event(original, updated),
+            on_delete=lambda original=ev: _remove_event(original),
+        )
 
-            # Attach hidden fields so later edits/deletes know their DB keys
-            new_ev['_start_ts'] = start_ts
-            new_ev['_end_ts'] = end_ts
-            new_ev['id'] = f'{start_ts}-{end_ts}'
-
-        events.append(new_ev)
-
-        if calendar_data is not None:
-            refresh_from_db()
-        refresh()
+    async def _confirm_delete(ev: Dict[str, Any]) -> None:
+        if use_db and ev.get('id') is not None:
+            # as in _edit: the card may be one occurrence, the delete removes the series
+            series = await calendar_data.get_event_async(ev['id'])
+            if series is None:
+                await sync_event(ev['id'])
+                return
+            ev = series
+        title = ev.get('title', '') or 'this event'
+        if ev.get('recurring'):
+            message = (f'"{title}" repeats ({ev.get("recurring")}). Deleting it removes '
+                       'the whole series, every past and future occurrence, not just this one.')
+        else:
+            message = f'Delete "{title}"?'
 
-    # ---- One event card ----
-    def _event_card(evt: Dict[str, Any]) -> None:
-        with ui.card().classes(
-            'w-full max-w-[95%] md:max-w-[90%] rounded-xl bg-gray-200 shadow-sm q-pa-md '
-            'hover:shadow-md transition-all duration-200 z-0 box-border'
-        ):
-            with ui.row().classes('items-start justify-between w-full min-w-0'):
-                ui.label(evt['title']).classes(
-                    'text-body1 text-weight-medium truncate break-words '
-                    'max-w-[240px] md:max-w-[260px]'
-                )
-                ui.label(_date_badge(evt['start_date'])).classes(
-                    'text-weight-bold text-grey-7'
-                )
+        # a new dialog per click, deleted once answered so none pile up in the page
+        with ui.dialog() as dialog, ui.card().classes('w-[min(92vw,420px)] max-w-full'):
+            ui.label('Delete event series?' if ev.get('recurring') else 'Delete event?').classes(
+                'text-h6 text-weight-bold'
+            )
+            ui.label(message).classes('text-body2')
+            with ui.row().classes('w-full justify-end q-gutter-sm q-mt-md'):
+                ui.button('Cancel', on_click=lambda: dialog.submit(False)).props('flat')
+                ui.button(
+                    'Delete series' if ev.get('recurring') else 'Delete',
+                    on_click=lambda: dialog.submit(True),
+                ).props('flat color=negative')
+        confirmed = await dialog
+        dialog.delete()
+        if confirmed:
+            await _remove_event(ev)
+
+    card_list = EventCardList(
+        container, on_edit=_edit, on_delete=_confirm_delete, time_separator='to',
+        grid_classes='grid grid-cols-1 md:grid-cols-2 gap-6 justify-items-center w-full pl-0 md:pl-0',
+    )
 
-            ui.separator().classes('q-my-sm')
+    # ---- initial render ----
+    async def load():
+        window_list[:] = await fetch_upcoming()
+        _update_month_label(window_list)
+        card_list.set_events(window_list)
 
-            with ui.row().classes(
-                'items-center justify-between text-grey-8 text-caption w-full min-w-0'
-            ):
-                ui.label(f"{evt.get('start','')} to {evt.get('end','')}").classes(
-                    'truncate'
-                )
-                if evt.get('recurring'):
-                    with ui.row().classes('items-center gap-1 min-w-0'):
-                        ui.icon('autorenew').classes('text-[16px]')
-                        ui.label(evt['recurring']).classes('truncate')
-
-            ui.separator().classes('q-my-sm')
-
-            with ui.row().classes('items-center justify-around text-grey-7'):
-                ui.icon('edit_note').classes(
-                    'cursor-pointer hover:text-primary text-2xl'
-                ).on(
-                    'click',
-                    lambda _=None, ev=evt: open_edit_dialog(
-                        ev,
-                        on_save=lambda updated, original=ev: _update_event(
-                            original, updated
-                        ),
-                        on_delete=lambda original=ev: _remove_event(original),
-                    ),
-                )
-                ui.icon('delete').classes(
-                    'cursor-pointer hover:text-negative text-2xl'
-                ).on(
-                    'click', lambda _=None, original=evt: _remove_event(original)
-                )
+    # every committed write arrives here: this view's own, other sessions' and the chat assistant's
+    async def on_change(event_ids: Optional[Set[Any]]) -> None:
+        if event_ids is None:
+            await load()
+        else:
+            await sync_events(event_ids)
 
-    # ---- initial render ----
     refresh()
+    if use_db:
+        ui.timer(0, load, once=True)
+        subscribe_view(calendar_data, on_change)
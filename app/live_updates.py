@@ -0,0 +1,58 @@
+# app/live_updates.py
+from __future__ import annotations
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Optional, Set
+
+from nicegui import background_tasks, ui
+from dbmodule.changes import EventChange
+
+logger = logging.getLogger(__name__)
+
+
+def subscribe_view(calendar_data: Any, on_change: Callable[[Optional[Set[Any]]], Any]) -> None:
+    """
+    Push committed writes (from any session or the chat assistant) to one
+    view of the current page. on_change(event_ids) runs on the event loop
+    inside the page's client: event_ids is the set of events written since
+    it last ran, or None when the view should reload everything it shows.
+    Writes arriving while it runs are coalesced into one follow-up call, so
+    a burst costs one re-read, and runs of one view never interleave. The
+    subscription ends when the client is deleted.
+    """
+    client = ui.context.client
+    loop = asyncio.get_running_loop()
+    state = {'ids': set(), 'reload': False, 'running': False}
+
+    async def drain() -> None:
+        try:
+            while state['reload'] or state['ids']:
+                event_ids = None if state['reload'] else state['ids']
+                state['ids'], state['reload'] = set(), False
+                try:
+                    with client:
+                        result = on_change(event_ids)
+                        if inspect.isawaitable(result):
+                            await result
+                except Exception:
+                    logger.exception("live update of %s failed", on_change)
+        finally:
+            state['running'] = False
+
+    def note(change: EventChange) -> None:
+        if change.event_ids is None:
+            state['reload'] = True
+        else:
+            state['ids'].update(change.event_ids)
+        if not state['running']:
+            state['running'] = True
+            background_tasks.create(drain(), name='live update')
+
+    def deliver(change: EventChange) -> None:
+        # runs on whichever thread committed the write
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(note, change)
+
+    calendar_data.changes.subscribe(deliver)
+    client.on_delete(lambda: calendar_data.changes.unsubscribe(deliver))
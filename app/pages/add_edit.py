@@ -39,7 +39,7 @@ class AddEditEvent:
 		def onDescriptionChange(event):
 			self.pageData.eventDescription = event.value
 		
-		def onSaveEvent(event):
+		async def onSaveEvent(event):
 			
 			if self.eventStartDate.validation == None:
 				self.eventStartDate.validation = self.validateDate
@@ -90,7 +90,7 @@ class AddEditEvent:
 				else:
 					self.pageData.recurringEndDate = self.recurringEndData.get_date_timestamp()
 				print(self.pageData)
-				self.calendarData.add_data(self.pageData)
+				await self.calendarData.add_data_async(self.pageData)
 		
 		with ui.column().classes("justify-center items-center h-screen w-full pl-[8rem] gap-8"):
 			ui.label(self.currentDate)
@@ -7,7 +7,6 @@ import json
 from datetime import datetime
 from app.components.chat_message import ChatMessage
 from app.components.chat_input import ChatInput
-from dbmodule.sql import Sql
 
 load_dotenv()
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
@@ -93,7 +92,12 @@ def sql_create_event(conn, data):
         int(bool(data["alerting"])),
     )
 
-    conn.execute(query, values)
+    cursor = conn.execute(query, values)
+    return [cursor.lastrowid]
+
+
+def _ids_named(conn, name):
+    return [row[0] for row in conn.execute("SELECT id FROM events WHERE name = ?;", (name,))]
 
 
 def sql_update_event(conn, data):
@@ -119,17 +123,22 @@ def sql_update_event(conn, data):
 
     values.append(data["event_name"])
 
+    event_ids = _ids_named(conn, data["event_name"])
     query = f"UPDATE events SET {', '.join(sets)} WHERE name = ?;"
     conn.execute(query, values)
+    return event_ids
 
 
 def sql_delete_event(conn, data):
+    event_ids = _ids_named(conn, data["event_name"])
     query = "DELETE FROM events WHERE name = ?;"
     conn.execute(query, (data["event_name"],))
+    return event_ids
 
 
 class ChatPage:
-    def __init__(self):
+    def __init__(self, calendar_data):
+        self.calendar_data = calendar_data
         self.messages_container = None
         self.instructions = []
 
@@ -142,26 +151,26 @@ class ChatPage:
             """)
 
     def _apply_instruction(self, instruction):
-        sql_db = Sql()
-        conn = sql_db.conn
         action = instruction["action"]
 
-        if action == "create_event":
-            sql_create_event(conn, instruction)
-        elif action == "update_event":
-            sql_update_event(conn, instruction)
-        elif action == "delete_event":
-            sql_delete_event(conn, instruction)
-
-        conn.commit()
-        sql_db.terminate()
+        event_ids = []
+        with self.calendar_data.sql.transaction() as conn:
+            if action == "create_event":
+                event_ids = sql_create_event(conn, instruction)
+            elif action == "update_event":
+                event_ids = sql_update_event(conn, instruction)
+            elif action == "delete_event":
+                event_ids = sql_delete_event(conn, instruction)
+        # these writes bypass CalendarData, so tell it (and every open view) what changed
+        if event_ids:
+            self.calendar_data.mark_changed(event_ids)
 
     async def _send_message(self, user_text: str):
         self._add_message("user", user_text)
         await asyncio.sleep(0)
         bot_reply = await call_gemini(user_text)
         instruction = json.loads(bot_reply)
-        self._apply_instruction(instruction)
+        await self.calendar_data.run_async(self._apply_instruction, instruction)
         self._add_message("bot", bot_reply)
 
     def show(self):
@@ -1,25 +1,16 @@
 # app/pages/events.py
 from __future__ import annotations
-from datetime import datetime, date
-from typing import List, Dict, Any, Optional
-import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Set
+import bisect
 
 from nicegui import ui
 from app.components.edit_event import open_edit_dialog
+from app.components.event_list import EventCardList
+from app.components.event_search import EventSearchIndex, parse_search_date, parse_search_month
+from app.live_updates import subscribe_view
 from app.sharedVars import AddEditEventData  # used to create DB records
-
-
-def _date_badge(iso_date: str) -> str:
-    d = datetime.fromisoformat(iso_date).date()
-    return f"{d.strftime('%b').upper()} {d.day}"
-
-
-def _format_time_12h(dt: datetime) -> str:
-    """Return times like '9:00 AM' / '1:05 PM' (no leading zero on hour)."""
-    s = dt.strftime('%I:%M %p')  # e.g. '09:00 AM'
-    if s.startswith('0'):
-        s = s[1:]
-    return s
+from dbmodule.calendardata import EVENT_PAGE_SIZE
 
 
 def _parse_date_time(date_str: str, time_str: str) -> float:
@@ -44,172 +35,18 @@ def _parse_date_time(date_str: str, time_str: str) -> float:
 
     raise ValueError(f"Cannot parse date/time: '{joined}'")
 
-def _parse_search_month(q: str) -> Optional[int]:
-    """Try to interpret the search query as a month (e.g. 'november', 'nov').
-
-    Returns the month number 1–12 if it matches, otherwise None.
-    """
-    q = (q or '').strip().lower()
-    if not q:
-        return None
-
-    months_full = [
-        'january', 'february', 'march', 'april', 'may', 'june',
-        'july', 'august', 'september', 'october', 'november', 'december'
-    ]
-    months_abbr = [
-        'jan', 'feb', 'mar', 'apr', 'may', 'jun',
-        'jul', 'aug', 'sep', 'oct', 'nov', 'dec'
-    ]
-
-    if q in months_full:
-        return months_full.index(q) + 1
-    if q in months_abbr:
-        return months_abbr.index(q) + 1
-
-    return None
-
-def _parse_search_date(q: str) -> Optional[date]:
-    """Try to interpret the search query as a date in common formats.
-
-    Supported examples:
-      '2025-01-08', '2025/01/08',
-      'Jan 8', 'January 8', 'Jan 8 2025', '8 Jan 2025', etc.
-    Returns a date object if parsing succeeds, otherwise None.
-    """
-    q = (q or '').strip()
-    if not q:
-        return None
-
-    # Normalize a bit
-    q_norm = q.replace(',', ' ')
-
-    # Try a bunch of reasonable formats
-    formats = [
-        '%Y-%m-%d',
-        '%Y/%m/%d',
-        '%b %d %Y',
-        '%B %d %Y',
-        '%d %b %Y',
-        '%d %B %Y',
-        '%b %d',
-        '%B %d',
-        '%d %b',
-        '%d %B',
-    ]
-
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(q_norm, fmt)
-            # If year not provided, assume current year
-            if '%Y' not in fmt:
-                today = date.today()
-                dt = dt.replace(year=today.year)
-            return dt.date()
-        except ValueError:
-            continue
-
-    return None
-
 # --------------------------------------------
 # Main page
 # --------------------------------------------
 def show(calendar_data: Optional[Any] = None) -> None:
     """Events page with simple search and integrated Edit/Delete/New via dialog component."""
 
-    # --------------------------------------------
-    # Helper: convert AddEditEventData -> UI dict
-    # --------------------------------------------
-    def _from_data_frame(df: Any) -> Dict[str, Any]:
-        """
-        df is an AddEditEventData from CalendarData.getAllData()
-        """
-        start_dt = datetime.fromtimestamp(df.eventStartDate)
-        end_dt = datetime.fromtimestamp(df.eventEndDate)
-
-        start_date_str = start_dt.strftime('%Y-%m-%d')
-        end_date_str = end_dt.strftime('%Y-%m-%d')
-        start_str = _format_time_12h(start_dt)
-        end_str = _format_time_12h(end_dt)
-
-        # Frequency index -> label
-        idx = int(getattr(df, 'recurringEventOptionIndex', 0) or 0)
-        freq_labels = ['None', 'Daily', 'Weekly', 'Monthly', 'Yearly']
-        freq_label = freq_labels[idx] if 0 <= idx < len(freq_labels) else 'None'
-
-        # Interval (Every N days/weeks/months/years)
-        recurring_interval= int(getattr(df, 'recurringInterval', 1) or 1)
-
-        # Human-readable recurring label
-        recurring_label: Optional[str] = None
-        if freq_label != 'None':
-            if recurring_interval <= 1:
-                recurring_label = freq_label
-            else:
-                unit_map = {'Daily': 'day', 'Weekly': 'week', 'Monthly': 'month', 'Yearly': 'year'}
-                unit = unit_map.get(freq_label, 'time')
-                plural = 's' if recurring_interval != 1 else ''
-                recurring_label = f'Every {recurring_interval} {unit}{plural}'
-
-        # End options from DB
-        end_opt_idx = int(getattr(df, 'recurringEndOptionIndex', 0) or 0)
-
-        raw_end_ts = getattr(df, 'recurringEndDate', None)
-        if isinstance(raw_end_ts, (int, float)) and raw_end_ts > 0:
-            end_date_iso = datetime.fromtimestamp(raw_end_ts).strftime('%Y-%m-%d')
-        else:
-            end_date_iso = None
-
-        end_count = getattr(df, 'recurringEndCount', None)
-        try:
-            if end_count is not None:
-                end_count = int(end_count)
-        except Exception:
-            end_count = None
-
-        # Decode JSON from DB if needed
-        raw_alert = getattr(df, 'selectedAlertCheckboxes', []) or []
-        if isinstance(raw_alert, str):
-            try:
-                alert_labels = json.loads(raw_alert)
-            except Exception:
-                alert_labels = []
-        else:
-            alert_labels = [str(x) for x in raw_alert]
-
-        ev: Dict[str, Any] = {
-            # Use the timestamps as a stable composite identity
-            'id': f'{df.eventStartDate}-{df.eventEndDate}',
-            'title': df.eventName,
-            'start_date': start_date_str,
-            'end_date': end_date_str,
-            'start': start_str,
-            'end': end_str,
-            'recurring': recurring_label,
-
-            # Hidden fields for DB operations:
-            '_start_ts': df.eventStartDate,
-            '_end_ts': df.eventEndDate,
-
-            # Optional extras
-            'description': getattr(df, 'eventDescription', '') or '',
-            'is_recurring': bool(getattr(df, 'isRecurringEvent', False)),
-            'is_alerting': bool(getattr(df, 'isAlerting', False)),
-            'recurring_option_index': idx,
-            'recurring_interval': recurring_interval,
-            'recurring_end_option_index': end_opt_idx,
-            'recurring_end_date': end_date_iso,
-            'recurring_end_count': end_count,
-
-            'selectedAlertCheckboxes': alert_labels,
-            # For ReminderComponent (used as initial_labels)
-            'reminders': alert_labels,
-        }
-        return ev
-
-    # DB HOOK 1: INITIAL LOAD
-    frames = calendar_data.get_all_data() if calendar_data is not None else []
-    events: List[Dict[str, Any]] = [_from_data_frame(f) for f in frames]
+    # DB HOOK 1: INITIAL LOAD (filled page by page once the client connects),
+    # kept in (start, id) order like CalendarData.list_events. Rows read from
+    # the DB are EventRecords, which read like the event dicts built here.
+    events: List[Dict[str, Any]] = []
+    page = {'after_start': None, 'after_id': None, 'done': calendar_data is None, 'loading': False,
+            'version': 0}   # bumped whenever events changes; the search index follows it
 
     ui.add_head_html('<style>html, body, #app { overflow-x: hidden !important; }</style>')
 
@@ -221,7 +58,10 @@ def show(calendar_data: Optional[Any] = None) -> None:
             .props('outlined dense clearable debounce=200') \
             .classes('w-[14rem] md:w-[20rem] max-w-full bg-gray-200')
 
-    container = ui.element('div').classes('w-full max-w-[100vw] px-4 md:px-6 pb-24')
+    container = ui.element('div').classes('w-full max-w-[100vw] px-4 md:px-6 pl-10')
+    more_button = ui.button('Load more', on_click=lambda: load_more()) \
+        .props('flat color=primary').classes('mx-auto mt-4 mb-24')
+    more_button.set_visibility(False)
 
     # --------------------------------------------
     # Helpers
@@ -237,84 +77,151 @@ def show(calendar_data: Optional[Any] = None) -> None:
                 return i
         return -1
 
-    def refresh_from_db():
-        """DB HOOK 2: RELOAD LIST from DB after create/update/delete."""
-        nonlocal events
-        if calendar_data is not None:
-            frames2 = calendar_data.get_all_data()
-            events = [_from_data_frame(f) for f in frames2]
+    search_index: Dict[str, Optional[EventSearchIndex]] = {'index': None}
+
+    def events_changed() -> None:
+        page['version'] += 1
+
+    def current_search_index() -> EventSearchIndex:
+        index = search_index['index']
+        if index is None or index.version != page['version']:
+            index = search_index['index'] = EventSearchIndex(events, page['version'])
+        return index
+
+    def _sort_key(e: Dict[str, Any]):
+        return (e.get('_start_ts') or 0, e.get('id') or 0)
+
+    async def load_page() -> List[Dict[str, Any]]:
+        """Fetch the next page after the keyset cursor and append it to events."""
+        if page['done'] or page['loading']:
+            return []
+        page['loading'] = True
+        try:
+            frames = await calendar_data.list_events_async(page['after_start'], page['after_id'], EVENT_PAGE_SIZE)
+        finally:
+            page['loading'] = False
+        if frames:
+            page['after_start'] = frames[-1].eventStartDate
+            page['after_id'] = frames[-1].eventId
+        page['done'] = len(frames) < EVENT_PAGE_SIZE
+        events.extend(frames)
+        events_changed()
+        return frames
+
+    async def load_all_and_refresh():
+        # searching needs every event, not just the pages scrolled so far
+        while not page['done'] and not page['loading']:
+            await load_page()
+        refresh()
+
+    async def load_more():
+        new_events = await load_page()
+        if (search_box.value or '').strip():
+            refresh()
+            return
+        # no filter: the list shows events itself, so only the new page is drawn
+        card_list.extend(new_events)
+        more_button.set_visibility(not page['done'])
+
+    async def on_end_reached():
+        # the virtual list was scrolled to its last rows
+        if not (search_box.value or '').strip() and not page['done']:
+            await load_more()
+
+    async def sync_event(event_id: Any) -> None:
+        """DB HOOK 2: re-read one event after create/update and put it back in order."""
+        evt = await calendar_data.get_event_async(event_id)
+        events_changed()
+        for i, e in enumerate(events):
+            if e.get('id') == event_id:
+                events.pop(i)
+                break
+        if evt is None:
+            return
+        # past the loaded pages it will arrive with a later page instead
+        loaded_to = (page['after_start'], page['after_id'])
+        if page['done'] or (loaded_to[0] is not None and _sort_key(evt) <= loaded_to):
+            bisect.insort(events, evt, key=_sort_key)
+
+    search_state = {'seq': 0}
+
+    async def text_search(raw_q: str, local_hits: List[Dict[str, Any]]) -> None:
+        """Name/description matches from the DB-wide full-text index, best first."""
+        search_state['seq'] += 1
+        seq = search_state['seq']
+        hits = await calendar_data.search_async(raw_q)
+        if seq != search_state['seq'] or (search_box.value or '').strip() != raw_q:
+            return  # the query changed while this one ran
+        hit_ids = {e['id'] for e in hits}
+        render(hits + [e for e in local_hits if e.get('id') not in hit_ids], show_more=False)
+
+    def render(filtered: List[Dict[str, Any]], show_more: bool) -> None:
+        card_list.set_events(filtered)
+        more_button.set_visibility(show_more)
 
     def refresh():
-        container.clear()
         raw_q = (search_box.value or '').strip()
         q = raw_q.lower()
         filtered: List[Dict[str, Any]] = []
 
         if q:
             # Try to interpret the query as a date or a month
-            query_date = _parse_search_date(raw_q)
-            query_month = _parse_search_month(raw_q)
+            query_date = parse_search_date(raw_q)
+            query_month = parse_search_month(raw_q)
+
+            # month, exact date or substring (title, date, times, recurring text)
+            filtered = current_search_index().search(raw_q)
+
+            if calendar_data is not None and query_date is None and query_month is None:
+                # plain text: names and descriptions are searched in SQLite (FTS5)
+                # across every event, loaded or not
+                ui.timer(0, lambda: text_search(raw_q, filtered), once=True)
+            elif not page['done']:
+                # date/month matches need every event loaded
+                ui.timer(0, load_all_and_refresh, once=True)
+        else:
+            filtered = events
 
-            for e in events:
-                matched = False
+        render(filtered, show_more=not q and not page['done'])
 
-                # 1) Month-only match (e.g. "november", "nov")
-                if query_month is not None:
-                    try:
-                        ev_date_str = str(e.get('start_date', '')).strip()
-                        if ev_date_str:
-                            ev_date = datetime.fromisoformat(ev_date_str).date()
-                            if ev_date.month == query_month:
-                                matched = True
-                    except Exception:
-                        pass
 
-                # 2) Exact date match (e.g. "2025-11-24", "Jan 8 2025")
-                if not matched and query_date is not None:
-                    try:
-                        ev_date_str = str(e.get('start_date', '')).strip()
-                        if ev_date_str:
-                            ev_date = datetime.fromisoformat(ev_date_str).date()
-                            if ev_date == query_date:
-                                matched = True
-                    except Exception:
-                        pass
-
-                # 3) Fallback: substring text search (title, date, times, recurring text)
-                if not matched:
-                    hay = ' '.join([
-                        str(e.get('title', '')),
-                        str(e.get('start_date', '')),
-                        str(e.get('start', '')),
-                        str(e.get('end', '')),
-                        str(e.get('recurring', '')),
-                    ]).lower()
-                    if q in hay:
-                        matched = True
-
-                if matched:
-                    filtered.append(e)
+    def show_change(event_id: Any) -> None:
+        """Redraw after a write: only the touched card, unless a search is filtering the list."""
+        show_changes([event_id])
+
+    def show_changes(event_ids: List[Any]) -> None:
+        if (search_box.value or '').strip() or card_list.events is not events:
+            refresh()
         else:
-            filtered = events
+            card_list.patch_many(event_ids)
 
-        with container:
-            with ui.element('div').classes(
-                'grid grid-cols-1 md:grid-cols-2 gap-6 justify-items-center w-full pl-10'
-            ):
-                for evt in filtered:
-                    _event_card(evt)
+    async def reload_pages() -> None:
+        """Start over from the first page (after writes that aren't per event)."""
+        page.update(after_start=None, after_id=None, done=False)
+        events.clear()
+        await load_page()
+        refresh()
 
+    async def on_change(event_ids: Optional[Set[Any]]) -> None:
+        """Every committed write (this page's, other sessions', the chat assistant's): patch what it touched."""
+        if event_ids is None or len(event_ids) > EVENT_PAGE_SIZE:
+            # bulk writes (uploads): one page read beats an event read per id
+            await reload_pages()
+            return
+        for event_id in event_ids:
+            await sync_event(event_id)
+        show_changes(list(event_ids))
 
     # --------------------------------------------
-    # CRUD handlers
+    # CRUD handlers. With a DB they only write: the change bus brings every
+    # committed write back to on_change, which patches the view.
     # --------------------------------------------
-    def _update_event(original: Dict[str, Any], updated: Dict[str, Any]) -> None:
+    async def _update_event(original: Dict[str, Any], updated: Dict[str, Any]) -> None:
         """Edit -> Save"""
         if calendar_data is not None:
-            old_start_ts = original.get('_start_ts')
-            old_end_ts = original.get('_end_ts')
+            event_id = original.get('id')
 
-            if old_start_ts is not None and old_end_ts is not None:
+            if event_id is not None:
                 try:
                     # Build new timestamps
                     start_date_str = updated.get('start_date', '') or updated.get('date', '')
@@ -363,21 +270,11 @@ def show(calendar_data: Optional[Any] = None) -> None:
                     except Exception:
                         frame.recurringEndCount = None
 
-                    calendar_data.update_event(
-                        old_start_ts,     # original keys
-                        old_end_ts,
-                        frame             # new data
-                    )
-
-                    # Update UI hidden keys
-                    updated['_start_ts'] = new_start_ts
-                    updated['_end_ts'] = new_end_ts
-                    updated['id'] = f'{new_start_ts}-{new_end_ts}'
-
+                    await calendar_data.update_event_async(event_id, frame)
                 except Exception as e:
                     print(f"[EVENTS] updateEvent error: {e}")
                     ui.notify('Failed to update event in the database (events).', color='negative')
-                    return
+                return
 
         # Local update
         i = _find_index(original)
@@ -385,36 +282,31 @@ def show(calendar_data: Optional[Any] = None) -> None:
             events[i] = updated
         else:
             events.append(updated)
+        events_changed()
+        show_change(original.get('id'))
 
-        if calendar_data is not None:
-            refresh_from_db()
-        refresh()
-
-    def _remove_event(original: Dict[str, Any]) -> None:
+    async def _remove_event(original: Dict[str, Any]) -> None:
         """Delete"""
 
         if calendar_data is not None:
-            old_start_ts = original.get('_start_ts')
-            old_end_ts = original.get('_end_ts')
+            event_id = original.get('id')
 
-            if old_start_ts is not None and old_end_ts is not None:
+            if event_id is not None:
                 try:
-                    calendar_data.delete_event(old_start_ts, old_end_ts)
+                    await calendar_data.delete_event_async(event_id)
                 except Exception as e:
                     print(f"[EVENTS] deleteEvent error: {e}")
                     ui.notify('Error deleting event from database (events).', color='negative')
-                    return
+                return
 
         # Local list sync
         i = _find_index(original)
         if i >= 0:
             events.pop(i)
+            events_changed()
+        show_change(original.get('id'))
 
-        if calendar_data is not None:
-            refresh_from_db()
-        refresh()
-
-    def _create_event(new_ev: Dict[str, Any]) -> None:
+    async def _create_event(new_ev: Dict[str, Any]) -> None:
         """New -> Save"""
 
         if calendar_data is not None:
@@ -463,60 +355,27 @@ def show(calendar_data: Optional[Any] = None) -> None:
                 frame.recurringEndCount = None
 
             try:
-                calendar_data.addData(frame)
+                await calendar_data.add_data_async(frame)
             except Exception as e:
                 print(f"[EVENTS] DB create error: {e}")
                 ui.notify('Error saving new event to database.', color='negative')
-                return
-
-            # Attach hidden fields so later edits/deletes know their DB keys
-            new_ev['_start_ts'] = start_ts
-            new_ev['_end_ts'] = end_ts
-            new_ev['id'] = f'{start_ts}-{end_ts}'
-
-        events.append(new_ev)
-
-        if calendar_data is not None:
-            refresh_from_db()
-        refresh()
+        else:
+            events.append(new_ev)
+            events_changed()
+            show_change(new_ev.get('id'))
 
     # --------------------------------------------
-    # One event card
+    # Event cards (a virtual list once there are many)
     # --------------------------------------------
-    def _event_card(evt: Dict[str, Any]) -> None:
-        with ui.card().classes(
-            'w-full max-w-[95%] md:max-w-[90%] rounded-xl bg-gray-200 shadow-sm q-pa-md '
-            'hover:shadow-md transition-all duration-200 z-0 box-border'
-        ):
-            with ui.row().classes('items-start justify-between w-full min-w-0'):
-                ui.label(evt['title']).classes(
-                    'text-body1 text-weight-medium truncate break-words max-w-[240px] md:max-w-[260px]'
-                )
-                ui.label(_date_badge(evt['start_date'])).classes('text-weight-bold text-grey-7')
-
-            ui.separator().classes('q-my-sm')
-
-            with ui.row().classes('items-center justify-between text-grey-8 text-caption w-full min-w-0'):
-                ui.label(f"{evt.get('start','')} → {evt.get('end','')}").classes('truncate')
-                if evt.get('recurring'):
-                    with ui.row().classes('items-center gap-1 min-w-0'):
-                        ui.icon('autorenew').classes('text-[16px]')
-                        ui.label(evt['recurring']).classes('truncate')
-
-            ui.separator().classes('q-my-sm')
-
-            with ui.row().classes('items-center justify-around text-grey-7'):
-                ui.icon('edit_note').classes('cursor-pointer hover:text-primary text-2xl').on(
-                    'click',
-                    lambda _=None, ev=evt: open_edit_dialog(
-                        ev,
-                        on_save=lambda updated, original=ev: _update_event(original, updated),
-                        on_delete=lambda original=ev: _remove_event(original),
-                    )
-                )
-                ui.icon('delete').classes('cursor-pointer hover:text-negative text-2xl').on(
-                    'click', lambda _=None, original=evt: _remove_event(original)
-                )
+    def _edit(ev: Dict[str, Any]) -> None:
+        open_edit_dialog(
+            ev,
+            on_save=lambda updated, original=ev: _update_event(original, updated),
+            on_delete=lambda original=ev: _remove_event(original),
+        )
+
+    card_list = EventCardList(container, on_edit=_edit, on_delete=_remove_event,
+                              on_end_reached=on_end_reached)
 
     # --------------------------------------------
     # FABs
@@ -555,4 +414,11 @@ def show(calendar_data: Optional[Any] = None) -> None:
     search_box.on('blur', lambda *_: refresh())
     search_box.on('change', lambda *_: refresh())
 
+    async def load():
+        await load_page()
+        refresh()
+
     refresh()
+    if calendar_data is not None:
+        ui.timer(0, load, once=True)
+        subscribe_view(calendar_data, on_change)
@@ -4,9 +4,23 @@ from datetime import date, timedelta, datetime
 import calendar
 
 from app.components import upcoming_events
+from app.live_updates import subscribe_view
 from app.sharedVars import SharedVars
 
 
+def month_grid_range(year: int, month: int):
+    """First day of a month's 7x6 grid and the unix range it covers."""
+    first_day = date(year, month, 1)
+
+    # find the sunday before the first day so grid is always 7x6
+    start_day = first_day - timedelta(days=(first_day.weekday() + 1) % 7)
+    last_day = start_day + timedelta(days=41)
+
+    start_day_unix = int(datetime.combine(start_day, datetime.min.time()).timestamp())
+    last_day_unix = int(datetime.combine(last_day, datetime.max.time()).timestamp())
+    return start_day, start_day_unix, last_day_unix
+
+
 # TODO: this should be a component, then home.py should create a Calendar object
 class Calendar:
     def __init__(self, calendar_data):
@@ -19,25 +33,38 @@ class Calendar:
         self.sharedData = SharedVars()
         self.month_event_data = None
         self.calendar_data = calendar_data
+        self.render_count = 0
+        self.day_cells = []
 
-    def generate_month(self, year: int, month: int):
-        first_day = date(year, month, 1)
+    async def generate_month(self, year: int, month: int):
+        start_day, start_day_unix, last_day_unix = month_grid_range(year, month)
 
-        # find the sunday before the first day so grid is always 7x6
-        start_day = first_day - timedelta(days=(first_day.weekday() + 1) % 7)
-        last_day = start_day + timedelta(days=41)
-
-        start_day_unix = int(datetime.combine(start_day, datetime.min.time()).timestamp())
-        last_day_unix = int(datetime.combine(last_day, datetime.max.time()).timestamp())
-
-        self.month_event_data = self.calendar_data.find_events_in_range_main_cal(start_day_unix, last_day_unix)
+        event_data = await self.calendar_data.find_events_in_range_main_cal_async(start_day_unix, last_day_unix)
 
         # 6 weeks displayed, so 42 days
-        return [start_day + timedelta(days=i) for i in range(42)]
+        return [start_day + timedelta(days=i) for i in range(42)], event_data
+
+    def prefetch_adjacent_months(self):
+        # warm the cache for the months < and > lead to while the user looks at this one
+        month_index = self.state["year"] * 12 + self.state["month"] - 1
+        for offset in (-1, 1):
+            year, month = divmod(month_index + offset, 12)
+            if 1 <= year <= 9999:
+                _, start_day_unix, last_day_unix = month_grid_range(year, month + 1)
+                self.calendar_data.prefetch_main_cal(start_day_unix, last_day_unix)
+
+    async def render_calendar(self):
+        # a newer click may finish its query first; only the latest render draws
+        self.render_count += 1
+        render_id = self.render_count
+        days, event_data = await self.generate_month(self.state["year"], self.state["month"])
+        if render_id != self.render_count:
+            return
+        self.month_event_data = event_data
+        self.prefetch_adjacent_months()
 
-    def render_calendar(self):
         self.calendar_container.clear()  # clear old calendar or it stacks
-        days = self.generate_month(self.state["year"], self.state["month"])
+        self.day_cells = []
 
         with self.calendar_container:
             with ui.grid(columns=7).classes('gap-x-4 gap-y-2 justify-center'):
@@ -93,40 +120,60 @@ class Calendar:
                         dialog.open()
 
                     # card is one day cell
-                    with ui.card().classes(f'w-24 h-24 block p-2 {bg}').on('click', show_day_modal):
-                        weekend = 'text-red' if (day.weekday() == 5 or day.weekday() == 6) else 'text-black' #Sun/Sat Red
-                        ui.label(str(day.day)).classes(f'{weekend}')
-                        if day_events := self.month_event_data.get(index): #get names of evenrs
-                            with ui.element('div').classes('flex flex-nowrap items-center overflow-hidden'):
-                                ui.icon('circle').classes('text-blue-500 text-xs pr-1')
-                                ui.label(f"{day_events[0][0]}").classes("overflow-hidden whitespace-nowrap text-ellipsis min-w-0")
-                            if len(day_events) > 1:
-                                with ui.element('div').classes('flex flex-nowrap items-center overflow-hidden'):
-                                    ui.icon('circle').classes('text-blue-500 text-xs pr-1')
-                                    ui.label(f"{day_events[1][0]}").classes("overflow-hidden whitespace-nowrap text-ellipsis min-w-0")
-                            if len(day_events) > 2:  #if more than two events
-                                num_events = len(day_events) - 2
-                                ui.label(f"+{num_events} More").classes('text-center')
-
-    def prev_month(self):
+                    with ui.card().classes(f'w-24 h-24 block p-2 {bg}').on('click', show_day_modal) as cell:
+                        self.fill_day_cell(index, day)
+                    self.day_cells.append(cell)
+
+    def fill_day_cell(self, index, day):
+        weekend = 'text-red' if (day.weekday() == 5 or day.weekday() == 6) else 'text-black' #Sun/Sat Red
+        ui.label(str(day.day)).classes(f'{weekend}')
+        if day_events := self.month_event_data.get(index): #get names of evenrs
+            with ui.element('div').classes('flex flex-nowrap items-center overflow-hidden'):
+                ui.icon('circle').classes('text-blue-500 text-xs pr-1')
+                ui.label(f"{day_events[0][0]}").classes("overflow-hidden whitespace-nowrap text-ellipsis min-w-0")
+            if len(day_events) > 1:
+                with ui.element('div').classes('flex flex-nowrap items-center overflow-hidden'):
+                    ui.icon('circle').classes('text-blue-500 text-xs pr-1')
+                    ui.label(f"{day_events[1][0]}").classes("overflow-hidden whitespace-nowrap text-ellipsis min-w-0")
+            if len(day_events) > 2:  #if more than two events
+                num_events = len(day_events) - 2
+                ui.label(f"+{num_events} More").classes('text-center')
+
+    async def refresh_changed_days(self, _event_ids=None):
+        # an event was written (here, in another tab or by the assistant):
+        # re-read the grid and redraw only the day cells whose events changed
+        if self.month_event_data is None:
+            return
+        render_id = self.render_count
+        days, event_data = await self.generate_month(self.state["year"], self.state["month"])
+        if render_id != self.render_count:
+            return  # the month was switched meanwhile; that render draws it
+        old_data, self.month_event_data = self.month_event_data, event_data
+        for index, cell in enumerate(self.day_cells):
+            if old_data.get(index) != event_data.get(index):
+                cell.clear()
+                with cell:
+                    self.fill_day_cell(index, days[index])
+
+    async def prev_month(self):
         # wraparound jan -> dec
         if self.state["month"] == 1:
             self.state["month"] = 12
             self.state["year"] -= 1
         else:
             self.state["month"] -= 1
-        self.update_state(self.state["month"], self.state["year"])
+        await self.update_state(self.state["month"], self.state["year"])
 
-    def next_month(self):
+    async def next_month(self):
         # wraparound dec -> jan
         if self.state["month"] == 12:
             self.state["month"] = 1
             self.state["year"] += 1
         else:
             self.state["month"] += 1
-        self.update_state(self.state["month"], self.state["year"])
+        await self.update_state(self.state["month"], self.state["year"])
 
-    def update_state(self, month, year):
+    async def update_state(self, month, year):
         self.state["month"] = month
         self.state["year"] = year
 
@@ -135,7 +182,7 @@ class Calendar:
         if self.year_select:
             self.year_select.set_value(str(self.state["year"]))
 
-        self.render_calendar()
+        await self.render_calendar()
 
     def show(self):
         months = list(calendar.month_name)[1:]
@@ -145,13 +192,13 @@ class Calendar:
         with ui.column().classes('justify-center items-center w-full'):
             #dropdowns with month and year
             with ui.row():
-                def on_month_change(e):
+                async def on_month_change(e):
                     month_index = months.index(e.value) + 1
-                    self.update_state(month_index, self.state["year"])
+                    await self.update_state(month_index, self.state["year"])
 
-                def on_year_change(e):
+                async def on_year_change(e):
                     year_value = int(e.value)
-                    self.update_state(self.state["month"], year_value)
+                    await self.update_state(self.state["month"], year_value)
 
                 self.month_select = ui.select(
                     options=months,
@@ -171,7 +218,9 @@ class Calendar:
                 self.calendar_container = ui.column().classes('items-center mb-4')
                 ui.button('>', on_click=self.next_month).classes('w-10 h-10 self-center')
 
-            self.render_calendar()
+            # events load off the event loop once the client is connected
+            ui.timer(0, self.render_calendar, once=True)
+            subscribe_view(self.calendar_data, self.refresh_changed_days)
 
 
 class Dates:
@@ -181,10 +230,10 @@ class Dates:
         self.month_abr = calendar.month_abbr[self.today.month]
         self.calendar_data = calendar_data
         self.num_of_days = calendar.monthrange(self.state["year"], self.state["month"])[1]
-        self.dict = self.populate()
-
+        self.dict = {}
+        self.dates_row = None
 
-    def populate(self):
+    async def populate(self):
         first_day = date(self.state["year"], self.state["month"], 1)
         #always get last day of any month
         last_day = date(self.state["year"], self.state["month"], self.num_of_days)
@@ -192,50 +241,69 @@ class Dates:
         start_day_unix = int(datetime.combine(first_day, datetime.min.time()).timestamp())
         last_day_unix = int(datetime.combine(last_day, datetime.max.time()).timestamp())
 
-        return self.calendar_data.find_events_in_range_imp_date(start_day_unix, last_day_unix, self.num_of_days)
+        return await self.calendar_data.find_events_in_range_imp_date_async(start_day_unix, last_day_unix, self.num_of_days)
 
     def show(self):
         ui.label("Important Dates").classes('w-full text-center text-2xl mt-4 font-bold')
         ui.label(f"{calendar.month_name[self.state['month']]} {self.state['year']}").classes('w-full text-center text-xl font-bold')
         with ui.element().classes('flex flex-col w-full grow overflow-y-hidden').style("height: calc(100vh - 250px);"):
             with ui.element().classes("w-full overflow-x-auto overflow-y-hidden whitespace-nowrap p-4 pb-2").style("flex: none"):
-                with ui.row().classes('flex-nowrap gap-4 p-4'):
-                    for item in self.dict:
-                        with ui.card().classes('shrink-0 p-4 shadow-md inline-block bg-gray-300').style("width: calc(100vw / 4.5); height: 600px;"):
-                            ui.label(f"{self.month_abr} {int(item) + 1}").classes('w-full text-center font-bold text-xl mb-4')
-                            max_events = 5
-                            counter = 0
-                            for event in self.dict[item]:
-                                if counter < max_events:
-                                    with ui.card().classes('w-full h-20 p-2 flex justify-between mb-2'):
-                                        # LS
-                                        with ui.element('div').classes('flex flex-col shrink overflow-hidden min-w-0'):
-                                            ui.label(f"{event[0]}").classes(
-                                                'text-ellipsis whitespace-nowrap overflow-hidden min-w-0 max-w-40 mb-5')
-                                            if event[4]:  # If is a recurring event
-                                                string = ""
-                                                match event[6]:  # check type of recurrence
-                                                    case 1:
-                                                        string = f"Every {event[8]} Days" if event[8] > 1 else "Daily"
-                                                    case 2:
-                                                        string = f"Every {event[8]} Weeks" if event[8] > 1 else "Weekly"
-                                                    case 3:
-                                                        string = f"Every {event[8]} Months" if event[8] > 1 else "Monthly"
-                                                    case 4:
-                                                        string = f"Every {event[8]} Years" if event[8] > 1 else "Yearly"
-                                                with ui.element('div').classes('flex'):
-                                                    ui.icon('cached').classes('pt-1 pr-1')
-                                                    ui.label(f"{string}")
-
-                                        with ui.element('div').classes(
-                                                'h-full block ml-auto justify-right items-end text-right'):
-                                            ui.label(f"{datetime.fromtimestamp(event[1]).strftime('%H:%M')}")
-                                            ui.label("to")
-                                            ui.label(f"{datetime.fromtimestamp(event[2]).strftime('%H:%M')}")
-                                    counter += 1
-                            if len(self.dict[item]) > max_events:
-                                ui.label(f"+{len(self.dict[item]) - max_events} More").classes(
-                                    'w-full text-center text-xl mb-4')
+                self.dates_row = ui.row().classes('flex-nowrap gap-4 p-4')
+
+        # events load off the event loop once the client is connected
+        ui.timer(0, self.render_dates, once=True)
+        subscribe_view(self.calendar_data, self.refresh_dates)
+
+    async def render_dates(self):
+        self.dict = await self.populate()
+        self.draw_dates()
+
+    async def refresh_dates(self, _event_ids=None):
+        # only a handful of cards: redraw them when anything in the month changed
+        fresh = await self.populate()
+        if fresh != self.dict:
+            self.dict = fresh
+            self.draw_dates()
+
+    def draw_dates(self):
+        self.dates_row.clear()
+        with self.dates_row:
+            for item in self.dict:
+                with ui.card().classes('shrink-0 p-4 shadow-md inline-block bg-gray-300').style("width: calc(100vw / 4.5); height: 600px;"):
+                    ui.label(f"{self.month_abr} {int(item) + 1}").classes('w-full text-center font-bold text-xl mb-4')
+                    max_events = 5
+                    counter = 0
+                    for event in self.dict[item]:
+                        if counter < max_events:
+                            with ui.card().classes('w-full h-20 p-2 flex justify-between mb-2'):
+                                # LS
+                                with ui.element('div').classes('flex flex-col shrink overflow-hidden min-w-0'):
+                                    ui.label(f"{event[0]}").classes(
+                                        'text-ellipsis whitespace-nowrap overflow-hidden min-w-0 max-w-40 mb-5')
+                                    if event[4]:  # If is a recurring event
+                                        string = ""
+                                        match event[6]:  # check type of recurrence
+                                            case 1:
+                                                string = f"Every {event[8]} Days" if event[8] > 1 else "Daily"
+                                            case 2:
+                                                string = f"Every {event[8]} Weeks" if event[8] > 1 else "Weekly"
+                                            case 3:
+                                                string = f"Every {event[8]} Months" if event[8] > 1 else "Monthly"
+                                            case 4:
+                                                string = f"Every {event[8]} Years" if event[8] > 1 else "Yearly"
+                                        with ui.element('div').classes('flex'):
+                                            ui.icon('cached').classes('pt-1 pr-1')
+                                            ui.label(f"{string}")
+
+                                with ui.element('div').classes(
+                                        'h-full block ml-auto justify-right items-end text-right'):
+                                    ui.label(f"{datetime.fromtimestamp(event[1]).strftime('%H:%M')}")
+                                    ui.label("to")
+                                    ui.label(f"{datetime.fromtimestamp(event[2]).strftime('%H:%M')}")
+                            counter += 1
+                    if len(self.dict[item]) > max_events:
+                        ui.label(f"+{len(self.dict[item]) - max_events} More").classes(
+                            'w-full text-center text-xl mb-4')
 
 
 class HomeTabs:
@@ -2,14 +2,13 @@ from nicegui import events, ui, app
 import asyncio
 import os
 from llmmodule import pipeline
-from dbmodule.sql import Sql
-from dbmodule.calendardata import CalendarData
 from app.components.schedule_event import ScheduleEvent, UploadedEventDataFrame
 
 UPLOAD_DIRECTORY = "uploaded_schedule_files"
 
 class UploadSchedule:
-    def __init__(self):
+    def __init__(self, calendar_data):
+        self.calendar_data = calendar_data
         self.upload_id = "upload_button"
         self.uploaded_file = None
         self.uploaded_file_name = None
@@ -23,24 +22,25 @@ class UploadSchedule:
     async def on_save_clicked(self, e=None):
         all_data = [comp.get_data() for comp in self.event_components]
         print("Collected:", all_data)
-        
-        sql_db = Sql()
-        calendar_data = CalendarData(sql_db)
 
-        calendar_data.build_data()
-
-        for item in all_data:
-            df = UploadedEventDataFrame(
+        frames = [
+            UploadedEventDataFrame(
                 name=item["event_name"],
                 day=item["day_of_the_week"],
                 desc=item["desc"],
             )
-            calendar_data.add_data(df)
-
-        sql_db.conn.commit()
-        sql_db.terminate()
-        
-        ui.notify("Saved schedule to database!", color="green", position="bottom-right")
+            for item in all_data
+        ]
+        outcomes = await self.calendar_data.add_many_async(frames)
+        failed = [err for err in outcomes if err is not None]
+        for err in failed:
+            print(f"[UPLOAD] event not saved: {err}")
+
+        if failed:
+            ui.notify(f"Saved {len(frames) - len(failed)} of {len(frames)} events; some could not be saved.",
+                      color="orange", position="bottom-right")
+        else:
+            ui.notify("Saved schedule to database!", color="green", position="bottom-right")
 
         await asyncio.sleep(1.0)
 
@@ -0,0 +1,227 @@
+# app/reminders.py
+from __future__ import annotations
+import asyncio
+import heapq
+import inspect
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from nicegui import Client, ui
+from dbmodule.alerts import REMINDER_OPTIONS
+from dbmodule.calendardata import ALERT_PAGE_SIZE
+from dbmodule.changes import EventChange
+from dbmodule.record import format_time_12h
+
+logger = logging.getLogger(__name__)
+
+# rebuild the heap once more than this share of it is superseded entries
+STALE_COMPACT_RATIO = 0.5
+# seconds to wait before reloading after a failed DB read
+REMINDER_RETRY_SECONDS = 30
+
+_REMINDER_LABELS = {minutes: label for label, minutes in REMINDER_OPTIONS.items()}
+
+
+def notify_clients(name: str, start: float, minutes: int) -> None:
+    """Show a reminder on every connected client."""
+    when = _REMINDER_LABELS.get(minutes, f'{minutes} minutes before')
+    message = f"Reminder: {name} at {format_time_12h(datetime.fromtimestamp(start))} ({when.lower()})"
+    for client in list(Client.instances.values()):
+        if client.has_socket_connection:
+            with client:
+                ui.notify(message, type='info', position='top-right', close_button='Dismiss')
+
+
+class ReminderScheduler:
+    """
+    Fires event reminders in process from the event_alerts table. The next
+    page of alerts by next_fire_at (one indexed range query) is kept in a
+    min-heap; the task sleeps until the earliest one and is woken early
+    only by writes. After an alert fires its next_fire_at is advanced in
+    the table (to the series' next repeat, or NULL), so a restart resumes
+    from the table instead of decoding every event's alerting_options.
+    A write re-reads just the alerts of the events it names: their heap
+    entries are superseded by bumping a per-event generation (skipped when
+    popped) and the new ones are pushed, so every change and every fire
+    is O(log n).
+    """
+
+    def __init__(self, calendar_data: Any, deliver: Callable[[str, float, int], Any] = notify_clients,
+                 page_size: int = ALERT_PAGE_SIZE):
+        self.calendar_data = calendar_data
+        self.deliver = deliver
+        self.page_size = page_size
+
+        # (fire_at, event_id, minutes, generation, name)
+        self.heap: List[Tuple] = []
+        # every alert with a (fire_at, event_id, minutes) key up to this one
+        # is in the heap; None with loaded_all False means nothing is loaded
+        self.loaded_through: Optional[Tuple] = None
+        self.loaded_all = False
+        self.fired = 0
+        self._generation: Dict[Any, int] = {}
+        self._live: Dict[Any, int] = {}     # event id -> current-generation entries in the heap
+        self._stale = 0
+
+        self._changed: set = set()
+        self._reload = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        """Start on the running event loop (NiceGUI app.on_startup)."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._reload = True
+        self.calendar_data.changes.subscribe(self._on_change)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.calendar_data.changes.unsubscribe(self._on_change)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_change(self, change: EventChange) -> None:
+        # runs on whichever thread committed the write
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._note_change, change.event_ids)
+
+    def _note_change(self, event_ids: Optional[Iterable[Any]]) -> None:
+        if event_ids is None:
+            self._reload = True
+        else:
+            self._changed.update(event_ids)
+        self._wake.set()
+
+    # ---- heap ----
+    def _covers(self, fire_at: float, event_id: Any, minutes: int) -> bool:
+        # alerts past the loaded page are read with a later page instead
+        return self.loaded_all or (self.loaded_through is not None
+                                   and (fire_at, event_id, minutes) <= self.loaded_through)
+
+    def _push(self, fire_at: float, event_id: Any, minutes: int, name: str) -> None:
+        generation = self._generation.get(event_id, 0)
+        heapq.heappush(self.heap, (fire_at, event_id, minutes, generation, name))
+        self._live[event_id] = self._live.get(event_id, 0) + 1
+
+    def _supersede(self, event_id: Any) -> None:
+        self._generation[event_id] = self._generation.get(event_id, 0) + 1
+        self._stale += self._live.pop(event_id, 0)
+        if self._stale > len(self.heap) * STALE_COMPACT_RATIO:
+            self.heap = [entry for entry in self.heap if entry[3] == self._generation.get(entry[1], 0)]
+            heapq.heapify(self.heap)
+            self._stale = 0
+
+    # ---- DB reads (on the DB executor) ----
+    def _startup_alerts(self, now: float) -> List[Tuple]:
+        self.calendar_data.refresh_alerts(now)
+        return self.calendar_data.next_alerts(None, self.page_size)
+
+    async def _reload_alerts(self, now: float) -> None:
+        self.heap = []
+        self._live = {}
+        self._stale = 0
+        self.loaded_through = None
+        self.loaded_all = False
+        rows = await self.calendar_data.run_async(self._startup_alerts, now)
+        self._load(rows)
+
+    async def _load_next_page(self) -> None:
+        rows = await self.calendar_data.run_async(
+            self.calendar_data.next_alerts, self.loaded_through, self.page_size)
+        self._load(rows)
+
+    def _load(self, rows: List[Tuple]) -> None:
+        for fire_at, event_id, minutes, name in rows:
+            self._push(fire_at, event_id, minutes, name)
+        if rows:
+            self.loaded_through = tuple(rows[-1][:3])
+        if len(rows) < self.page_size:
+            self.loaded_all = True
+
+    def _event_alerts(self, event_id: Any) -> List[Tuple]:
+        # events written outside CalendarData (the chat assistant) are still pending
+        self.calendar_data.refresh_alerts()
+        return self.calendar_data.get_event_alerts(event_id)
+
+    async def _refresh_event(self, event_id: Any) -> None:
+        self._supersede(event_id)
+        rows = await self.calendar_data.run_async(self._event_alerts, event_id)
+        for fire_at, _, minutes, name in rows:
+            if self._covers(fire_at, event_id, minutes):
+                self._push(fire_at, event_id, minutes, name)
+
+    # ---- firing ----
+    async def _fire_due(self, now: float) -> None:
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, event_id, minutes, generation, name = heapq.heappop(self.heap)
+            if generation != self._generation.get(event_id, 0):
+                self._stale -= 1
+                continue
+            self._live[event_id] -= 1
+            self.fired += 1
+            try:
+                result = self.deliver(name, fire_at + minutes * 60, minutes)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("delivering reminder for event %s failed", event_id)
+            try:
+                next_fire = await self.calendar_data.run_async(
+                    self.calendar_data.advance_alert, event_id, minutes, fire_at)
+            except Exception:
+                logger.exception("advancing reminder for event %s failed", event_id)
+                continue
+            if (next_fire is not None and generation == self._generation.get(event_id, 0)
+                    and self._covers(next_fire, event_id, minutes)):
+                self._push(next_fire, event_id, minutes, name)
+
+    async def _run(self) -> None:
+        while True:
+            # cleared before handling changes, so one noted meanwhile wakes the next wait
+            self._wake.clear()
+            try:
+                if self._reload:
+                    self._reload = False
+                    self._changed.clear()
+                    await self._reload_alerts(time.time())
+                while self._changed:
+                    await self._refresh_event(self._changed.pop())
+                if len(self.heap) == self._stale and not self.loaded_all:
+                    # every loaded alert has fired: read the next page
+                    await self._load_next_page()
+            except Exception:
+                logger.exception("loading reminders failed; retrying in %ss", REMINDER_RETRY_SECONDS)
+                self._reload = True
+                await asyncio.sleep(REMINDER_RETRY_SECONDS)
+                continue
+            await self._fire_due(time.time())
+            if len(self.heap) == self._stale and not self.loaded_all:
+                continue
+
+            timeout = None
+            if self.heap:
+                timeout = max(0.0, self.heap[0][0] - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self.heap) - self._stale,
+            "superseded": self._stale,
+            "fired": self.fired,
+            "loaded_through": self.loaded_through[0] if self.loaded_through else None,
+            "loaded_all": self.loaded_all,
+        }
@@ -9,6 +9,10 @@ class SharedVars:
 		self.STORAGE_SECRET = 'followupPortal'
 		self.ADDEDIT_DATA_KEY = 'addEditData'
 		self.DATA_DEFAULT_VALUE = 'No data'
+		# EVENT_SNAPSHOT=1 serves calendar range lookups from memory instead of SQLite
+		self.EVENT_SNAPSHOT = os.getenv('EVENT_SNAPSHOT', '0') == '1'
+		# /admin/* endpoints answer only requests carrying this token; unset disables them
+		self.ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
 
 
 @dataclass
@@ -25,6 +29,7 @@ class AddEditEventData:
 	recurringEndOptionIndex: int = 0
 	recurringEndDate: float | None = None
 	recurringEndCount: int | None = None
+	eventId: int | None = None
 
 @dataclass
 class EventDateTime:
@@ -0,0 +1,129 @@
+#! /usr/bin/env python3
+"""
+Memory benchmark: bytes kept per loaded event by the old read path (an
+AddEditEventData per row, then a 20-key UI dict with every date and time
+formatted up front) against EventRecord rows from the sqlite3 row factory,
+before and after the card fields are formatted.
+
+Run from the repo root:  python -m benchmarks.bench_event_memory
+"""
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from app.sharedVars import AddEditEventData
+from dbmodule.sql import Sql
+from dbmodule.calendardata import CalendarData, INSERT_EVENT_QUERY, SELECT_ALL_QUERY
+from dbmodule.record import EventRecord, format_time_12h, recurring_label
+
+ROWS = 20000
+BASE = 1_700_000_000
+
+
+def _fill(cal):
+    rows = [
+        (f"event {i}", BASE + i * 3600, BASE + i * 3600 + 1800, f"notes for event {i}",
+         i % 5 == 0, 1, 2 if i % 5 == 0 else 0, '["15 minutes before"]', 1, 0, None, None)
+        for i in range(ROWS)
+    ]
+    cal.sql.conn.executemany(INSERT_EVENT_QUERY, rows)
+    cal.sql.commit()
+
+
+def _old_frame(row):
+    # the replaced calendardata.frame_from_row
+    frame = AddEditEventData()
+    frame.eventName = row[0]
+    frame.eventStartDate = row[1]
+    frame.eventEndDate = row[2]
+    frame.eventDescription = row[3]
+    frame.isRecurringEvent = row[4]
+    frame.isAlerting = row[5]
+    frame.recurringEventOptionIndex = row[6]
+    frame.selectedAlertCheckboxes = json.loads(row[7]) if row[7] else []
+    frame.recurringInterval = row[8]
+    frame.recurringEndOptionIndex = row[9]
+    frame.recurringEndDate = row[10]
+    frame.recurringEndCount = row[11]
+    frame.eventId = row[12]
+    return frame
+
+
+def _old_dict(df):
+    # the replaced pages' _from_data_frame, minus its fallbacks
+    start_dt = datetime.fromtimestamp(df.eventStartDate)
+    end_dt = datetime.fromtimestamp(df.eventEndDate)
+    idx = int(df.recurringEventOptionIndex or 0)
+    interval = int(df.recurringInterval or 1)
+    alerts = [str(x) for x in df.selectedAlertCheckboxes]
+    return {
+        'id': df.eventId,
+        'title': df.eventName,
+        'start_date': start_dt.strftime('%Y-%m-%d'),
+        'end_date': end_dt.strftime('%Y-%m-%d'),
+        'start': format_time_12h(start_dt),
+        'end': format_time_12h(end_dt),
+        'recurring': recurring_label(idx, interval),
+        '_start_ts': df.eventStartDate,
+        '_end_ts': df.eventEndDate,
+        'description': df.eventDescription or '',
+        'is_recurring': bool(df.isRecurringEvent),
+        'is_alerting': bool(df.isAlerting),
+        'recurring_option_index': idx,
+        'recurring_interval': interval,
+        'recurring_end_option_index': int(df.recurringEndOptionIndex or 0),
+        'recurring_end_date': None,
+        'recurring_end_count': df.recurringEndCount,
+        'selectedAlertCheckboxes': alerts,
+        'reminders': alerts,
+    }
+
+
+def _retained(label, load):
+    """Bytes still allocated after load() returns (its result is kept alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = load()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{label:<36} {size / ROWS:8.0f} bytes/event")
+    return size, kept
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        sql_instance = Sql(os.path.join(tmp, "bench.db"))
+        cal = CalendarData(sql_instance)
+        cal.build_data()
+        _fill(cal)
+        conn = sql_instance.conn
+
+        def old_path():
+            return [_old_dict(_old_frame(row)) for row in conn.execute(SELECT_ALL_QUERY).fetchall()]
+
+        def records():
+            cursor = conn.cursor()
+            cursor.row_factory = EventRecord.factory
+            return cursor.execute(SELECT_ALL_QUERY).fetchall()
+
+        old, _ = _retained("AddEditEventData + dict (old)", old_path)
+        new, kept = _retained("EventRecord, unformatted", records)
+
+        def format_cards():
+            # what an event card reads
+            for record in kept:
+                record['start_date'], record['start'], record['end'], record['recurring']
+            return kept
+
+        formatted, _ = _retained("  + card fields formatted", format_cards)
+        print(f"saving: {old / new:.2f}x unformatted, {old / (new + formatted):.2f}x once drawn")
+        sql_instance.terminate()
+
+
+if __name__ == "__main__":
+    main()
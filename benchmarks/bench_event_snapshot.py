@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+"""
+Benchmark: 42-day month-grid range lookups through SQLite (the UNION ALL
+window query) against the in-memory EventSnapshot. The month cache is
+bypassed, so every lookup does the full work.
+
+Run from the repo root:  python -m benchmarks.bench_event_snapshot
+"""
+import os
+import tempfile
+import time
+
+from dbmodule.sql import Sql
+from dbmodule.calendardata import CalendarData, DAY_IN_SECONDS, INSERT_EVENT_QUERY
+
+ROWS = 20000
+SERIES = 200
+LOOKUPS = 2000
+GRID = 42 * DAY_IN_SECONDS
+BASE = time.time() - 365 * DAY_IN_SECONDS
+
+
+def _fill(cal):
+    # one-off events spread over two years, plus weekly series
+    rows = [
+        (f"event {i}", BASE + i * 3600, BASE + i * 3600 + 1800, "", 0, 0, 0, "[]", 0, 0, None, None)
+        for i in range(ROWS)
+    ]
+    rows += [
+        (f"series {i}", BASE + i * 3600, BASE + i * 3600 + 1800, "", 1, 0, 2, "[]", 1, 0, None, None)
+        for i in range(SERIES)
+    ]
+    cal.sql.conn.executemany(INSERT_EVENT_QUERY, rows)
+    cal.sql.commit()
+    cal.mark_changed()
+
+
+def _time(label, cal):
+    found = 0
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        lo = BASE + (i % 700) * DAY_IN_SECONDS
+        found += len(cal.get_events_within_range(lo, lo + GRID))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed * 1000:8.1f} ms  ({elapsed / LOOKUPS * 1e3:6.2f} ms/grid, {found / LOOKUPS:.0f} rows)")
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        sql_instance = Sql(os.path.join(tmp, "bench.db"))
+        cal = CalendarData(sql_instance)
+        cal.build_data()
+        _fill(cal)
+        cal.refresh_occurrences()
+
+        sql_time = _time("SQLite window query", cal)
+
+        cal.set_snapshot(True)
+        start = time.perf_counter()
+        snapshot = cal.current_snapshot()
+        print(f"snapshot build           {(time.perf_counter() - start) * 1000:8.1f} ms  ({len(snapshot)} entries)")
+        snapshot_time = _time("EventSnapshot", cal)
+        print(f"speedup: {sql_time / snapshot_time:.2f}x")
+
+        cal.shutdown()
+        sql_instance.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#! /usr/bin/env python3
+"""
+Benchmark: expanding a year of repeats for thousands of recurring series,
+one series at a time against the batched occurrence_starts_many() (array
+arithmetic when NumPy is installed).
+
+Run from the repo root:  python -m benchmarks.bench_recurrence_batch
+"""
+import time
+from datetime import datetime
+
+from dbmodule import recurrence
+
+SERIES = 5000
+
+
+def _rows():
+    base = datetime(2024, 1, 1, 9).timestamp()
+    # daily, weekly, monthly and yearly series with intervals 1-3, same layout as SELECT_LIST
+    return [
+        ("e", base + i * 3600, base + i * 3600 + 1800, "", 1, 0, 1 + i % 4, "[]", 1 + i % 3, 0, None, None, i)
+        for i in range(SERIES)
+    ]
+
+
+def _time(label, fn):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms  ({count} repeats)")
+    return elapsed
+
+
+def main():
+    rows = _rows()
+    lo = datetime(2025, 1, 1).timestamp()
+    hi = datetime(2026, 1, 1).timestamp()
+
+    def one_by_one():
+        return sum(len(recurrence.occurrence_starts(row, lo, hi)) for row in rows)
+
+    def batched():
+        return len(recurrence.occurrence_starts_many(rows, lo, hi)[1])
+
+    old = _time("series one by one", one_by_one)
+    if recurrence.np is None:
+        print("NumPy not installed: occurrence_starts_many() uses the same loop")
+        return
+    new = _time("batched (NumPy)", batched)
+    print(f"speedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
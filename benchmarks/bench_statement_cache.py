@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+"""
+Micro-benchmark: f-string SQL (a new statement text per call, parsed every
+time) against ? bound statements that hit sqlite3's statement cache.
+
+Run from the repo root:  python -m benchmarks.bench_statement_cache
+"""
+import os
+import tempfile
+import time
+
+from dbmodule.sql import Sql
+from dbmodule.calendardata import CalendarData, Event, INSERT_EVENT_QUERY, SELECT_LIST, SELECT_RANGE_QUERY
+
+ROWS = 2000
+LOOKUPS = 5000
+WINDOW = 3600   # one row per lookup, so parse cost dominates
+BASE = 1_700_000_000
+
+
+def _fill(cal):
+    rows = [
+        (f"event {i}", BASE + i * 3600, BASE + i * 3600 + 1800, "", 0, 0, 0, "[]", 0, 0, None, None)
+        for i in range(ROWS)
+    ]
+    cal.sql.conn.executemany(INSERT_EVENT_QUERY, rows)
+    cal.sql.commit()
+
+
+def _time(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms  ({elapsed / LOOKUPS * 1e6:6.1f} us/query)")
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        sql_instance = Sql(os.path.join(tmp, "bench.db"))
+        cal = CalendarData(sql_instance)
+        cal.build_data()
+        _fill(cal)
+        conn = sql_instance.conn
+
+        def formatted():
+            for i in range(LOOKUPS):
+                lo = BASE + (i % ROWS) * 3600
+                conn.execute(
+                    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+                    f"WHERE {Event.START_DATE.value} BETWEEN {lo} AND {lo + WINDOW};"
+                ).fetchall()
+
+        def bound():
+            for i in range(LOOKUPS):
+                lo = BASE + (i % ROWS) * 3600
+                conn.execute(SELECT_RANGE_QUERY, (lo, lo + WINDOW)).fetchall()
+
+        old = _time("f-string statements", formatted)
+        new = _time("bound + cached statements", bound)
+        print(f"speedup: {old / new:.2f}x")
+        sql_instance.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import json
+from dbmodule import recurrence
+from dbmodule.schema import A_OPTIONS, ALERTING, ID
+
+# reminder choices offered by the UI: label -> minutes before the start
+REMINDER_OPTIONS = {
+    'At time of event': 0,
+    '5 minutes before': 5,
+    '10 minutes before': 10,
+    '15 minutes before': 15,
+    '30 minutes before': 30,
+    '1 hour before': 60,
+    '2 hours before': 120,
+    '1 day before': 1440,
+}
+
+# selectedAlertCheckboxes saved by the Add/Edit page are indexes of its
+# checkboxes: 'When it happens', '15 minutes before', '1 hour before', '1 day before'
+ADD_EDIT_ALERT_MINUTES = (0, 15, 60, 1440)
+
+
+def reminder_minutes(is_alerting, alerts):
+    """Minutes before the start at which an event's reminders fire."""
+    if not is_alerting:
+        return []
+    minutes = set()
+    for alert in alerts or []:
+        if isinstance(alert, str) and alert in REMINDER_OPTIONS:
+            minutes.add(REMINDER_OPTIONS[alert])
+        elif isinstance(alert, int) and not isinstance(alert, bool) and 0 <= alert < len(ADD_EDIT_ALERT_MINUTES):
+            minutes.add(ADD_EDIT_ALERT_MINUTES[alert])
+    # alerting with nothing picked (chat assistant, uploads): remind at the start
+    return sorted(minutes) or [0]
+
+
+def row_minutes(row):
+    """reminder_minutes() of an events row, decoding its alerting_options JSON."""
+    if not row[ALERTING]:
+        return []
+    try:
+        alerts = json.loads(row[A_OPTIONS]) if row[A_OPTIONS] else []
+    except (TypeError, ValueError):
+        alerts = []
+    return reminder_minutes(True, alerts if isinstance(alerts, list) else [])
+
+
+def next_fire_at(row, minutes, after):
+    """
+    When the reminder firing minutes before each start of an events row
+    next fires strictly after timestamp after, or None once the event
+    (or its last repeat) has passed.
+    """
+    start = recurrence.next_start(row, after + minutes * 60)
+    return None if start is None else start - minutes * 60
+
+
+def alert_rows(row, now):
+    """(event_id, minutes, next_fire_at) of every reminder of an events row."""
+    return [(row[ID], minutes, next_fire_at(row, minutes, now)) for minutes in row_minutes(row)]
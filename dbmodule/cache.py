@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+
+
+class VersionedLRUCache:
+    """
+    Thread-safe LRU of computed results, each stamped with the data version
+    it was computed from. An entry only hits while its stamp equals the
+    caller's current version, so a version bump invalidates everything
+    without having to clear the cache.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()     # key -> (version, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Cached value for key at this version, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def contains(self, key, version):
+        """Like get() but doesn't count as a lookup or refresh the entry's age."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] == version
+
+    def put(self, key, version, value):
+        # version is the one read *before* computing value; if a write landed
+        # meanwhile the entry is already stale and simply never hits
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,65 +1,378 @@
-from enum import Enum
+import asyncio
+import bisect
 import json
-from datetime import datetime
-from app.sharedVars import AddEditEventData
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from dbmodule import alerts, migrations, recurrence
+from dbmodule.cache import VersionedLRUCache
+from dbmodule.changes import ChangeBus, EventChange
+from dbmodule.record import EventRecord
+from dbmodule.snapshot import EventSnapshot
+from dbmodule.schema import (
+    Alert, Event, EventSearch, Occurrence, SchemaVersion, EVENT_COLUMNS, EVENT_ROW_COLUMNS, END, ID, START,
+)
 
 DAY_IN_SECONDS = 86400
-WEEK_IN_SECONDS = 604800
-YEAR_IN_SECONDS = 31536000
 
-# data tables
-class Event(Enum):
-    TABLE_NAME = "events"
+# repeats of recurring events are kept in event_occurrences up to this far
+# ahead of now; windows past it are expanded on the fly instead
+OCCURRENCE_HORIZON_DAYS = 730
+# ...and from this far behind now: older windows (browsing years back) are
+# expanded on the fly too, so a series that began long ago doesn't write
+# a row for every repeat since its start
+OCCURRENCE_RETENTION_DAYS = 365
+# a series is filled this far past the horizon, so it is only revisited
+# once the rolling horizon catches up with it
+OCCURRENCE_EXTEND_DAYS = 90
+
+# events per page of list_events()
+EVENT_PAGE_SIZE = 50
+
+# most hits search() returns
+SEARCH_LIMIT = 200
+# bm25 column weights: a hit in the name counts ten times one in the description
+SEARCH_NAME_WEIGHT = 10.0
+SEARCH_DESC_WEIGHT = 1.0
+
+# bucketed month results kept across sessions (every tab shares one calendar)
+MONTH_CACHE_SIZE = 64
+
+# worker threads for the async API; each one gets its own connection from Sql
+DB_EXECUTOR_WORKERS = 4
+
+# Upcoming tab: days after today it covers, and the most rows it shows
+UPCOMING_DAYS = 30
+UPCOMING_LIMIT = 200
+
+# reminders read per page of next_alerts()
+ALERT_PAGE_SIZE = 256
+
+# Rows are always read with this column list, so row[0..11] follow
+# EVENT_COLUMNS and the event id sits at the end (row positions are in schema)
+SELECT_LIST = f"{', '.join(col.value for col in EVENT_ROW_COLUMNS)}"
+
+# Statement text is built once so every call binds values into the same SQL
+# string and hits the connection's compiled statement cache.
+INSERT_EVENT_QUERY = (
+    f"INSERT INTO {Event.TABLE_NAME.value} ("
+    f"{', '.join(col.value for col in EVENT_COLUMNS)}"
+    f") VALUES ({', '.join('?' for _ in EVENT_COLUMNS)});"
+)
+
+UPDATE_EVENT_QUERY = (
+    f"UPDATE {Event.TABLE_NAME.value} SET "
+    f"{', '.join(f'{col.value} = ?' for col in EVENT_COLUMNS)} "
+    f"WHERE {Event.ID.value} = ?;"
+)
+
+DELETE_EVENT_QUERY = (
+    f"DELETE FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.ID.value} = ?;"
+)
+
+SELECT_ALL_QUERY = f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value};"
+
+SELECT_EVENT_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.ID.value} = ?;"
+)
+
+# ids of the rows a batch insert added: read the highest id before it, then
+# every id past that (inside the batch's write transaction, so only its rows)
+SELECT_MAX_ID_QUERY = f"SELECT COALESCE(MAX({Event.ID.value}), 0) FROM {Event.TABLE_NAME.value};"
+SELECT_IDS_AFTER_QUERY = (
+    f"SELECT {Event.ID.value} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.ID.value} > ? ORDER BY {Event.ID.value};"
+)
+
+# keyset pagination: pages are ordered by (start_date, id), which is the order
+# of idx_events_start (the index carries the rowid), and continue after the
+# last row of the previous page instead of using OFFSET
+SELECT_FIRST_PAGE_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"ORDER BY {Event.START_DATE.value}, {Event.ID.value} LIMIT ?;"
+)
+
+SELECT_NEXT_PAGE_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"WHERE ({Event.START_DATE.value}, {Event.ID.value}) > (?, ?) "
+    f"ORDER BY {Event.START_DATE.value}, {Event.ID.value} LIMIT ?;"
+)
+
+SEARCH_QUERY = (
+    "SELECT " + ", ".join(f"e.{col.value}" for col in EVENT_COLUMNS) + f", e.{Event.ID.value} "
+    f"FROM {EventSearch.TABLE_NAME.value} f "
+    f"JOIN {Event.TABLE_NAME.value} e ON e.{Event.ID.value} = f.rowid "
+    f"WHERE {EventSearch.TABLE_NAME.value} MATCH ? "
+    f"ORDER BY bm25({EventSearch.TABLE_NAME.value}, {SEARCH_NAME_WEIGHT}, {SEARCH_DESC_WEIGHT}), "
+    f"e.{Event.START_DATE.value} LIMIT ?;"
+)
+
+SELECT_RANGE_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.START_DATE.value} BETWEEN ? AND ?;"
+)
+
+SELECT_RECURRING_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.RECURRING.value} = 1 "
+    f"AND {Event.START_DATE.value} <= ?;"
+)
+
+SELECT_PENDING_SERIES_QUERY = (
+    f"SELECT {SELECT_LIST}, {Event.OCCURRENCES_UNTIL.value} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.RECURRING.value} = 1 "
+    f"AND {Event.OCCURRENCES_UNTIL.value} < ?;"
+)
+
+SET_OCCURRENCES_UNTIL_QUERY = (
+    f"UPDATE {Event.TABLE_NAME.value} SET {Event.OCCURRENCES_UNTIL.value} = ? "
+    f"WHERE {Event.ID.value} = ?;"
+)
+
+# OR IGNORE: extending a series starts at its last filled timestamp again
+INSERT_OCCURRENCE_QUERY = (
+    f"INSERT OR IGNORE INTO {Occurrence.TABLE_NAME.value} ("
+    f"{Occurrence.EVENT_ID.value}, {Occurrence.START_DATE.value}, {Occurrence.END_DATE.value}"
+    f") VALUES (?, ?, ?);"
+)
+
+# same row layout as SELECT_LIST, with the occurrence's own start and end
+SELECT_OCCURRENCE_ROWS = (
+    "SELECT " + ", ".join(
+        f"o.{col.value}" if col in (Event.START_DATE, Event.END_DATE) else f"e.{col.value}"
+        for col in EVENT_COLUMNS
+    ) + f", e.{Event.ID.value} "
+    f"FROM {Occurrence.TABLE_NAME.value} o "
+    f"JOIN {Event.TABLE_NAME.value} e ON e.{Event.ID.value} = o.{Occurrence.EVENT_ID.value} "
+)
+
+SELECT_OCCURRENCES_QUERY = (
+    f"{SELECT_OCCURRENCE_ROWS}WHERE o.{Occurrence.START_DATE.value} BETWEEN ? AND ?;"
+)
+
+# every materialized repeat between the floor and the horizon, for EventSnapshot
+SELECT_OCCURRENCE_TIMES_QUERY = (
+    f"SELECT {Occurrence.EVENT_ID.value}, {Occurrence.START_DATE.value}, {Occurrence.END_DATE.value} "
+    f"FROM {Occurrence.TABLE_NAME.value} WHERE {Occurrence.START_DATE.value} BETWEEN ? AND ?;"
+)
+
+# every row starting in a window: one-off events and series starts, then repeats;
+# binds (start, end, max(start, floor), min(end, horizon))
+SELECT_WINDOW_QUERY = (
+    f"{SELECT_RANGE_QUERY.rstrip(';')} UNION ALL {SELECT_OCCURRENCES_QUERY}"
+)
+
+# next rows starting in [start, end), soonest first; binds
+# (start, end, start, min(end, horizon), limit)
+SELECT_UPCOMING_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.START_DATE.value} >= ? AND {Event.START_DATE.value} < ? "
+    f"UNION ALL {SELECT_OCCURRENCE_ROWS}"
+    f"WHERE o.{Occurrence.START_DATE.value} >= ? AND o.{Occurrence.START_DATE.value} < ? "
+    f"ORDER BY {START + 1}, {ID + 1} LIMIT ?;"
+)
+
+SELECT_PENDING_ALERTS_QUERY = (
+    f"SELECT {SELECT_LIST} FROM {Event.TABLE_NAME.value} "
+    f"WHERE {Event.ALERTS_PENDING.value} = 1;"
+)
+
+CLEAR_ALERTS_PENDING_QUERY = (
+    f"UPDATE {Event.TABLE_NAME.value} SET {Event.ALERTS_PENDING.value} = 0 "
+    f"WHERE {Event.ID.value} = ?;"
+)
+
+INSERT_ALERT_QUERY = (
+    f"INSERT OR REPLACE INTO {Alert.TABLE_NAME.value} ("
+    f"{Alert.EVENT_ID.value}, {Alert.MINUTES.value}, {Alert.NEXT_FIRE_AT.value}"
+    f") VALUES (?, ?, ?);"
+)
+
+SET_NEXT_FIRE_QUERY = (
+    f"UPDATE {Alert.TABLE_NAME.value} SET {Alert.NEXT_FIRE_AT.value} = ? "
+    f"WHERE {Alert.EVENT_ID.value} = ? AND {Alert.MINUTES.value} = ?;"
+)
+
+# alerts as (next_fire_at, event_id, minutes, event name)
+SELECT_ALERT_ROWS = (
+    f"SELECT a.{Alert.NEXT_FIRE_AT.value}, a.{Alert.EVENT_ID.value}, a.{Alert.MINUTES.value}, "
+    f"e.{Event.EVENT_NAME.value} "
+    f"FROM {Alert.TABLE_NAME.value} a "
+    f"JOIN {Event.TABLE_NAME.value} e ON e.{Event.ID.value} = a.{Alert.EVENT_ID.value} "
+)
+
+# keyset pages of due alerts in (next_fire_at, event_id, minutes) order, read
+# straight off idx_event_alerts_next_fire
+SELECT_FIRST_ALERTS_QUERY = (
+    f"{SELECT_ALERT_ROWS}WHERE a.{Alert.NEXT_FIRE_AT.value} IS NOT NULL "
+    f"ORDER BY a.{Alert.NEXT_FIRE_AT.value}, a.{Alert.EVENT_ID.value}, a.{Alert.MINUTES.value} LIMIT ?;"
+)
+
+SELECT_NEXT_ALERTS_QUERY = (
+    f"{SELECT_ALERT_ROWS}WHERE a.{Alert.NEXT_FIRE_AT.value} IS NOT NULL "
+    f"AND (a.{Alert.NEXT_FIRE_AT.value}, a.{Alert.EVENT_ID.value}, a.{Alert.MINUTES.value}) > (?, ?, ?) "
+    f"ORDER BY a.{Alert.NEXT_FIRE_AT.value}, a.{Alert.EVENT_ID.value}, a.{Alert.MINUTES.value} LIMIT ?;"
+)
+
+SELECT_EVENT_ALERTS_QUERY = (
+    f"{SELECT_ALERT_ROWS}WHERE a.{Alert.EVENT_ID.value} = ? AND a.{Alert.NEXT_FIRE_AT.value} IS NOT NULL;"
+)
+
+# alerts whose fire time passed without firing (the app was down), with their event
+SELECT_OVERDUE_ALERTS_QUERY = (
+    "SELECT a." + Alert.MINUTES.value + ", " + ", ".join(f"e.{col.value}" for col in EVENT_COLUMNS)
+    + f", e.{Event.ID.value} "
+    f"FROM {Alert.TABLE_NAME.value} a "
+    f"JOIN {Event.TABLE_NAME.value} e ON e.{Event.ID.value} = a.{Alert.EVENT_ID.value} "
+    f"WHERE a.{Alert.NEXT_FIRE_AT.value} <= ?;"
+)
+
+def occurrence_horizon(now=None):
+    """Timestamp up to which event_occurrences is complete."""
+    if now is None:
+        now = time.time()
+    return now + OCCURRENCE_HORIZON_DAYS * DAY_IN_SECONDS
+
+def occurrence_floor(now=None):
+    """Timestamp from which event_occurrences is complete."""
+    if now is None:
+        now = time.time()
+    return now - OCCURRENCE_RETENTION_DAYS * DAY_IN_SECONDS
+
+def day_boundaries(range_min, days):
+    """
+    Local midnight of each day from range_min's date on, plus the midnight
+    closing the last day (days + 1 timestamps). Built from calendar dates, so
+    days that cross a DST change are 23 or 25 hours long.
+    """
+    first_day = datetime.fromtimestamp(range_min).date()
+    return [
+        datetime.combine(first_day + timedelta(days=i), datetime.min.time()).timestamp()
+        for i in range(days + 1)
+    ]
+
+def bucket_by_day(rows, boundaries):
+    """
+    Group rows into {day index: [rows in start order]} against day_boundaries().
+    Both index scans return rows already ordered by start, so the sort only
+    merges runs; each row is then placed with one bisect.
+    """
+    event_dict = {}
+    last_day = len(boundaries) - 2
+    for row in sorted(rows, key=lambda r: r[START]):
+        i = bisect.bisect_right(boundaries, row[START]) - 1
+        if 0 <= i <= last_day:
+            day_list = event_dict.get(i)
+            if day_list is None:
+                event_dict[i] = [row]
+            else:
+                day_list.append(row)
+    return event_dict
+
+def fts_query(text):
+    """
+    FTS5 MATCH expression for free text typed by a user: every word must
+    appear, the last one (still being typed) as a prefix. Words are quoted, so
+    FTS operators and punctuation in the input are treated as plain text.
+    Returns None when there is nothing to search for.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def event_params(data_frame):
+    """Bind values for one event row, in EVENT_COLUMNS order."""
+    # Convert Python None → SQL NULL for nullable fields
+    end_opt = int(getattr(data_frame, "recurringEndOptionIndex", 0) or 0)
+
+    # timestamps or None
+    end_date = getattr(data_frame, "recurringEndDate", None)
+
+    end_count = getattr(data_frame, "recurringEndCount", None)
+    end_count = None if end_count is None else int(end_count)
+
+    # AddEditEventData uses recurringInterval, UploadedEventDataFrame recurringEventInterval
+    interval = getattr(data_frame, "recurringInterval", None)
+    if interval is None:
+        interval = getattr(data_frame, "recurringEventInterval", 0)
+
+    alert_json = json.dumps(getattr(data_frame, "selectedAlertCheckboxes", []))
+
+    return (
+        data_frame.eventName,
+        data_frame.eventStartDate,
+        data_frame.eventEndDate,
+        data_frame.eventDescription,
+        int(bool(data_frame.isRecurringEvent)),
+        int(bool(data_frame.isAlerting)),
+        int(data_frame.recurringEventOptionIndex),
+        alert_json,
+        interval,
+        end_opt,
+        end_date,
+        end_count,
+    )
 
-    EVENT_NAME = "name"
-    START_DATE = "start_date"
-    END_DATE = "end_date"
-    DESC = "description"
-
-    RECURRING = "is_recurring"
-    ALERTING = "is_alerting"
-
-    R_OPTION = "recurring_option"          # daily / weekly / monthly index
-    A_OPTIONS = "alerting_options"         # JSON text of alert checkboxes
-    R_INTERVAL = "recurring_interval"              # e.g. every N days / week pattern
-
-    # End options:
-    # 0 = never ends
-    # 1 = ends on specific date (see R_END_DATE)
-    # 2 = ends after X occurrences (see R_END_COUNT)
-    R_END_OPTIONS = "recurring_end_options"
-    R_END_DATE = "recurring_end_date"      # REAL (timestamp) or NULL
-    R_END_COUNT = "recurring_end_count"    # INTEGER or NULL
 
 class CalendarData:
-    def __init__(self, sql_instance):
+    def __init__(self, sql_instance, use_snapshot=False):
         self.sql = sql_instance
+        self.executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="calendar-db")
+        # bumped after every write commits; cached month results are stamped with it
+        self.data_version = 0
+        self._version_lock = threading.Lock()
+        self.month_cache = VersionedLRUCache(MONTH_CACHE_SIZE)
+        # month queries running on the executor: key -> (version, future)
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # optional in-memory EventSnapshot serving range lookups (see set_snapshot)
+        self.use_snapshot = use_snapshot
+        self.snapshot = None
+        self._snapshot_lock = threading.Lock()
+        # an EventChange is published here after every write commits
+        self.changes = ChangeBus()
+
+    def mark_changed(self, event_ids=None):
+        """
+        Record that events changed and publish it on self.changes. Call after
+        any write commits, including ones made outside CalendarData; pass
+        the ids written when known.
+        """
+        with self._version_lock:
+            self.data_version += 1
+            version = self.data_version
+        self.changes.publish(EventChange(version, None if event_ids is None else tuple(event_ids)))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
     def build_data(self):
-        # NOTE: if the table already exists, you'll need ALTER TABLE commands instead.
-        query = (
-            f"CREATE TABLE IF NOT EXISTS {Event.TABLE_NAME.value} ("
-            f"{Event.EVENT_NAME.value} TEXT,"
-            f"{Event.START_DATE.value} REAL NOT NULL,"
-            f"{Event.END_DATE.value} REAL NOT NULL,"
-            f"{Event.DESC.value} TEXT,"
-            f"{Event.RECURRING.value} BOOLEAN,"
-            f"{Event.ALERTING.value} BOOLEAN,"
-            f"{Event.R_OPTION.value} INT,"
-            f"{Event.A_OPTIONS.value} TEXT,"
-            f"{Event.R_INTERVAL.value} INT,"
-            f"{Event.R_END_OPTIONS.value} INT DEFAULT 0,"       # 0 = never
-            f"{Event.R_END_DATE.value} REAL,"                   # nullable
-            f"{Event.R_END_COUNT.value} INT,"                   # nullable
-            f"PRIMARY KEY ({Event.START_DATE.value}, {Event.END_DATE.value})"
-            f");"
-        )
-        self.sql.execute(query)
+        """Create or upgrade the schema by running any pending migrations."""
+        migrations.run_migrations(self.sql)
+        self.mark_changed()
 
     # don't execute this unless needed
     def delete_data(self):
+        query = f"DROP TABLE IF EXISTS {EventSearch.TABLE_NAME.value};"
+        self.sql.execute(query)
+        query = f"DROP TABLE IF EXISTS {Occurrence.TABLE_NAME.value};"
+        self.sql.execute(query)
+        query = f"DROP TABLE IF EXISTS {Alert.TABLE_NAME.value};"
+        self.sql.execute(query)
         query = f"DROP TABLE IF EXISTS {Event.TABLE_NAME.value};"
         self.sql.execute(query)
+        # forget applied migrations too, so build_data recreates the table
+        query = f"DROP TABLE IF EXISTS {SchemaVersion.TABLE_NAME.value};"
+        self.sql.execute(query)
+        self.sql.commit()
+        self.mark_changed()
 
     def verify_data(self):
         query = f"PRAGMA table_info({Event.TABLE_NAME.value});"
@@ -73,263 +386,429 @@ class CalendarData:
             print(row)
 
     def get_all_data(self):
-        query = f"SELECT * FROM {Event.TABLE_NAME.value};"
-        self.sql.execute(query)
+        self.sql.execute(SELECT_ALL_QUERY, row_factory=EventRecord.factory)
+        return self.sql.fetchall()
 
+    def get_event(self, event_id):
+        """The event with this id as an EventRecord, or None."""
+        self.sql.execute(SELECT_EVENT_QUERY, (event_id,), row_factory=EventRecord.factory)
         rows = self.sql.fetchall()
-        row_count = len(rows)
-        data_list = []
-
-        # Expected column order (matching buildData):
-        # 0  name
-        # 1  start_date
-        # 2  end_date
-        # 3  description
-        # 4  is_recurring
-        # 5  is_alerting
-        # 6  recurring_option
-        # 7  alerting_options (JSON text)
-        # 8  recurring_interval
-        # 9  recurring_end_options
-        # 10 recurring_end_date
-        # 11 recurring_end_count
-
-        if row_count > 0:
-            for i in range(row_count):
-                row = rows[i]
-                data_frame = AddEditEventData()
-
-                data_frame.eventName = row[0]
-                data_frame.eventStartDate = row[1]
-                data_frame.eventEndDate = row[2]
-                data_frame.eventDescription = row[3]
-                data_frame.isRecurringEvent = row[4]
-                data_frame.isAlerting = row[5]
-                data_frame.recurringEventOptionIndex = row[6]
-
-                # alert options as JSON list, if present
-                try:
-                    data_frame.selectedAlertCheckboxes = (
-                        json.loads(row[7]) if row[7] else []
-                    )
-                except Exception:
-                    data_frame.selectedAlertCheckboxes = []
-
-                data_frame.recurringInterval = row[8]
-                data_frame.recurringEndOptionIndex = row[9]      # NEW: 0/1/2
-                data_frame.recurringEndDate = row[10]            # timestamp or None
-                data_frame.recurringEndCount = row[11]           # int or None
-
-                data_list.append(data_frame)
-
-        return data_list
+        return rows[0] if rows else None
+
+    def list_events(self, after_start=None, after_id=None, limit=EVENT_PAGE_SIZE):
+        """
+        One page of events ordered by (start, id). Pass the start and id of
+        the last event of the previous page to get the next one; a page
+        shorter than limit is the last. Cost doesn't grow with table size.
+        """
+        if after_start is None:
+            self.sql.execute(SELECT_FIRST_PAGE_QUERY, (limit,), row_factory=EventRecord.factory)
+        else:
+            self.sql.execute(SELECT_NEXT_PAGE_QUERY, (after_start, after_id or 0, limit),
+                             row_factory=EventRecord.factory)
+        return self.sql.fetchall()
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Events whose name or description contain the query's words, best match first."""
+        match = fts_query(query)
+        if match is None:
+            return []
+        self.sql.execute(SEARCH_QUERY, (match, limit), row_factory=EventRecord.factory)
+        return self.sql.fetchall()
 
     def add_data(self, data_frame):
-        # Convert Python None → SQL NULL for nullable fields
-        end_opt = int(getattr(data_frame, "recurringEndOptionIndex", 0) or 0)
-
-        # timestamps or None
-        end_date = getattr(data_frame, "recurringEndDate", None)
-        end_date_sql = "NULL" if end_date is None else str(end_date)
-
-        end_count = getattr(data_frame, "recurringEndCount", None)
-        end_count_sql = "NULL" if end_count is None else str(int(end_count))
-
-        alert_json = json.dumps(getattr(data_frame, "selectedAlertCheckboxes", []))
-
-        query = (
-            f"INSERT INTO {Event.TABLE_NAME.value} ("
-            f"{Event.EVENT_NAME.value}, "
-            f"{Event.START_DATE.value}, "
-            f"{Event.END_DATE.value}, "
-            f"{Event.DESC.value}, "
-            f"{Event.RECURRING.value}, "
-            f"{Event.ALERTING.value}, "
-            f"{Event.R_OPTION.value}, "
-            f"{Event.A_OPTIONS.value}, "
-            f"{Event.R_INTERVAL.value}, "
-            f"{Event.R_END_OPTIONS.value}, "
-            f"{Event.R_END_DATE.value}, "
-            f"{Event.R_END_COUNT.value}"
-            f") VALUES ("
-            f"'{data_frame.eventName}', "
-            f"{data_frame.eventStartDate}, "
-            f"{data_frame.eventEndDate}, "
-            f"'{data_frame.eventDescription}', "
-            f"{int(bool(data_frame.isRecurringEvent))}, "
-            f"{int(bool(data_frame.isAlerting))}, "
-            f"{int(data_frame.recurringEventOptionIndex)}, "
-            f"'{alert_json}', "
-            f"{data_frame.recurringEventInterval}, "
-            f"{end_opt}, "
-            f"{end_date_sql}, "
-            f"{end_count_sql}"
-            f");"
-        )
-
-        self.sql.execute(query)
-        self.sql.commit()
+        """Insert one event and return its new id."""
+        with self.sql.transaction():
+            self.sql.execute(INSERT_EVENT_QUERY, event_params(data_frame))
+            event_id = self.sql.cursor.lastrowid
+            self._fill_occurrences(occurrence_horizon())
+            self._fill_alerts(time.time())
+        self.mark_changed([event_id])
+        return event_id
+
+    def add_many(self, data_frames):
+        """
+        Insert a batch of events in one transaction (one commit for the batch).
+        Returns one outcome per frame, in order: None if the row was inserted,
+        otherwise an error message. Bad rows are skipped, the rest still go in.
+        """
+        outcomes = [None] * len(data_frames)
+        params = []
+        for i, data_frame in enumerate(data_frames):
+            try:
+                row = event_params(data_frame)
+            except (AttributeError, TypeError, ValueError) as e:
+                outcomes[i] = f"invalid event: {e}"
+                continue
+            start, end = row[START], row[END]
+            if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+                outcomes[i] = "invalid event: start and end must be timestamps"
+                continue
+            if end < start:
+                outcomes[i] = "event ends before it starts"
+                continue
+            params.append((i, row))
+
+        # rows that got this far satisfy every table constraint (only the
+        # timestamps are NOT NULL), so the batch goes in with one statement
+        with self.sql.transaction():
+            self.sql.execute(SELECT_MAX_ID_QUERY)
+            last_id = self.sql.fetchall()[0][0]
+            self.sql.executemany(INSERT_EVENT_QUERY, [row for _, row in params])
+            self.sql.execute(SELECT_IDS_AFTER_QUERY, (last_id,))
+            event_ids = [row[0] for row in self.sql.fetchall()]
+            self._fill_occurrences(occurrence_horizon())
+            self._fill_alerts(time.time())
+        if event_ids:
+            self.mark_changed(event_ids)
+
+        return outcomes
 
     def print_all_data(self):
-        query = f"SELECT * FROM {Event.TABLE_NAME.value};"
-        self.sql.execute(query)
+        self.sql.execute(SELECT_ALL_QUERY)
         self.print_query_data()
 
     def get_date_from_timestamp(self, timestamp):
         date_obj = datetime.fromtimestamp(timestamp)
         return date_obj
 
-    def get_all_recurring_events_within_range(self, start_date, end_date):
-        query = (
-            f"SELECT * FROM {Event.TABLE_NAME.value} "
-            f"WHERE {Event.RECURRING.value} = 1 "
-            f"AND {Event.START_DATE.value} <= '{end_date}'"
+    def _fill_occurrences(self, horizon):
+        """
+        Materialize repeats for every recurring series filled short of horizon:
+        new series, ones whose schedule changed (reset by trigger) and ones the
+        rolling horizon has caught up with. Repeats before the retention floor
+        are left out. Runs inside the caller's transaction.
+        """
+        self.sql.execute(SELECT_PENDING_SERIES_QUERY, (horizon,))
+        pending = self.sql.fetchall()
+        if not pending:
+            return 0
+        until = horizon + OCCURRENCE_EXTEND_DAYS * DAY_IN_SECONDS
+        rows = [row[:-1] for row in pending]
+        floor = occurrence_floor()
+        # every pending series expanded in one batch, each from where it was filled to
+        positions, starts = recurrence.occurrence_starts_many(
+            rows, [max(row[START], row[-1], floor) for row in pending], until
         )
-        self.sql.execute(query)
-        fetched_data = self.sql.fetchall()
-        fetched_data = [list(row) for row in fetched_data] #make list so mutable
-
-        repeated_events = []
-        for item in fetched_data:
-            increment = 99999999
-
-            match item[6]: #Find how much we increment by
-                case 1: #Daily
-                    increment = DAY_IN_SECONDS * item[8]
-                case 2: #Weekly
-                    increment = WEEK_IN_SECONDS * item[8]
-                case 3: #Monthly, Simple logic due to time constraint
-                    increment = DAY_IN_SECONDS * 30 * item[8]
-                case 4: #Yearly
-                    increment = YEAR_IN_SECONDS * item[8]
-
-            match item[9]: #Handle end point logic
-                case 0: #None
-                    inc = item[1] + increment
-                    while inc <= end_date:
-                        if inc >= start_date:
-                            temp = item.copy()
-                            temp[1] = inc
-                            repeated_events.append(temp)
-                        inc += increment
-
-                case 1: #End Date
-                    inc = item[1]
-                    while inc < item[10]:
-                        inc += increment
-                        temp = item.copy()
-                        temp[1] = inc
-                        if temp[1] > start_date:
-                            repeated_events.append(temp)
-
-                case 2: #Num Times
-                    counter = 0
-                    while counter < item[11]:
-                        temp = item.copy()
-                        temp[1] += (increment * (counter + 1))
-                        if temp[1] > start_date:
-                            repeated_events.append(temp)
-                        counter += 1
-
-        repeated_events = [tuple(e) for e in repeated_events] #back to tuples
-        return repeated_events
+        self.sql.executemany(INSERT_OCCURRENCE_QUERY, [
+            (rows[position][ID], start, start + rows[position][END] - rows[position][START])
+            for position, start in zip(positions, starts)
+        ])
+        self.sql.executemany(SET_OCCURRENCES_UNTIL_QUERY, [(until, row[ID]) for row in rows])
+        return len(pending)
+
+    def refresh_occurrences(self, horizon=None):
+        """Bring event_occurrences up to the horizon; cheap when nothing is pending."""
+        if horizon is None:
+            horizon = occurrence_horizon()
+        self.sql.execute(SELECT_PENDING_SERIES_QUERY, (horizon,))
+        if not self.sql.fetchall():
+            return 0
+        with self.sql.transaction():
+            # re-read under the write lock, another thread may have filled them
+            return self._fill_occurrences(horizon)
+
+    def _fill_alerts(self, now):
+        """
+        Compute event_alerts rows for every pending event: new ones and ones
+        whose alerts or schedule changed (reset by trigger). Runs inside the
+        caller's transaction.
+        """
+        self.sql.execute(SELECT_PENDING_ALERTS_QUERY)
+        pending = self.sql.fetchall()
+        if not pending:
+            return 0
+        self.sql.executemany(INSERT_ALERT_QUERY, [
+            alert for row in pending for alert in alerts.alert_rows(row, now)
+        ])
+        self.sql.executemany(CLEAR_ALERTS_PENDING_QUERY, [(row[ID],) for row in pending])
+        return len(pending)
+
+    def refresh_alerts(self, now=None):
+        """
+        Bring event_alerts up to date at startup: fill pending events and move
+        alerts that came due while the app wasn't running to their next fire
+        time (missed reminders are skipped, not fired late). Returns the
+        number of rows touched; cheap when there are none.
+        """
+        if now is None:
+            now = time.time()
+        self.sql.execute(SELECT_PENDING_ALERTS_QUERY)
+        pending = self.sql.fetchall()
+        self.sql.execute(SELECT_OVERDUE_ALERTS_QUERY, (now,))
+        overdue = self.sql.fetchall()
+        if not pending and not overdue:
+            return 0
+        with self.sql.transaction():
+            # re-read under the write lock, another thread may have done it
+            filled = self._fill_alerts(now)
+            self.sql.execute(SELECT_OVERDUE_ALERTS_QUERY, (now,))
+            overdue = self.sql.fetchall()
+            self.sql.executemany(SET_NEXT_FIRE_QUERY, [
+                (alerts.next_fire_at(row[1:], row[0], now), row[-1], row[0]) for row in overdue
+            ])
+        return filled + len(overdue)
+
+    def next_alerts(self, after=None, limit=ALERT_PAGE_SIZE):
+        """
+        The next alerts to fire as (next_fire_at, event_id, minutes, name),
+        soonest first. Pass the first three fields of the last row of the
+        previous page as after to continue; a page shorter than limit is the last.
+        """
+        if after is None:
+            self.sql.execute(SELECT_FIRST_ALERTS_QUERY, (limit,))
+        else:
+            self.sql.execute(SELECT_NEXT_ALERTS_QUERY, tuple(after) + (limit,))
+        return self.sql.fetchall()
+
+    def get_event_alerts(self, event_id):
+        """Alerts of one event still to fire, in next_alerts() layout."""
+        self.sql.execute(SELECT_EVENT_ALERTS_QUERY, (event_id,))
+        return self.sql.fetchall()
+
+    def advance_alert(self, event_id, minutes, fired_at):
+        """
+        Move an alert past the time it just fired: to the next repeat of a
+        recurring series, or to NULL once nothing is left. Returns the new
+        next_fire_at, or None.
+        """
+        with self.sql.transaction():
+            self.sql.execute(SELECT_EVENT_QUERY, (event_id,))
+            rows = self.sql.fetchall()
+            if not rows:
+                return None
+            fire_at = alerts.next_fire_at(rows[0], minutes, fired_at)
+            self.sql.execute(SET_NEXT_FIRE_QUERY, (fire_at, event_id, minutes))
+        return fire_at
+
+    def _expand_past_horizon(self, start_date, end_date, horizon):
+        # windows past the materialized horizon (browsing years ahead) are
+        # expanded on the fly rather than growing the table
+        if end_date <= horizon:
+            return []
+        self.sql.execute(SELECT_RECURRING_QUERY, (end_date,))
+        return [
+            item for item in recurrence.expand_rows(self.sql.fetchall(), max(start_date, horizon), end_date)
+            if item[START] > horizon
+        ]
+
+    def _expand_before_floor(self, start_date, end_date, floor):
+        # likewise windows before the retention floor (browsing years back)
+        if start_date >= floor:
+            return []
+        self.sql.execute(SELECT_RECURRING_QUERY, (min(end_date, floor),))
+        return [
+            item for item in recurrence.expand_rows(self.sql.fetchall(), start_date, min(end_date, floor))
+            if item[START] < floor
+        ]
 
+    def get_all_recurring_events_within_range(self, start_date, end_date):
+        """Repeats (not the first occurrence) of recurring events starting in [start_date, end_date]."""
+        horizon = occurrence_horizon()
+        floor = occurrence_floor()
+        self.refresh_occurrences(horizon)
+        self.sql.execute(SELECT_OCCURRENCES_QUERY, (max(start_date, floor), min(end_date, horizon)))
+        return (self.sql.fetchall() + self._expand_before_floor(start_date, end_date, floor)
+                + self._expand_past_horizon(start_date, end_date, horizon))
+
+    def set_snapshot(self, enabled):
+        """Serve range lookups from an in-memory EventSnapshot (True) or SQLite (False)."""
+        with self._snapshot_lock:
+            self.use_snapshot = enabled
+            self.snapshot = None
+
+    def current_snapshot(self):
+        """
+        The EventSnapshot for the current data version, rebuilt on the first
+        lookup after a write (so a burst of writes costs one rebuild).
+        """
+        version = self.data_version
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._snapshot_lock:
+            snapshot = self.snapshot
+            if snapshot is None or snapshot.version != version:
+                horizon = occurrence_horizon()
+                floor = occurrence_floor()
+                self.refresh_occurrences(horizon)
+                self.sql.execute(SELECT_ALL_QUERY)
+                event_rows = self.sql.fetchall()
+                self.sql.execute(SELECT_OCCURRENCE_TIMES_QUERY, (floor, horizon))
+                # version read before the queries: a write landing meanwhile
+                # leaves this snapshot stale, so the next lookup rebuilds
+                snapshot = EventSnapshot(event_rows, self.sql.fetchall(), horizon, version, floor)
+                if self.use_snapshot:
+                    self.snapshot = snapshot
+        return snapshot
+
+    def get_events_within_range(self, start_date, end_date):
+        """Every event row, series start and repeat starting in [start_date, end_date]."""
+        if self.use_snapshot:
+            return self.current_snapshot().within_range(start_date, end_date)
+        horizon = occurrence_horizon()
+        floor = occurrence_floor()
+        self.refresh_occurrences(horizon)
+        self.sql.execute(SELECT_WINDOW_QUERY, (start_date, end_date, max(start_date, floor), min(end_date, horizon)))
+        return (self.sql.fetchall() + self._expand_before_floor(start_date, end_date, floor)
+                + self._expand_past_horizon(start_date, end_date, horizon))
+
+
+    def upcoming(self, now=None, horizon=UPCOMING_DAYS, limit=UPCOMING_LIMIT):
+        """
+        EventRecords for the next events, soonest first: one-off events, series
+        starts and repeats starting from now through the end of the local day
+        horizon days after today, at most limit of them.
+        """
+        if now is None:
+            now = time.time()
+        last_day = datetime.fromtimestamp(now).date() + timedelta(days=horizon + 1)
+        end = datetime(last_day.year, last_day.month, last_day.day).timestamp()
+        occurrences_until = occurrence_horizon()
+        self.refresh_occurrences(occurrences_until)
+        self.sql.execute(SELECT_UPCOMING_QUERY, (now, end, now, min(end, occurrences_until), limit))
+        rows = self.sql.fetchall()
+        extra = [row for row in self._expand_past_horizon(now, end, occurrences_until) if row[START] < end]
+        if extra:
+            rows = sorted(rows + extra, key=lambda row: (row[START], row[ID]))[:limit]
+        return [EventRecord(row) for row in rows]
 
     def find_events_in_range_main_cal(self, range_min, range_max):
-        query = (
-            f"SELECT * FROM {Event.TABLE_NAME.value} "
-            f"WHERE {Event.START_DATE.value} BETWEEN {range_min} AND {range_max};"
-        )
-        self.sql.execute(query)
-        fetched_data = self.sql.fetchall()
-
-        recurring_data = self.get_all_recurring_events_within_range(range_min, range_max)
-
-        for event in recurring_data:
-            fetched_data.append(event)
-
-        event_dict = {}
-        start = range_min
-        end = range_min + DAY_IN_SECONDS
-
-        for i in range(42):
-            day_list = []
-            for row in fetched_data:
-                day_list.append(row) if start <= row[1] < end else None
-            if len(day_list) > 0:
-                event_dict[i] = day_list
-            start += DAY_IN_SECONDS
-            end += DAY_IN_SECONDS
-
+        """
+        Events of the 42-day month grid starting at range_min, keyed by day index.
+        Results are cached and shared between callers, so treat them as read-only.
+        """
+        key = ("main_cal", range_min, range_max)
+        version = self.data_version
+        event_dict = self.month_cache.get(key, version)
+        if event_dict is None:
+            fetched_data = self.get_events_within_range(range_min, range_max)
+            event_dict = bucket_by_day(fetched_data, day_boundaries(range_min, 42))
+            self.month_cache.put(key, version, event_dict)
         return event_dict
 
     def find_events_in_range_imp_date(self, old_date, new_date, days_in_month):
-        query = (
-            f"SELECT * FROM {Event.TABLE_NAME.value} "
-            f"WHERE {Event.START_DATE.value} BETWEEN {old_date} AND {new_date};"
-        )
-        self.sql.execute(query)
-        fetched_data = self.sql.fetchall()
-
-        recurring_data = self.get_all_recurring_events_within_range(old_date, new_date)
-
-        for event in recurring_data:
-            fetched_data.append(event)
-
-        event_dict = {}
-        start = old_date
-        end = old_date + DAY_IN_SECONDS
-
-        for i in range(days_in_month):
-            day_list = []
-            for row in fetched_data:
-                day_list.append(row) if start <= row[1] <= end else None
-            if len(day_list) > 0:
-                event_dict[i] = day_list
-            start += DAY_IN_SECONDS
-            end += DAY_IN_SECONDS
-
+        """Events of one month starting at old_date, keyed by day of month - 1 (cached, read-only)."""
+        key = ("imp_date", old_date, new_date, days_in_month)
+        version = self.data_version
+        event_dict = self.month_cache.get(key, version)
+        if event_dict is None:
+            fetched_data = self.get_events_within_range(old_date, new_date)
+            event_dict = bucket_by_day(fetched_data, day_boundaries(old_date, days_in_month))
+            self.month_cache.put(key, version, event_dict)
         return event_dict
 
-    def update_event(self, old_start_ts, old_end_ts, data_frame):
-        """Update a single event identified by its original start/end timestamps."""
-        end_opt = int(getattr(data_frame, "recurringEndOptionIndex", 0) or 0)
-
-        end_date = getattr(data_frame, "recurringEndDate", None)
-        end_date_sql = "NULL" if end_date is None else str(end_date)
-
-        end_count = getattr(data_frame, "recurringEndCount", None)
-        end_count_sql = "NULL" if end_count is None else str(int(end_count))
-
-        alert_json = json.dumps(getattr(data_frame, "selectedAlertCheckboxes", []))
-
-        query = (
-            f"UPDATE {Event.TABLE_NAME.value} SET "
-            f"{Event.EVENT_NAME.value} = '{data_frame.eventName}', "
-            f"{Event.START_DATE.value} = {data_frame.eventStartDate}, "
-            f"{Event.END_DATE.value} = {data_frame.eventEndDate}, "
-            f"{Event.DESC.value} = '{data_frame.eventDescription}', "
-            f"{Event.RECURRING.value} = {int(bool(data_frame.isRecurringEvent))}, "
-            f"{Event.ALERTING.value} = {int(bool(data_frame.isAlerting))}, "
-            f"{Event.R_OPTION.value} = {int(data_frame.recurringEventOptionIndex)}, "
-            f"{Event.A_OPTIONS.value} = '{alert_json}', "
-            f"{Event.R_INTERVAL.value} = {data_frame.recurringInterval}, "
-            f"{Event.R_END_OPTIONS.value} = {end_opt}, "
-            f"{Event.R_END_DATE.value} = {end_date_sql}, "
-            f"{Event.R_END_COUNT.value} = {end_count_sql} "
-            f"WHERE {Event.START_DATE.value} = {old_start_ts} "
-            f"AND {Event.END_DATE.value} = {old_end_ts};"
-        )
-
-        self.sql.execute(query)
-        self.sql.commit()
-
-    def delete_event(self, start_ts, end_ts):
-        """Delete a single event identified by its start/end timestamps."""
-        query = (
-            f"DELETE FROM {Event.TABLE_NAME.value} "
-            f"WHERE {Event.START_DATE.value} = {start_ts} "
-            f"AND {Event.END_DATE.value} = {end_ts};"
-        )
-        self.sql.execute(query)
+    def update_event(self, event_id, data_frame):
+        """Update a single event identified by its id."""
+        with self.sql.transaction():
+            # the schedule triggers clear the old occurrences and alerts; refill them here
+            self.sql.execute(UPDATE_EVENT_QUERY, event_params(data_frame) + (event_id,))
+            self._fill_occurrences(occurrence_horizon())
+            self._fill_alerts(time.time())
+        self.mark_changed([event_id])
+
+    def delete_event(self, event_id):
+        """Delete a single event identified by its id (its occurrences and alerts go with it)."""
+        self.sql.execute(DELETE_EVENT_QUERY, (event_id,))
         self.sql.commit()
+        self.mark_changed([event_id])
+
+    # ---------- async API ----------
+    # NiceGUI handlers run on the event loop that serves every client, so pages
+    # await these instead of calling the blocking methods above directly.
+
+    async def run_async(self, fn, *args):
+        """Run a blocking DB call on the DB executor and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def get_all_data_async(self):
+        return await self.run_async(self.get_all_data)
+
+    async def get_event_async(self, event_id):
+        return await self.run_async(self.get_event, event_id)
+
+    async def list_events_async(self, after_start=None, after_id=None, limit=EVENT_PAGE_SIZE):
+        return await self.run_async(self.list_events, after_start, after_id, limit)
+
+    async def search_async(self, query, limit=SEARCH_LIMIT):
+        return await self.run_async(self.search, query, limit)
+
+    async def upcoming_async(self, now=None, horizon=UPCOMING_DAYS, limit=UPCOMING_LIMIT):
+        return await self.run_async(self.upcoming, now, horizon, limit)
+
+    async def add_data_async(self, data_frame):
+        return await self.run_async(self.add_data, data_frame)
+
+    async def add_many_async(self, data_frames):
+        return await self.run_async(self.add_many, data_frames)
+
+    async def update_event_async(self, event_id, data_frame):
+        return await self.run_async(self.update_event, event_id, data_frame)
+
+    async def delete_event_async(self, event_id):
+        return await self.run_async(self.delete_event, event_id)
+
+    def _submit_shared(self, key, version, fn, *args):
+        """
+        Future of fn(*args) on the DB executor, computing the cache entry key
+        at data version. Callers asking for the same key and version while it
+        runs share the one future, so a month is queried once however many
+        clients miss it at the same time (every client misses after a write).
+        Raises RuntimeError once the executor is shut down.
+        """
+        with self._inflight_lock:
+            running = self._inflight.get(key)
+            if running is not None and running[0] == version:
+                return running[1]
+            future = self.executor.submit(fn, *args)
+            self._inflight[key] = (version, future)
+
+        def done(_, key=key, future=future):
+            with self._inflight_lock:
+                if self._inflight.get(key, (None, None))[1] is future:
+                    del self._inflight[key]
+        future.add_done_callback(done)
+        return future
+
+    @staticmethod
+    async def _await_shared(future):
+        # shielded: a cancelled waiter (a client leaving) must not cancel the
+        # query the other waiters share
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def prefetch_main_cal(self, range_min, range_max):
+        """
+        Warm the month cache for a grid range on the DB executor without
+        waiting for it. Returns the running future, or None if the range is
+        already cached (or the executor is shutting down).
+        """
+        key = ("main_cal", range_min, range_max)
+        version = self.data_version
+        if self.month_cache.contains(key, version):
+            return None
+        try:
+            return self._submit_shared(key, version, self.find_events_in_range_main_cal, range_min, range_max)
+        except RuntimeError:
+            return None
+
+    # cache hits are answered on the event loop without an executor hop;
+    # misses join any query already running for the same range
+
+    async def find_events_in_range_main_cal_async(self, range_min, range_max):
+        key = ("main_cal", range_min, range_max)
+        version = self.data_version
+        cached = self.month_cache.get(key, version)
+        if cached is not None:
+            return cached
+        return await self._await_shared(self._submit_shared(
+            key, version, self.find_events_in_range_main_cal, range_min, range_max))
+
+    async def find_events_in_range_imp_date_async(self, old_date, new_date, days_in_month):
+        key = ("imp_date", old_date, new_date, days_in_month)
+        version = self.data_version
+        cached = self.month_cache.get(key, version)
+        if cached is not None:
+            return cached
+        return await self._await_shared(self._submit_shared(
+            key, version, self.find_events_in_range_imp_date, old_date, new_date, days_in_month))
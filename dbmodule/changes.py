@@ -0,0 +1,46 @@
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# One committed write. event_ids is a tuple of the events written, or None
+# when the write isn't per event (bulk inserts, schema changes) and
+# subscribers should reload everything they show.
+EventChange = namedtuple("EventChange", ["version", "event_ids"])
+
+
+class ChangeBus:
+    """
+    In-process publish/subscribe for committed event writes. CalendarData
+    publishes one EventChange per write; views and the reminder scheduler
+    subscribe and patch what they show instead of reloading on a timer.
+    Callbacks run on the publishing (writing) thread and must hand work
+    to their own loop or thread; one that raises is logged and doesn't
+    stop the others or the write.
+    """
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """Call callback(change) after every write; returns callback, for unsubscribe."""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+        return callback
+
+    def unsubscribe(self, callback):
+        # == rather than is: a bound method is a new object on every access
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s != callback]
+
+    def publish(self, change):
+        # the list is replaced, never mutated, so it can be read without the lock
+        for callback in self._subscribers:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("change subscriber %r failed", callback)
+
+    def __len__(self):
+        return len(self._subscribers)
@@ -0,0 +1,77 @@
+import os
+import threading
+
+
+class StatementStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.call_sites = {}    # "file:line function" -> calls
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "slow": self.slow,
+            "call_sites": dict(self.call_sites),
+        }
+
+
+class QueryMetrics:
+    """
+    Per-statement timings, row counts and call sites for one Sql instance.
+    Statements are keyed by their SQL text, which stays small now that
+    values are bound with ? placeholders.
+    """
+    def __init__(self, slow_query_ms=None):
+        if slow_query_ms is None:
+            slow_query_ms = float(os.getenv("SLOW_QUERY_MS", 100))
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._statements = {}
+        self.queries = 0
+        self.slow_queries = 0
+
+    def record(self, query, elapsed_ms, rows, call_site):
+        """Add one statement run; returns True if it crossed the slow threshold."""
+        is_slow = elapsed_ms >= self.slow_query_ms
+        with self._lock:
+            stats = self._statements.get(query)
+            if stats is None:
+                stats = self._statements[query] = StatementStats()
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += max(rows, 0)
+            stats.call_sites[call_site] = stats.call_sites.get(call_site, 0) + 1
+            self.queries += 1
+            if is_slow:
+                stats.slow += 1
+                self.slow_queries += 1
+        return is_slow
+
+    def statement(self, query):
+        with self._lock:
+            stats = self._statements.get(query)
+            return stats.as_dict() if stats else None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "slow_queries": self.slow_queries,
+                "slow_query_ms": self.slow_query_ms,
+                "statements": {q: s.as_dict() for q, s in self._statements.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+            self.queries = 0
+            self.slow_queries = 0
@@ -0,0 +1,308 @@
+import logging
+import time
+from dbmodule.schema import Alert, Event, EventIndex, EventSearch, Occurrence, SchemaVersion
+
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    def __init__(self, version, description, apply):
+        self.version = version
+        self.description = description
+        self.apply = apply      # apply(conn), runs inside the step's transaction
+
+
+# registered steps; versions must only ever be appended, never renumbered
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(apply):
+        MIGRATIONS.append(Migration(version, description, apply))
+        return apply
+    return register
+
+
+def current_version(conn):
+    row = conn.execute(
+        f"SELECT MAX({SchemaVersion.VERSION.value}) FROM {SchemaVersion.TABLE_NAME.value};"
+    ).fetchone()
+    return row[0] or 0
+
+
+def run_migrations(sql_instance):
+    """Apply every migration newer than the stored version, one transaction per step."""
+    conn = sql_instance.conn
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {SchemaVersion.TABLE_NAME.value} ("
+        f"{SchemaVersion.VERSION.value} INTEGER PRIMARY KEY,"
+        f"{SchemaVersion.DESCRIPTION.value} TEXT,"
+        f"{SchemaVersion.APPLIED_AT.value} REAL"
+        f");"
+    )
+    conn.commit()
+
+    version = current_version(conn)
+    for step in sorted(MIGRATIONS, key=lambda m: m.version):
+        if step.version <= version:
+            continue
+        logger.info("applying schema migration %d: %s", step.version, step.description)
+        with sql_instance.transaction() as conn:
+            step.apply(conn)
+            conn.execute(
+                f"INSERT INTO {SchemaVersion.TABLE_NAME.value} ("
+                f"{SchemaVersion.VERSION.value}, "
+                f"{SchemaVersion.DESCRIPTION.value}, "
+                f"{SchemaVersion.APPLIED_AT.value}"
+                f") VALUES (?, ?, ?);",
+                (step.version, step.description, time.time()),
+            )
+        version = step.version
+    return version
+
+
+def rebuild_table(conn, table, create_query, columns, select_columns=None):
+    """
+    Rebuild a table when SQLite's ALTER TABLE can't express the change
+    (primary key, column types, constraints).
+    create_query has a {table} placeholder for the new table's name.
+    Rows are copied with one INSERT ... SELECT in rowid order, then the tables
+    are swapped. This runs inside the migration's transaction, so readers on
+    other connections keep seeing the old table until it commits. Indexes on
+    the old table are dropped with it; the step must recreate them.
+    """
+    new_table = f"{table}_rebuild"
+    conn.execute(f"DROP TABLE IF EXISTS {new_table};")
+    conn.execute(create_query.format(table=new_table))
+
+    target = ", ".join(columns)
+    source = ", ".join(select_columns or columns)
+    conn.execute(f"INSERT INTO {new_table} ({target}) SELECT {source} FROM {table} ORDER BY rowid;")
+
+    conn.execute(f"DROP TABLE {table};")
+    conn.execute(f"ALTER TABLE {new_table} RENAME TO {table};")
+
+
+# ---------- steps ----------
+
+@migration(1, "create events table")
+def _create_events(conn):
+    # IF NOT EXISTS: databases created before migrations already have this table
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {Event.TABLE_NAME.value} ("
+        f"{Event.EVENT_NAME.value} TEXT,"
+        f"{Event.START_DATE.value} REAL NOT NULL,"
+        f"{Event.END_DATE.value} REAL NOT NULL,"
+        f"{Event.DESC.value} TEXT,"
+        f"{Event.RECURRING.value} BOOLEAN,"
+        f"{Event.ALERTING.value} BOOLEAN,"
+        f"{Event.R_OPTION.value} INT,"
+        f"{Event.A_OPTIONS.value} TEXT,"
+        f"{Event.R_INTERVAL.value} INT,"
+        f"{Event.R_END_OPTIONS.value} INT DEFAULT 0,"       # 0 = never
+        f"{Event.R_END_DATE.value} REAL,"                   # nullable
+        f"{Event.R_END_COUNT.value} INT,"                   # nullable
+        f"PRIMARY KEY ({Event.START_DATE.value}, {Event.END_DATE.value})"
+        f");"
+    )
+
+
+@migration(2, "index recurring rows and event names")
+def _index_events(conn):
+    # the WHERE clause must match SELECT_RECURRING_QUERY for the planner to pick it
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {EventIndex.RECURRING_START.value} "
+        f"ON {Event.TABLE_NAME.value} ({Event.START_DATE.value}) "
+        f"WHERE {Event.RECURRING.value} = 1;"
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {EventIndex.NAME.value} "
+        f"ON {Event.TABLE_NAME.value} ({Event.EVENT_NAME.value});"
+    )
+
+
+@migration(3, "integer event id primary key")
+def _add_event_id(conn):
+    # rows keep their old rowid as id; (start_date, end_date) stops being a key
+    # so two events can share a time slot
+    data_columns = [
+        Event.EVENT_NAME.value, Event.START_DATE.value, Event.END_DATE.value,
+        Event.DESC.value, Event.RECURRING.value, Event.ALERTING.value,
+        Event.R_OPTION.value, Event.A_OPTIONS.value, Event.R_INTERVAL.value,
+        Event.R_END_OPTIONS.value, Event.R_END_DATE.value, Event.R_END_COUNT.value,
+    ]
+    rebuild_table(
+        conn,
+        Event.TABLE_NAME.value,
+        "CREATE TABLE {table} ("
+        f"{Event.ID.value} INTEGER PRIMARY KEY,"
+        f"{Event.EVENT_NAME.value} TEXT,"
+        f"{Event.START_DATE.value} REAL NOT NULL,"
+        f"{Event.END_DATE.value} REAL NOT NULL,"
+        f"{Event.DESC.value} TEXT,"
+        f"{Event.RECURRING.value} BOOLEAN,"
+        f"{Event.ALERTING.value} BOOLEAN,"
+        f"{Event.R_OPTION.value} INT,"
+        f"{Event.A_OPTIONS.value} TEXT,"
+        f"{Event.R_INTERVAL.value} INT,"
+        f"{Event.R_END_OPTIONS.value} INT DEFAULT 0,"
+        f"{Event.R_END_DATE.value} REAL,"
+        f"{Event.R_END_COUNT.value} INT"
+        ");",
+        [Event.ID.value] + data_columns,
+        ["rowid"] + data_columns,
+    )
+    conn.execute(
+        f"CREATE INDEX {EventIndex.START.value} "
+        f"ON {Event.TABLE_NAME.value} ({Event.START_DATE.value});"
+    )
+    _index_events(conn)
+
+
+@migration(4, "materialized occurrences of recurring events")
+def _create_occurrences(conn):
+    conn.execute(
+        f"ALTER TABLE {Event.TABLE_NAME.value} "
+        f"ADD COLUMN {Event.OCCURRENCES_UNTIL.value} REAL NOT NULL DEFAULT 0;"
+    )
+    conn.execute(
+        f"CREATE INDEX {EventIndex.OCCURRENCES_PENDING.value} "
+        f"ON {Event.TABLE_NAME.value} ({Event.OCCURRENCES_UNTIL.value}) "
+        f"WHERE {Event.RECURRING.value} = 1;"
+    )
+    # clustered on start_date so a month is one contiguous range scan
+    conn.execute(
+        f"CREATE TABLE {Occurrence.TABLE_NAME.value} ("
+        f"{Occurrence.START_DATE.value} REAL NOT NULL,"
+        f"{Occurrence.EVENT_ID.value} INTEGER NOT NULL,"
+        f"{Occurrence.END_DATE.value} REAL NOT NULL,"
+        f"PRIMARY KEY ({Occurrence.START_DATE.value}, {Occurrence.EVENT_ID.value})"
+        f") WITHOUT ROWID;"
+    )
+    conn.execute(
+        f"CREATE INDEX {Occurrence.INDEX_EVENT.value} "
+        f"ON {Occurrence.TABLE_NAME.value} ({Occurrence.EVENT_ID.value});"
+    )
+
+    # Triggers drop a series' occurrences whenever its schedule changes, so
+    # writers that bypass CalendarData (the chat assistant) can't leave stale
+    # rows behind; CalendarData refills series whose occurrences_until is 0.
+    schedule_columns = ", ".join([
+        Event.START_DATE.value, Event.END_DATE.value, Event.RECURRING.value,
+        Event.R_OPTION.value, Event.R_INTERVAL.value, Event.R_END_OPTIONS.value,
+        Event.R_END_DATE.value, Event.R_END_COUNT.value,
+    ])
+    conn.execute(
+        f"CREATE TRIGGER {Occurrence.TRIGGER_UPDATE.value} "
+        f"AFTER UPDATE OF {schedule_columns} ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"DELETE FROM {Occurrence.TABLE_NAME.value} WHERE {Occurrence.EVENT_ID.value} = OLD.{Event.ID.value}; "
+        f"UPDATE {Event.TABLE_NAME.value} SET {Event.OCCURRENCES_UNTIL.value} = 0 WHERE {Event.ID.value} = NEW.{Event.ID.value}; "
+        f"END;"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {Occurrence.TRIGGER_DELETE.value} "
+        f"AFTER DELETE ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"DELETE FROM {Occurrence.TABLE_NAME.value} WHERE {Occurrence.EVENT_ID.value} = OLD.{Event.ID.value}; "
+        f"END;"
+    )
+
+
+@migration(5, "recompute occurrences with calendar month/year arithmetic")
+def _reset_occurrences(conn):
+    # repeats stored by step 4 used 30/365-day steps; CalendarData refills
+    # every series on the next read
+    conn.execute(f"DELETE FROM {Occurrence.TABLE_NAME.value};")
+    conn.execute(f"UPDATE {Event.TABLE_NAME.value} SET {Event.OCCURRENCES_UNTIL.value} = 0;")
+
+
+@migration(6, "full-text search index over event names and descriptions")
+def _create_event_search(conn):
+    fts = EventSearch.TABLE_NAME.value
+    name, desc = Event.EVENT_NAME.value, Event.DESC.value
+    # prefix indexes keep "meet*" style queries from scanning the whole vocabulary
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{name}, {desc}, "
+        f"content='{Event.TABLE_NAME.value}', content_rowid='{Event.ID.value}', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+        f");"
+    )
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild');")
+
+    # triggers keep the index in step with every writer, CalendarData or not
+    conn.execute(
+        f"CREATE TRIGGER {EventSearch.TRIGGER_INSERT.value} "
+        f"AFTER INSERT ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"INSERT INTO {fts}(rowid, {name}, {desc}) VALUES (NEW.{Event.ID.value}, NEW.{name}, NEW.{desc}); "
+        f"END;"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {EventSearch.TRIGGER_UPDATE.value} "
+        f"AFTER UPDATE OF {name}, {desc} ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {name}, {desc}) VALUES ('delete', OLD.{Event.ID.value}, OLD.{name}, OLD.{desc}); "
+        f"INSERT INTO {fts}(rowid, {name}, {desc}) VALUES (NEW.{Event.ID.value}, NEW.{name}, NEW.{desc}); "
+        f"END;"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {EventSearch.TRIGGER_DELETE.value} "
+        f"AFTER DELETE ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {name}, {desc}) VALUES ('delete', OLD.{Event.ID.value}, OLD.{name}, OLD.{desc}); "
+        f"END;"
+    )
+
+
+@migration(7, "event_alerts table with an indexed next fire time")
+def _create_event_alerts(conn):
+    # existing rows start pending; CalendarData fills their alerts on the next refresh
+    conn.execute(
+        f"ALTER TABLE {Event.TABLE_NAME.value} "
+        f"ADD COLUMN {Event.ALERTS_PENDING.value} INTEGER NOT NULL DEFAULT 1;"
+    )
+    conn.execute(
+        f"CREATE INDEX {EventIndex.ALERTS_PENDING.value} "
+        f"ON {Event.TABLE_NAME.value} ({Event.ALERTS_PENDING.value}) "
+        f"WHERE {Event.ALERTS_PENDING.value} = 1;"
+    )
+    conn.execute(
+        f"CREATE TABLE {Alert.TABLE_NAME.value} ("
+        f"{Alert.EVENT_ID.value} INTEGER NOT NULL,"
+        f"{Alert.MINUTES.value} INTEGER NOT NULL,"
+        f"{Alert.NEXT_FIRE_AT.value} REAL,"
+        f"PRIMARY KEY ({Alert.EVENT_ID.value}, {Alert.MINUTES.value})"
+        f") WITHOUT ROWID;"
+    )
+    # the index carries the primary key, so (next_fire_at, event_id, minutes)
+    # keyset pages are read in index order
+    conn.execute(
+        f"CREATE INDEX {Alert.INDEX_NEXT_FIRE.value} "
+        f"ON {Alert.TABLE_NAME.value} ({Alert.NEXT_FIRE_AT.value}) "
+        f"WHERE {Alert.NEXT_FIRE_AT.value} IS NOT NULL;"
+    )
+
+    # same scheme as the occurrence triggers: any writer changing an event's
+    # alerts or schedule drops its rows and marks it for CalendarData to refill
+    alert_columns = ", ".join([
+        Event.START_DATE.value, Event.RECURRING.value, Event.ALERTING.value,
+        Event.A_OPTIONS.value, Event.R_OPTION.value, Event.R_INTERVAL.value,
+        Event.R_END_OPTIONS.value, Event.R_END_DATE.value, Event.R_END_COUNT.value,
+    ])
+    conn.execute(
+        f"CREATE TRIGGER {Alert.TRIGGER_UPDATE.value} "
+        f"AFTER UPDATE OF {alert_columns} ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"DELETE FROM {Alert.TABLE_NAME.value} WHERE {Alert.EVENT_ID.value} = OLD.{Event.ID.value}; "
+        f"UPDATE {Event.TABLE_NAME.value} SET {Event.ALERTS_PENDING.value} = 1 WHERE {Event.ID.value} = NEW.{Event.ID.value}; "
+        f"END;"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {Alert.TRIGGER_DELETE.value} "
+        f"AFTER DELETE ON {Event.TABLE_NAME.value} "
+        f"BEGIN "
+        f"DELETE FROM {Alert.TABLE_NAME.value} WHERE {Alert.EVENT_ID.value} = OLD.{Event.ID.value}; "
+        f"END;"
+    )
@@ -0,0 +1,218 @@
+import json
+from datetime import datetime
+from dbmodule.schema import (
+    A_OPTIONS, ALERTING, DESCRIPTION, END, ID, NAME, RECURRING, R_END_COUNT, R_END_DATE,
+    R_END_OPTIONS, R_INTERVAL, R_OPTION, START,
+)
+
+# recurring_option index -> label (0 = not recurring)
+FREQUENCY_LABELS = ("None", "Daily", "Weekly", "Monthly", "Yearly")
+FREQUENCY_UNITS = {"Daily": "day", "Weekly": "week", "Monthly": "month", "Yearly": "year"}
+
+
+def format_time_12h(dt):
+    """Return times like '9:00 AM' / '1:05 PM' (no leading zero on hour)."""
+    s = dt.strftime("%I:%M %p")
+    if s.startswith("0"):
+        s = s[1:]
+    return s
+
+
+def recurring_label(option, interval):
+    """'Weekly', 'Every 2 months', ... or None for a one-off event."""
+    freq = FREQUENCY_LABELS[option] if 0 <= option < len(FREQUENCY_LABELS) else "None"
+    if freq == "None":
+        return None
+    if interval <= 1:
+        return freq
+    return f"Every {interval} {FREQUENCY_UNITS[freq]}s"
+
+
+class EventRecord:
+    """
+    One events row as read from the database, wrapping the row tuple itself.
+    Used as the sqlite3 row factory for event reads, so no per-row dataclass
+    or dict is built. Fields read like AddEditEventData (record.eventName)
+    and, for the pages, like the event dicts they draw (record['title'],
+    record.get('start')). Display strings are formatted on first use and
+    kept, so rows that are never drawn are never formatted. Read-only.
+    """
+    __slots__ = ("row", "_start_text", "_end_text", "_alerts")
+
+    def __init__(self, row):
+        self.row = row
+
+    @classmethod
+    def factory(cls, cursor, row):
+        """sqlite3 row_factory signature."""
+        return cls(row)
+
+    def __repr__(self):
+        return f"EventRecord({self.row!r})"
+
+    # ---- AddEditEventData fields ----
+    @property
+    def eventName(self):
+        return self.row[NAME]
+
+    @property
+    def eventDescription(self):
+        return self.row[DESCRIPTION]
+
+    @property
+    def eventStartDate(self):
+        return self.row[START]
+
+    @property
+    def eventEndDate(self):
+        return self.row[END]
+
+    @property
+    def isRecurringEvent(self):
+        return self.row[RECURRING]
+
+    @property
+    def isAlerting(self):
+        return self.row[ALERTING]
+
+    @property
+    def recurringEventOptionIndex(self):
+        return self.row[R_OPTION]
+
+    @property
+    def selectedAlertCheckboxes(self):
+        # alert options as JSON list, if present
+        try:
+            return self._alerts
+        except AttributeError:
+            pass
+        try:
+            alerts = json.loads(self.row[A_OPTIONS]) if self.row[A_OPTIONS] else []
+        except Exception:
+            alerts = []
+        self._alerts = alerts if isinstance(alerts, list) else []
+        return self._alerts
+
+    @property
+    def recurringInterval(self):
+        return self.row[R_INTERVAL]
+
+    @property
+    def recurringEndOptionIndex(self):
+        return self.row[R_END_OPTIONS]      # 0/1/2
+
+    @property
+    def recurringEndDate(self):
+        return self.row[R_END_DATE]         # timestamp or None
+
+    @property
+    def recurringEndCount(self):
+        return self.row[R_END_COUNT]        # int or None
+
+    @property
+    def eventId(self):
+        return self.row[ID]
+
+    # ---- display fields (formatted lazily) ----
+    def _start(self):
+        try:
+            return self._start_text
+        except AttributeError:
+            dt = datetime.fromtimestamp(self.row[START])
+            self._start_text = (dt.strftime("%Y-%m-%d"), format_time_12h(dt))
+            return self._start_text
+
+    def _end(self):
+        try:
+            return self._end_text
+        except AttributeError:
+            dt = datetime.fromtimestamp(self.row[END])
+            self._end_text = (dt.strftime("%Y-%m-%d"), format_time_12h(dt))
+            return self._end_text
+
+    @property
+    def start_date(self):
+        return self._start()[0]
+
+    @property
+    def start(self):
+        return self._start()[1]
+
+    @property
+    def end_date(self):
+        return self._end()[0]
+
+    @property
+    def end(self):
+        return self._end()[1]
+
+    @property
+    def option_index(self):
+        return int(self.row[R_OPTION] or 0)
+
+    @property
+    def interval(self):
+        return int(self.row[R_INTERVAL] or 1)
+
+    @property
+    def recurring(self):
+        # cheap enough not to keep: two ints and at most one f-string
+        return recurring_label(self.option_index, self.interval)
+
+    @property
+    def end_date_iso(self):
+        raw = self.row[R_END_DATE]
+        if isinstance(raw, (int, float)) and raw > 0:
+            return datetime.fromtimestamp(raw).strftime("%Y-%m-%d")
+        return None
+
+    @property
+    def end_count(self):
+        try:
+            return int(self.row[R_END_COUNT]) if self.row[R_END_COUNT] is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    # ---- event dict view used by the pages ----
+    # key -> function of the record; the same keys the pages' own dicts use
+    KEYS = {
+        # DB primary key; edits and deletes address the row by it
+        "id": lambda r: r.row[ID],
+        "title": lambda r: r.row[NAME],
+        "start_date": lambda r: r.start_date,
+        "end_date": lambda r: r.end_date,
+        "start": lambda r: r.start,
+        "end": lambda r: r.end,
+        "recurring": lambda r: r.recurring,
+        # raw timestamps (sorting and date math)
+        "_start_ts": lambda r: r.row[START],
+        "_end_ts": lambda r: r.row[END],
+        "description": lambda r: r.row[DESCRIPTION] or "",
+        "is_recurring": lambda r: bool(r.row[RECURRING]),
+        "is_alerting": lambda r: bool(r.row[ALERTING]),
+        "recurring_option_index": lambda r: r.option_index,
+        "recurring_interval": lambda r: r.interval,
+        "recurring_end_option_index": lambda r: int(r.row[R_END_OPTIONS] or 0),
+        "recurring_end_date": lambda r: r.end_date_iso,
+        "recurring_end_count": lambda r: r.end_count,
+        "selectedAlertCheckboxes": lambda r: r.selectedAlertCheckboxes,
+        # for ReminderComponent (used as initial_labels)
+        "reminders": lambda r: r.selectedAlertCheckboxes,
+    }
+
+    def __getitem__(self, key):
+        return self.KEYS[key](self)
+
+    def get(self, key, default=None):
+        getter = self.KEYS.get(key)
+        return default if getter is None else getter(self)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def keys(self):
+        return self.KEYS.keys()
+
+    def as_dict(self):
+        """A plain, mutable event dict with every key."""
+        return {key: getter(self) for key, getter in self.KEYS.items()}
@@ -0,0 +1,323 @@
+import calendar
+import time
+from datetime import datetime, timedelta
+from dbmodule.schema import (
+    END, RECURRING, R_END_COUNT, R_END_DATE, R_END_OPTIONS, R_INTERVAL, R_OPTION, START,
+)
+
+try:
+    import numpy as np
+except ImportError:     # optional: without it batches are expanded one series at a time
+    np = None
+
+# recurring_option values
+DAILY = 1
+WEEKLY = 2
+MONTHLY = 3
+YEARLY = 4
+
+# recurring_end_options values (see schema.Event)
+END_NEVER = 0
+END_ON_DATE = 1
+END_AFTER_COUNT = 2
+
+# batches with fewer series than this aren't worth vectorizing
+VECTORIZE_MIN_SERIES = 16
+
+DAY_IN_SECONDS = 86400
+EPOCH_DATE = datetime(1970, 1, 1).date()
+MAX_DAY = (datetime(9999, 12, 31).date() - EPOCH_DATE).days
+MAX_MONTH = 9999 * 12 + 11      # year * 12 + month - 1 of December 9999
+
+
+def add_months(dt, months):
+    """Move dt by whole months, clamping the day (Jan 31 + 1 month -> Feb 28/29)."""
+    month_index = dt.month - 1 + months
+    year = dt.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+def nth_occurrence(first, option, interval, k):
+    """
+    Local start of occurrence k of a series (k = 0 is its first start).
+    Steps are counted in wall-clock time, so a 9:00 event stays at 9:00
+    across daylight saving changes, and months/years follow the calendar.
+    """
+    match option:
+        case 1: #Daily
+            return first + timedelta(days=k * interval)
+        case 2: #Weekly
+            return first + timedelta(weeks=k * interval)
+        case 3: #Monthly
+            return add_months(first, k * interval)
+        case 4: #Yearly
+            return add_months(first, 12 * k * interval)
+    raise ValueError(f"unknown recurring option {option!r}")
+
+
+def first_index_at_or_after(first, option, interval, lo):
+    """Smallest k >= 0 whose occurrence starts at or after timestamp lo."""
+    if lo <= first.timestamp():
+        return 0
+    lo_local = datetime.fromtimestamp(lo)
+    # occurrence k of this estimate falls on or before lo's day (month), and
+    # k - 1 strictly before it, so at most one step forward is needed
+    if option in (DAILY, WEEKLY):
+        unit = interval * (1 if option == DAILY else 7)
+        k = (lo_local.date() - first.date()).days // unit
+    else:
+        unit = interval * (1 if option == MONTHLY else 12)
+        k = ((lo_local.year - first.year) * 12 + lo_local.month - first.month) // unit
+    k = max(k, 0)
+    while nth_occurrence(first, option, interval, k).timestamp() < lo:
+        k += 1
+    return k
+
+
+def _starts_from(row, lo):
+    """Repeat start timestamps of a series at or after lo, in order, until it ends."""
+    option = row[R_OPTION]
+    if option not in (DAILY, WEEKLY, MONTHLY, YEARLY):
+        return
+    interval = max(int(row[R_INTERVAL] or 1), 1)
+    first = datetime.fromtimestamp(row[START])
+
+    last_k = None
+    last_day = None
+    match row[R_END_OPTIONS]:
+        case 1: #End Date, occurrences on that day still count
+            if row[R_END_DATE] is not None:
+                last_day = datetime.fromtimestamp(row[R_END_DATE]).date()
+        case 2: #Num Times, including the first occurrence
+            last_k = (row[R_END_COUNT] or 0) - 1
+
+    try:
+        k = max(first_index_at_or_after(first, option, interval, lo), 1)
+        while last_k is None or k <= last_k:
+            occurrence = nth_occurrence(first, option, interval, k)
+            if last_day is not None and occurrence.date() > last_day:
+                return
+            yield occurrence.timestamp()
+            k += 1
+    except (OverflowError, ValueError):
+        return  # ran past year 9999
+
+
+def occurrence_starts(row, lo, hi):
+    """
+    Start timestamps of the repeats of a recurring events row (the series'
+    own first start is not included) with lo <= start <= hi.
+    Cost is O(repeats in the window): the first one is found arithmetically.
+    """
+    starts = []
+    if hi < lo:
+        return starts
+    for timestamp in _starts_from(row, lo):
+        if timestamp > hi:
+            break
+        starts.append(timestamp)
+    return starts
+
+
+def next_start(row, after):
+    """First start of an events row (its own or a repeat's) strictly after timestamp after, or None."""
+    if row[START] > after:
+        return row[START]
+    if row[RECURRING] != 1:
+        return None
+    for timestamp in _starts_from(row, after):
+        if timestamp > after:
+            return timestamp
+    return None
+
+
+def expand_row(row, lo, hi):
+    """Copies of row moved to each repeat in [lo, hi], keeping its duration."""
+    duration = row[END] - row[START]
+    repeated = []
+    for start in occurrence_starts(row, lo, hi):
+        item = list(row)
+        item[START] = start
+        item[END] = start + duration
+        repeated.append(tuple(item))
+    return repeated
+
+
+def expand_rows(rows, lo, hi):
+    """expand_row() for many rows at once; the copies come grouped by row."""
+    positions, starts = occurrence_starts_many(rows, lo, hi)
+    repeated = []
+    for position, start in zip(positions, starts):
+        row = rows[position]
+        repeated.append(row[:START] + (start, start + row[END] - row[START]) + row[END + 1:])
+    return repeated
+
+
+def occurrence_starts_many(rows, lo, hi):
+    """
+    occurrence_starts() for many rows: (positions, starts), where starts[i]
+    is a repeat of rows[positions[i]], grouped by row in start order.
+    lo is one timestamp or a list with one per row. With NumPy installed,
+    large batches are computed with array arithmetic over every series at
+    once; otherwise (and for small batches) row by row.
+    """
+    los = list(lo) if isinstance(lo, (list, tuple)) else [lo] * len(rows)
+    if np is not None and len(rows) >= VECTORIZE_MIN_SERIES:
+        return _occurrence_starts_vectorized(rows, los, hi)
+    positions, starts = [], []
+    for position, (row, row_lo) in enumerate(zip(rows, los)):
+        row_starts = occurrence_starts(row, row_lo, hi)
+        positions.extend([position] * len(row_starts))
+        starts.extend(row_starts)
+    return positions, starts
+
+
+def _local_day_and_month(timestamp):
+    """Local day number since 1970-01-01 and year * 12 + month - 1 of a timestamp."""
+    try:
+        local = datetime.fromtimestamp(timestamp)
+    except (OverflowError, ValueError, OSError):
+        return MAX_DAY, MAX_MONTH
+    return (local.date() - EPOCH_DATE).days, local.year * 12 + local.month - 1
+
+
+def _days_from_civil(year, month, day):
+    # days since 1970-01-01 of proleptic Gregorian dates, on integer arrays
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _utc_offset(u):
+    # local wall-clock seconds minus UTC seconds at instant u
+    return calendar.timegm(time.localtime(u)) - u
+
+
+def _offset_table(u_lo, u_hi):
+    """Instants in [u_lo, u_hi] from which the local UTC offset holds, and those offsets."""
+    points = [u_lo]
+    offsets = [_utc_offset(u_lo)]
+    u = u_lo
+    while u < u_hi:
+        # zones change offset at most once a day, so daily probes find every change
+        nxt = min(u + DAY_IN_SECONDS, u_hi)
+        offset = _utc_offset(nxt)
+        if offset != offsets[-1]:
+            before, after = u, nxt
+            while after - before > 1:
+                middle = (before + after) // 2
+                if _utc_offset(middle) == offsets[-1]:
+                    before = middle
+                else:
+                    after = middle
+            points.append(after)
+            offsets.append(offset)
+        u = nxt
+    return np.array(points, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def _local_to_timestamps(local, fold, points, offsets):
+    """
+    datetime.timestamp() of naive local times given as wall-clock seconds
+    since 1970-01-01, vectorized: the same two-offset search CPython does,
+    including its choices for repeated (fold) and skipped (gap) times.
+    """
+    def offset_at(u):
+        return offsets[np.maximum(np.searchsorted(points, u, side='right') - 1, 0)]
+
+    a = offset_at(local)
+    u1 = local - a
+    t1 = u1 + offset_at(u1)
+    same = t1 == local
+    probe = np.where(fold, u1 + DAY_IN_SECONDS, u1 - DAY_IN_SECONDS)
+    b = np.where(same, offset_at(probe), t1 - u1)
+    u2 = local - b
+    t2 = u2 + offset_at(u2)
+    gap = np.where(fold, np.minimum(u1, u2), np.maximum(u1, u2))
+    return np.where(same & (a == b), u1,
+                    np.where(t2 == local, u2, np.where(same, u1, gap)))
+
+
+def _occurrence_starts_vectorized(rows, los, hi):
+    hi_day, hi_month = _local_day_and_month(hi)
+    series = []     # (position, first day, seconds into day, fraction, first month, day of month,
+                    #  fold, by month, step, last k, last day, lo, k_lo, k_hi)
+    for position, (row, row_lo) in enumerate(zip(rows, los)):
+        option = row[R_OPTION]
+        if option not in (DAILY, WEEKLY, MONTHLY, YEARLY) or hi < row_lo:
+            continue
+        interval = max(int(row[R_INTERVAL] or 1), 1)
+        first = datetime.fromtimestamp(row[START])
+        first_day = (first.date() - EPOCH_DATE).days
+        first_month = first.year * 12 + first.month - 1
+
+        last_k = MAX_DAY
+        last_day = MAX_DAY
+        match row[R_END_OPTIONS]:
+            case 1: #End Date, occurrences on that day still count
+                if row[R_END_DATE] is not None:
+                    last_day = (datetime.fromtimestamp(row[R_END_DATE]).date() - EPOCH_DATE).days
+            case 2: #Num Times, including the first occurrence
+                last_k = (row[R_END_COUNT] or 0) - 1
+
+        # candidate k: one step of slack either side of the window, then masked
+        lo_day, lo_month = _local_day_and_month(max(row_lo, row[START]))
+        by_month = option in (MONTHLY, YEARLY)
+        if by_month:
+            step = interval * (1 if option == MONTHLY else 12)
+            k_lo = (lo_month - first_month) // step - 1
+            k_hi = min((hi_month - first_month) // step + 1, (MAX_MONTH - first_month) // step)
+        else:
+            step = interval * (1 if option == DAILY else 7)
+            k_lo = (lo_day - first_day) // step - 1
+            k_hi = min((hi_day - first_day) // step + 1, (MAX_DAY - first_day) // step)
+        k_lo = max(k_lo, 1)
+        k_hi = min(k_hi, last_k)
+        if k_hi < k_lo:
+            continue
+        # timedelta arithmetic resets fold, replace() (add_months) keeps it
+        fold = first.fold if by_month else 0
+        series.append((
+            position, first_day, first.hour * 3600 + first.minute * 60 + first.second,
+            first.microsecond / 1e6, first_month, first.day, fold, by_month, step,
+            last_day, row_lo, k_lo, k_hi,
+        ))
+    if not series:
+        return [], []
+
+    columns = list(zip(*series))
+    counts = np.array(columns[12], dtype=np.int64) - np.array(columns[11], dtype=np.int64) + 1
+
+    def per_occurrence(column, dtype=np.int64):
+        return np.repeat(np.array(columns[column], dtype=dtype), counts)
+
+    offsets_in_series = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    k = per_occurrence(11) + offsets_in_series
+    step = per_occurrence(8)
+    by_month = per_occurrence(7, bool)
+
+    day = per_occurrence(1) + k * step
+    if by_month.any():
+        # monthly and yearly: whole calendar months, day clamped to the month's length
+        month = per_occurrence(4)[by_month] + k[by_month] * step[by_month]
+        next_month = month + 1
+        month_start = _days_from_civil(month // 12, month % 12 + 1, 1)
+        days_in_month = _days_from_civil(next_month // 12, next_month % 12 + 1, 1) - month_start
+        day[by_month] = month_start + np.minimum(per_occurrence(5)[by_month], days_in_month) - 1
+
+    local = day * DAY_IN_SECONDS + per_occurrence(2)
+    lo_min = min(columns[10])
+    points, offsets = _offset_table(
+        int(max(local.min(), lo_min - 2 * DAY_IN_SECONDS) - 2 * DAY_IN_SECONDS),
+        int(min(local.max(), (MAX_DAY + 1) * DAY_IN_SECONDS) + 2 * DAY_IN_SECONDS),
+    )
+    starts = _local_to_timestamps(local, per_occurrence(6, bool), points, offsets) + per_occurrence(3, float)
+
+    keep = (starts >= per_occurrence(10, float)) & (starts <= hi) & (day <= per_occurrence(9))
+    positions = per_occurrence(0)[keep]
+    return positions.tolist(), starts[keep].tolist()
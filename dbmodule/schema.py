@@ -0,0 +1,118 @@
+from enum import Enum
+
+# data tables
+class Event(Enum):
+    TABLE_NAME = "events"
+
+    ID = "id"                              # INTEGER PRIMARY KEY (rowid alias)
+    EVENT_NAME = "name"
+    START_DATE = "start_date"
+    END_DATE = "end_date"
+    DESC = "description"
+
+    RECURRING = "is_recurring"
+    ALERTING = "is_alerting"
+
+    R_OPTION = "recurring_option"          # daily / weekly / monthly index
+    A_OPTIONS = "alerting_options"         # JSON text of alert checkboxes
+    R_INTERVAL = "recurring_interval"              # e.g. every N days / week pattern
+
+    # End options:
+    # 0 = never ends
+    # 1 = ends on specific date (see R_END_DATE)
+    # 2 = ends after X occurrences (see R_END_COUNT)
+    R_END_OPTIONS = "recurring_end_options"
+    R_END_DATE = "recurring_end_date"      # REAL (timestamp) or NULL
+    R_END_COUNT = "recurring_end_count"    # INTEGER or NULL
+
+    # recurring rows: repeats up to this timestamp are in event_occurrences
+    # (0 = not materialized yet; reset by a trigger when the schedule changes)
+    OCCURRENCES_UNTIL = "occurrences_until"
+
+    # 1 = event_alerts rows need (re)computing from alerting_options
+    # (new rows default to 1; set again by a trigger when alerts or schedule change)
+    ALERTS_PENDING = "alerts_pending"
+
+# data columns of the events table, in the order rows are read and written
+EVENT_COLUMNS = (
+    Event.EVENT_NAME,
+    Event.START_DATE,
+    Event.END_DATE,
+    Event.DESC,
+    Event.RECURRING,
+    Event.ALERTING,
+    Event.R_OPTION,
+    Event.A_OPTIONS,
+    Event.R_INTERVAL,
+    Event.R_END_OPTIONS,
+    Event.R_END_DATE,
+    Event.R_END_COUNT,
+)
+
+# Events rows are always read as EVENT_COLUMNS followed by the id (SELECT_LIST
+# in calendardata). Positions of the fields in such a row, for the modules that
+# index rows directly:
+EVENT_ROW_COLUMNS = EVENT_COLUMNS + (Event.ID,)
+NAME = EVENT_ROW_COLUMNS.index(Event.EVENT_NAME)
+START = EVENT_ROW_COLUMNS.index(Event.START_DATE)
+END = EVENT_ROW_COLUMNS.index(Event.END_DATE)
+DESCRIPTION = EVENT_ROW_COLUMNS.index(Event.DESC)
+RECURRING = EVENT_ROW_COLUMNS.index(Event.RECURRING)
+ALERTING = EVENT_ROW_COLUMNS.index(Event.ALERTING)
+R_OPTION = EVENT_ROW_COLUMNS.index(Event.R_OPTION)
+A_OPTIONS = EVENT_ROW_COLUMNS.index(Event.A_OPTIONS)
+R_INTERVAL = EVENT_ROW_COLUMNS.index(Event.R_INTERVAL)
+R_END_OPTIONS = EVENT_ROW_COLUMNS.index(Event.R_END_OPTIONS)
+R_END_DATE = EVENT_ROW_COLUMNS.index(Event.R_END_DATE)
+R_END_COUNT = EVENT_ROW_COLUMNS.index(Event.R_END_COUNT)
+ID = EVENT_ROW_COLUMNS.index(Event.ID)
+
+# secondary indexes on the events table
+class EventIndex(Enum):
+    START = "idx_events_start"                        # month/day range scans
+    RECURRING_START = "idx_events_recurring_start"    # partial: recurring rows only
+    NAME = "idx_events_name"                          # chat assistant looks events up by name
+    OCCURRENCES_PENDING = "idx_events_occurrences_pending"  # partial: series to (re)materialize
+    ALERTS_PENDING = "idx_events_alerts_pending"            # partial: events whose alerts to (re)compute
+
+# repeats of recurring events, materialized up to a rolling horizon
+class Occurrence(Enum):
+    TABLE_NAME = "event_occurrences"
+
+    EVENT_ID = "event_id"                  # events.id of the series
+    START_DATE = "start_date"
+    END_DATE = "end_date"
+
+    INDEX_EVENT = "idx_occurrences_event"  # clear one series
+    TRIGGER_UPDATE = "trg_events_schedule_changed"
+    TRIGGER_DELETE = "trg_events_deleted"
+
+# reminders normalized out of alerting_options: one row per event and offset,
+# with the time it fires next (advanced repeat by repeat for recurring series)
+class Alert(Enum):
+    TABLE_NAME = "event_alerts"
+
+    EVENT_ID = "event_id"
+    MINUTES = "minutes"                    # fires this many minutes before a start
+    NEXT_FIRE_AT = "next_fire_at"          # REAL (timestamp); NULL once nothing is left to fire
+
+    INDEX_NEXT_FIRE = "idx_event_alerts_next_fire"  # partial: next due alerts, soonest first
+    TRIGGER_UPDATE = "trg_events_alerts_changed"
+    TRIGGER_DELETE = "trg_events_alerts_deleted"
+
+# full-text index over event names and descriptions (FTS5, external content:
+# the text lives in events, rowid = events.id)
+class EventSearch(Enum):
+    TABLE_NAME = "events_fts"
+
+    TRIGGER_INSERT = "trg_events_fts_insert"
+    TRIGGER_UPDATE = "trg_events_fts_update"
+    TRIGGER_DELETE = "trg_events_fts_delete"
+
+# applied migrations, one row per version (see dbmodule/migrations.py)
+class SchemaVersion(Enum):
+    TABLE_NAME = "schema_version"
+
+    VERSION = "version"
+    DESCRIPTION = "description"
+    APPLIED_AT = "applied_at"              # REAL (timestamp)
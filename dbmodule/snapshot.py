@@ -0,0 +1,86 @@
+import bisect
+from array import array
+from dbmodule import recurrence
+from dbmodule.schema import END, ID, RECURRING, START
+
+
+class EventSnapshot:
+    """
+    Read-only, column-wise copy of every event start in memory: one-off
+    events, series starts and materialized repeats from floor to horizon,
+    as parallel arrays sorted by start. A range lookup is two binary
+    searches and a slice. Repeats outside [floor, horizon] are expanded
+    from the kept series rows, so no lookup goes back to SQLite. Built for
+    one data version; CalendarData builds a new one after writes instead
+    of patching this.
+    """
+
+    def __init__(self, event_rows, occurrences, horizon, version, floor=float('-inf')):
+        """
+        event_rows: events rows in SELECT_LIST layout.
+        occurrences: (event_id, start, end) repeats, any order; only those
+        in [floor, horizon] are kept.
+        """
+        self.horizon = horizon
+        self.floor = floor
+        self.version = version
+        self.event_rows = list(event_rows)
+        row_index = {row[ID]: i for i, row in enumerate(self.event_rows)}
+
+        entries = [(row[START], row[ID], row[END], i) for i, row in enumerate(self.event_rows)]
+        entries.extend(
+            (start, event_id, end, row_index[event_id])
+            for event_id, start, end in occurrences
+            if floor <= start <= horizon and event_id in row_index
+        )
+        entries.sort()
+
+        # the columns: start, end and the events row each entry belongs to
+        self.starts = array('d', (entry[0] for entry in entries))
+        self.ends = array('d', (entry[2] for entry in entries))
+        self.rows = array('l', (entry[3] for entry in entries))
+
+        self.recurring_rows = sorted(
+            (row for row in self.event_rows if row[RECURRING] == 1),
+            key=lambda row: row[START],
+        )
+        self._recurring_starts = [row[START] for row in self.recurring_rows]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def within_range(self, start_date, end_date):
+        """Rows (SELECT_LIST layout) starting in [start_date, end_date], like get_events_within_range."""
+        lo = bisect.bisect_left(self.starts, start_date)
+        hi = bisect.bisect_right(self.starts, end_date)
+        result = []
+        for i in range(lo, hi):
+            row = self.event_rows[self.rows[i]]
+            start = self.starts[i]
+            if start == row[START]:
+                result.append(row)
+            else:
+                # a repeat: the series row with this occurrence's times
+                result.append(row[:START] + (start, self.ends[i]) + row[END + 1:])
+        if start_date < self.floor:
+            last = bisect.bisect_right(self._recurring_starts, min(end_date, self.floor))
+            result.extend(
+                item for item in recurrence.expand_rows(
+                    self.recurring_rows[:last], start_date, min(end_date, self.floor))
+                if item[START] < self.floor
+            )
+        if end_date > self.horizon:
+            last = bisect.bisect_right(self._recurring_starts, end_date)
+            result.extend(
+                item for item in recurrence.expand_rows(
+                    self.recurring_rows[:last], max(start_date, self.horizon), end_date)
+                if item[START] > self.horizon
+            )
+        return result
+
+    def stats(self):
+        return {
+            "entries": len(self.starts),
+            "events": len(self.event_rows),
+            "version": self.version,
+        }
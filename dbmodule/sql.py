@@ -1,33 +1,185 @@
 import sqlite3 as sql
+import logging
 import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from enum import Enum
+from dbmodule.metrics import QueryMetrics
 
 DATABASE_PATH = "data/"
 DATABASE_FILE = "followup.db"
 
+# how long a connection waits on a locked database before raising
+BUSY_TIMEOUT_MS = 5000
+
+# sqlite3 keeps compiled statements per connection keyed by SQL text, so
+# callers must bind values with ? placeholders for this cache to get hits
+STATEMENT_CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
 class Sql:
-	def __init__(self):
-		# ensure directory exists
-		os.makedirs(DATABASE_PATH, exist_ok=True)
-		rel_path = os.path.abspath(DATABASE_PATH+DATABASE_FILE)
-		self.conn = sql.connect(rel_path)
-		self.cursor = self.conn.cursor()
+	"""
+	Connection manager shared by every NiceGUI client.
+	Each thread (event loop, executor workers) gets its own connection and
+	cursor, so execute() followed by fetchall() never crosses threads.
+	The database runs in WAL mode so readers don't wait on writers.
+	"""
+	def __init__(self, db_file=None, slow_query_ms=None):
+		if db_file is None:
+			# ensure directory exists
+			os.makedirs(DATABASE_PATH, exist_ok=True)
+			db_file = DATABASE_PATH+DATABASE_FILE
+		self.db_path = os.path.abspath(db_file)
+		self._local = threading.local()
+		self._lock = threading.Lock()
+		self._connections = []
+		self.metrics = QueryMetrics(slow_query_ms)
+
+		# open the boot thread's connection right away so WAL is switched on once
+		self._connect()
+
+	def _connect(self):
+		# check_same_thread is off only so terminate() can close every
+		# connection from the shutdown thread; each one is still used by one thread
+		conn = sql.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+			check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+		conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};")
+		conn.execute("PRAGMA journal_mode = WAL;")
+		conn.execute("PRAGMA synchronous = NORMAL;")
+
+		self._local.conn = conn
+		self._local.cursor = conn.cursor()
+		with self._lock:
+			self._connections.append(conn)
+		return conn
+
+	@property
+	def conn(self):
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			conn = self._connect()
+		return conn
+
+	@property
+	def cursor(self):
+		if getattr(self._local, "cursor", None) is None:
+			self._connect()
+		return self._local.cursor
+
+	@contextmanager
+	def transaction(self):
+		"""
+		Run a block of statements on this thread's connection as one commit.
+		Inside another transaction() block it runs as a savepoint instead: an
+		error undoes only this block, and the commit is left to the outer one.
+		A write made with execute() and not committed yet is committed first,
+		so it can't be swallowed by this block's commit or rollback.
+		"""
+		conn = self.conn
+		# nesting is counted here, not read from conn.in_transaction, which is
+		# also true after a bare execute() write
+		depth = getattr(self._local, "depth", 0)
+		if depth:
+			name = f"nested_{depth}"
+			conn.execute(f"SAVEPOINT {name};")
+			self._local.depth = depth + 1
+			try:
+				yield conn
+				conn.execute(f"RELEASE {name};")
+			except Exception:
+				conn.execute(f"ROLLBACK TO {name};")
+				conn.execute(f"RELEASE {name};")
+				raise
+			finally:
+				self._local.depth = depth
+			return
+
+		if conn.in_transaction:
+			self.commit()
+		# IMMEDIATE takes the write lock up front, and an explicit BEGIN keeps
+		# DDL inside the transaction instead of autocommitting it
+		conn.execute("BEGIN IMMEDIATE;")
+		self._local.depth = 1
+		try:
+			yield conn
+			conn.commit()
+		except Exception:
+			conn.rollback()
+			raise
+		finally:
+			self._local.depth = 0
 
 	def terminate(self):
-		self.conn.close()
+		with self._lock:
+			connections = self._connections
+			self._connections = []
+		for conn in connections:
+			try:
+				conn.close()
+			except sql.Error:
+				pass
+		self._local = threading.local()
 		return None
-	
+
 	def commit(self):
 		self.conn.commit()
-	
-	def execute(self, query):
-		print(query)
-		self.cursor.execute(query)
-		
+
+	def execute(self, query, params=(), row_factory=None):
+		"""Run a statement; rows fetched afterwards go through row_factory (plain tuples by default)."""
+		self._flush_pending()
+		# the cursor is reused, so the factory is set (or cleared) on every call
+		self.cursor.row_factory = row_factory
+		start = time.perf_counter()
+		self.cursor.execute(query, params)
+		elapsed_ms = (time.perf_counter() - start) * 1000
+		if self.cursor.description is not None:
+			# a SELECT does most of its work while rows are fetched, so the
+			# statement is recorded by fetchall() with the fetch time added
+			self._local.pending = (query, elapsed_ms, _call_site())
+		else:
+			self._record(query, elapsed_ms, self.cursor.rowcount, _call_site())
+
+	def executemany(self, query, param_rows):
+		self._flush_pending()
+		start = time.perf_counter()
+		self.cursor.executemany(query, param_rows)
+		elapsed_ms = (time.perf_counter() - start) * 1000
+		self._record(query, elapsed_ms, self.cursor.rowcount, _call_site())
+
+	def _record(self, query, elapsed_ms, rows, call_site):
+		if self.metrics.record(query, elapsed_ms, rows, call_site):
+			logger.warning("slow query (%.1f ms, %d rows) at %s: %s", elapsed_ms, max(rows, 0), call_site, query)
+
+	def _flush_pending(self, fetch_ms=0.0, rows=0):
+		pending = getattr(self._local, "pending", None)
+		if pending is not None:
+			self._local.pending = None
+			query, elapsed_ms, call_site = pending
+			self._record(query, elapsed_ms + fetch_ms, rows, call_site)
+
+	def query_plan(self, query, params=()):
+		"""Return the detail column of EXPLAIN QUERY PLAN for a statement."""
+		rows = self.conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+		return [row[-1] for row in rows]
+
 	def fetchall(self):
-		return self.cursor.fetchall()
-		
+		start = time.perf_counter()
+		rows = self.cursor.fetchall()
+		self._flush_pending((time.perf_counter() - start) * 1000, len(rows))
+		return rows
+
 	def row_count(self):
 		return self.cursor.rowcount
-		
-	
+
+
+def _call_site():
+	"""'file:line function' of the code that called into Sql (skips this module)."""
+	frame = sys._getframe(2)
+	while frame is not None and frame.f_code.co_filename == __file__:
+		frame = frame.f_back
+	if frame is None:
+		return "unknown"
+	return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
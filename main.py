@@ -1,9 +1,12 @@
+from fastapi import Depends
 from nicegui import app, ui
+from app.admin import require_admin_token
 from app.sharedVars import SharedVars
 from app.layout import with_sidebar, with_just_sidebar
 from app.pages import home, upload_schedule, add_edit, events, chat_assistant
 from dbmodule.sql import Sql
 from dbmodule.calendardata import CalendarData
+from app.reminders import ReminderScheduler
 sqlInstance = None
 
 @ui.page('/')
@@ -16,6 +19,21 @@ def home_page():
 def health():
 	return "OK"
 
+# statement text, call sites and internals: only for requests with the admin token
+@app.get('/admin/db-metrics', dependencies=[Depends(require_admin_token)])
+def db_metrics():
+	snapshot = sqlInstance.metrics.snapshot()
+	snapshot["month_cache"] = calendarData.month_cache.stats()
+	event_snapshot = calendarData.snapshot
+	snapshot["event_snapshot"] = {
+		"enabled": calendarData.use_snapshot,
+		**(event_snapshot.stats() if event_snapshot is not None else {}),
+	}
+	snapshot["reminders"] = reminderScheduler.stats()
+	# open views (plus the reminder scheduler) receiving pushed changes
+	snapshot["change_subscribers"] = len(calendarData.changes)
+	return snapshot
+
 @ui.page('/events')
 def events_page():
 	ui.page_title('FollowUp/Events')
@@ -24,7 +42,7 @@ def events_page():
 @ui.page('/upload')
 def upload_page():
 	ui.page_title('FollowUp/Upload')
-	upload_ui = upload_schedule.UploadSchedule()
+	upload_ui = upload_schedule.UploadSchedule(calendar_data=calendarData)
 	with_sidebar(upload_ui.show)
 
 @ui.page('/add-edit')
@@ -37,7 +55,7 @@ def add_edit_page():
 @ui.page('/assistant')
 def assistant_page():
 	ui.page_title('FollowUp/Assistant')
-	chat_ui = chat_assistant.ChatPage()
+	chat_ui = chat_assistant.ChatPage(calendar_data=calendarData)
 	with_sidebar(chat_ui.show)
 
 # ---------- MODULE SETUP ----------
@@ -45,14 +63,16 @@ def initModules():
 	global sharedVariables
 	global sqlInstance
 	global calendarData
+	global reminderScheduler
 
 	sharedVariables = SharedVars()
 	sqlInstance = Sql()
-	calendarData = CalendarData(sqlInstance)
+	calendarData = CalendarData(sqlInstance, use_snapshot=sharedVariables.EVENT_SNAPSHOT)
 	
 	calendarData.build_data()
 	calendarData.verify_data()
-	calendarData.print_all_data()
+	# fires event reminders to connected clients once the event loop runs
+	reminderScheduler = ReminderScheduler(calendarData)
 
 	return None
 
@@ -60,10 +80,14 @@ def initModules():
 def terminateModules(sql_instance):
 	print("Gracefully close database connection.")
 	try:
+		calendarData.shutdown()
 		sql_instance.terminate()
 	except Exception:
 		pass
 
 if __name__ in {"__main__", "__mp_main__"}:
 	initModules()
+	app.on_startup(reminderScheduler.start)
+	app.on_shutdown(reminderScheduler.stop)
+	app.on_shutdown(lambda: terminateModules(sqlInstance))
 	ui.run(host="0.0.0.0", storage_secret=sharedVariables.STORAGE_SECRET, port=sharedVariables.PORT)
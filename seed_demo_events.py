@@ -108,12 +108,14 @@ def seed_demo_events():
 
     demo_events = [e1, e2, e3, e4, e5]
 
-    for ev in demo_events:
-        cal.add_data(ev)
+    outcomes = cal.add_many(demo_events)
+    inserted = outcomes.count(None)
 
-    sql_instance.commit()
     sql_instance.terminate()
-    print(f"Inserted {len(demo_events)} demo events into followup.db")
+    print(f"Inserted {inserted} demo events into followup.db")
+    for ev, err in zip(demo_events, outcomes):
+        if err is not None:
+            print(f"  skipped {ev.eventName!r}: {err}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+"""Fixtures shared by the test modules: throwaway databases and event frames."""
+import os
+import tempfile
+import unittest
+from app.sharedVars import AddEditEventData
+from dbmodule.calendardata import CalendarData
+from dbmodule.sql import Sql
+
+
+def make_frame(name, start, end, **kwargs):
+    """An AddEditEventData from start to end; desc= sets the description, other keywords set fields."""
+    frame = AddEditEventData()
+    frame.eventName = name
+    frame.eventDescription = kwargs.pop("desc", "")
+    frame.eventStartDate = start
+    frame.eventEndDate = end
+    for key, value in kwargs.items():
+        setattr(frame, key, value)
+    return frame
+
+
+def alerting_frame(name, start, alerts=("At time of event",), **kwargs):
+    """A ten-minute event reminding at each of alerts (REMINDER_OPTIONS labels)."""
+    kwargs.setdefault("isAlerting", True)
+    return make_frame(name, start, start + 600, selectedAlertCheckboxes=list(alerts), **kwargs)
+
+
+def temp_sql(test, **options):
+    """A Sql on a new database file, closed and removed when test finishes."""
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    sql = Sql(os.path.join(tmp.name, "test.db"), **options)
+    test.addCleanup(sql.terminate)
+    return sql
+
+
+def temp_calendar(test, sql):
+    """A built CalendarData over sql, shut down when test finishes."""
+    cal = CalendarData(sql)
+    cal.build_data()
+    test.addCleanup(cal.shutdown)
+    return cal
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """self.sql on a fresh database file per test; sql_options are passed to Sql."""
+    sql_options = {}
+
+    def setUp(self):
+        self.sql = temp_sql(self, **self.sql_options)
+
+
+class CalendarTestCase(DatabaseTestCase):
+    """DatabaseTestCase with self.cal, a built CalendarData over self.sql."""
+
+    def setUp(self):
+        super().setUp()
+        self.cal = temp_calendar(self, self.sql)
+
+
+class AsyncCalendarTestCase(unittest.IsolatedAsyncioTestCase):
+    """CalendarTestCase for coroutine tests (the *_async API)."""
+
+    def setUp(self):
+        self.sql = temp_sql(self)
+        self.cal = temp_calendar(self, self.sql)
@@ -0,0 +1,39 @@
+import os
+import unittest
+from unittest import mock
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from app.admin import ADMIN_TOKEN_HEADER, require_admin_token
+
+
+class TestAdminToken(unittest.TestCase):
+
+    def setUp(self):
+        api = FastAPI()
+
+        @api.get('/admin/db-metrics', dependencies=[Depends(require_admin_token)])
+        def metrics():
+            return {"ok": True}
+
+        self.client = TestClient(api)
+
+    def get(self, token=None):
+        headers = {} if token is None else {ADMIN_TOKEN_HEADER: token}
+        return self.client.get('/admin/db-metrics', headers=headers)
+
+    def test_rejected_while_no_token_is_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('ADMIN_TOKEN', None)
+            self.assertEqual(self.get().status_code, 404)
+            self.assertEqual(self.get('').status_code, 404)
+
+    def test_rejected_without_the_right_token(self):
+        with mock.patch.dict(os.environ, {'ADMIN_TOKEN': 's3cret'}):
+            self.assertEqual(self.get().status_code, 404)
+            self.assertEqual(self.get('wrong').status_code, 404)
+
+    def test_allowed_with_the_token(self):
+        with mock.patch.dict(os.environ, {'ADMIN_TOKEN': 's3cret'}):
+            response = self.get('s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ok": True})
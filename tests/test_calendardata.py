@@ -0,0 +1,575 @@
+import asyncio
+import os
+import sqlite3
+import time
+import unittest
+from datetime import datetime
+from dbmodule import schema
+from dbmodule.schema import EventIndex
+from dbmodule.calendardata import (
+    bucket_by_day,
+    day_boundaries,
+    fts_query,
+    occurrence_floor,
+    occurrence_horizon,
+    OCCURRENCE_EXTEND_DAYS,
+    DELETE_EVENT_QUERY,
+    SELECT_EVENT_QUERY,
+    SELECT_NEXT_ALERTS_QUERY,
+    SELECT_NEXT_PAGE_QUERY,
+    SELECT_WINDOW_QUERY,
+    SELECT_RANGE_QUERY,
+    SELECT_RECURRING_QUERY,
+    SELECT_UPCOMING_QUERY,
+)
+from helpers import AsyncCalendarTestCase, CalendarTestCase, alerting_frame, make_frame
+
+DAY = 86400
+BASE = 1_700_000_000.0
+
+
+class CalendarDataTestCase(CalendarTestCase):
+
+    def assertQueryUsesIndex(self, query, params, index_name):
+        """Fail unless EXPLAIN QUERY PLAN searches the given index (no full scan)."""
+        plan = self.sql.query_plan(query, params)
+        self.assertTrue(
+            any(index_name in step and step.startswith("SEARCH") for step in plan),
+            f"expected a SEARCH using {index_name}, got plan {plan}",
+        )
+
+
+class TestCalendarDataStatements(CalendarDataTestCase):
+
+    def test_quotes_in_text_round_trip(self):
+        self.cal.add_data(make_frame("Bob's \"party\"", BASE, BASE + 3600, desc="it's on"))
+        frames = self.cal.get_all_data()
+        self.assertEqual(frames[0].eventName, "Bob's \"party\"")
+        self.assertEqual(frames[0].eventDescription, "it's on")
+
+    def test_update_and_delete_by_id(self):
+        event_id = self.cal.add_data(make_frame("Old", BASE, BASE + 3600))
+        self.cal.update_event(event_id, make_frame("New", BASE + DAY, BASE + DAY + 60))
+        frames = self.cal.get_all_data()
+        self.assertEqual(
+            [(f.eventId, f.eventName, f.eventStartDate) for f in frames],
+            [(event_id, "New", BASE + DAY)],
+        )
+
+        self.cal.delete_event(event_id)
+        self.assertEqual(self.cal.get_all_data(), [])
+
+    def test_rows_follow_schema_positions(self):
+        event_id = self.cal.add_data(make_frame(
+            "Row", BASE, BASE + 60, desc="d", isRecurringEvent=True, recurringEventOptionIndex=2,
+            recurringInterval=3, recurringEndOptionIndex=2, recurringEndCount=4,
+        ))
+        self.sql.execute(SELECT_EVENT_QUERY, (event_id,))
+        (row,) = self.sql.fetchall()
+        self.assertEqual(
+            (row[schema.NAME], row[schema.START], row[schema.END], row[schema.DESCRIPTION],
+             row[schema.R_OPTION], row[schema.R_INTERVAL], row[schema.R_END_COUNT], row[schema.ID]),
+            ("Row", BASE, BASE + 60, "d", 2, 3, 4, event_id),
+        )
+
+    def test_events_can_share_a_time_slot(self):
+        first = self.cal.add_data(make_frame("a", BASE, BASE + 60))
+        second = self.cal.add_data(make_frame("b", BASE, BASE + 60))
+        self.assertNotEqual(first, second)
+
+        self.cal.delete_event(first)
+        self.assertEqual([f.eventName for f in self.cal.get_all_data()], ["b"])
+
+    def test_find_events_in_range_main_cal_buckets_by_day(self):
+        self.cal.add_data(make_frame("a", BASE + 60, BASE + 120))
+        self.cal.add_data(make_frame("b", BASE + 2 * DAY + 60, BASE + 2 * DAY + 120))
+        buckets = self.cal.find_events_in_range_main_cal(BASE, BASE + 42 * DAY)
+        self.assertEqual(sorted(buckets), [0, 2])
+        self.assertEqual(buckets[2][0][0], "b")
+
+
+class TestDayBucketing(unittest.TestCase):
+
+    def setUp(self):
+        self._old_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "America/Vancouver"      # DST starts 2024-03-10
+        time.tzset()
+
+    def tearDown(self):
+        if self._old_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._old_tz
+        time.tzset()
+
+    def test_boundaries_are_local_midnights_across_dst(self):
+        boundaries = day_boundaries(datetime(2024, 3, 9).timestamp(), 3)
+        self.assertEqual([b - a for a, b in zip(boundaries, boundaries[1:])], [DAY, DAY - 3600, DAY])
+
+    def test_late_event_after_dst_change_stays_on_its_day(self):
+        boundaries = day_boundaries(datetime(2024, 3, 1).timestamp(), 31)
+        late = ("late", datetime(2024, 3, 20, 23, 30).timestamp())
+        midnight = ("midnight", datetime(2024, 3, 21).timestamp())
+        early = ("early", datetime(2024, 3, 20, 8).timestamp())
+        buckets = bucket_by_day([late, midnight, early], boundaries)
+        self.assertEqual(buckets, {19: [early, late], 20: [midnight]})
+
+    def test_rows_outside_the_grid_are_dropped(self):
+        boundaries = day_boundaries(datetime(2024, 3, 1).timestamp(), 2)
+        rows = [("before", boundaries[0] - 1), ("after", boundaries[-1])]
+        self.assertEqual(bucket_by_day(rows, boundaries), {})
+
+
+class TestCalendarDataIndexes(CalendarDataTestCase):
+
+    def test_recurring_lookup_uses_partial_index(self):
+        self.assertQueryUsesIndex(
+            SELECT_RECURRING_QUERY, (BASE,), EventIndex.RECURRING_START.value
+        )
+
+    def test_name_lookup_uses_name_index(self):
+        self.assertQueryUsesIndex(
+            "DELETE FROM events WHERE name = ?;", ("x",), EventIndex.NAME.value
+        )
+
+    def test_range_lookup_uses_start_index(self):
+        self.assertQueryUsesIndex(
+            SELECT_RANGE_QUERY, (BASE, BASE + DAY), EventIndex.START.value
+        )
+
+    def test_id_lookup_uses_rowid(self):
+        self.assertQueryUsesIndex(DELETE_EVENT_QUERY, (1,), "INTEGER PRIMARY KEY")
+
+
+class TestCalendarDataListEvents(CalendarDataTestCase):
+
+    def test_pages_walk_every_event_in_start_order(self):
+        # pairs share a start time, so the id has to break ties in the cursor
+        self.cal.add_many([make_frame(f"e{i}", BASE + (i // 2) * 60, BASE + DAY) for i in range(11)[::-1]])
+        seen = []
+        after_start = after_id = None
+        while True:
+            frames = self.cal.list_events(after_start, after_id, limit=4)
+            seen.extend((f.eventStartDate, f.eventId) for f in frames)
+            if len(frames) < 4:
+                break
+            after_start, after_id = frames[-1].eventStartDate, frames[-1].eventId
+        self.assertEqual(len(seen), 11)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_get_event(self):
+        event_id = self.cal.add_data(make_frame("one", BASE, BASE + 60))
+        self.assertEqual(self.cal.get_event(event_id).eventName, "one")
+        self.assertIsNone(self.cal.get_event(event_id + 1))
+
+    def test_next_page_uses_start_index(self):
+        self.assertQueryUsesIndex(SELECT_NEXT_PAGE_QUERY, (BASE, 1, 50), EventIndex.START.value)
+
+
+class TestCalendarDataSearch(CalendarDataTestCase):
+
+    def names(self, query):
+        return [f.eventName for f in self.cal.search(query)]
+
+    def test_name_hits_rank_above_description_hits(self):
+        self.cal.add_data(make_frame("Lunch", BASE, BASE + 60, desc="team meeting afterwards"))
+        self.cal.add_data(make_frame("Team meeting", BASE + DAY, BASE + DAY + 60))
+        self.cal.add_data(make_frame("Dentist", BASE, BASE + 60))
+        self.assertEqual(self.names("meeting"), ["Team meeting", "Lunch"])
+
+    def test_last_word_matches_as_prefix(self):
+        self.cal.add_data(make_frame("Weekly lab meeting", BASE, BASE + 60))
+        self.assertEqual(self.names("lab mee"), ["Weekly lab meeting"])
+        self.assertEqual(self.names("mee lab"), [])
+
+    def test_index_follows_updates_deletes_and_direct_sql(self):
+        event_id = self.cal.add_data(make_frame("Standup", BASE, BASE + 60))
+        self.cal.update_event(event_id, make_frame("Retro", BASE, BASE + 60))
+        self.assertEqual(self.names("standup"), [])
+        self.assertEqual(self.names("retro"), ["Retro"])
+
+        with self.sql.transaction() as conn:
+            conn.execute("INSERT INTO events (name, start_date, end_date) VALUES ('Gym', ?, ?);", (BASE, BASE))
+        self.assertEqual(self.names("gym"), ["Gym"])
+
+        self.cal.delete_event(event_id)
+        self.assertEqual(self.names("retro"), [])
+
+    def test_operators_and_punctuation_are_plain_text(self):
+        self.cal.add_data(make_frame("Bob's party", BASE, BASE + 60))
+        self.assertEqual(self.names('bob\'s "party" OR NOT'), [])
+        self.assertEqual(self.names("bob's par"), ["Bob's party"])
+        self.assertIsNone(fts_query("  -- ! "))
+        self.assertEqual(self.cal.search("?!"), [])
+
+
+class TestCalendarDataAddMany(CalendarDataTestCase):
+
+    def test_add_many_inserts_batch(self):
+        frames = [make_frame(f"e{i}", BASE + i * DAY, BASE + i * DAY + 60) for i in range(40)]
+        outcomes = self.cal.add_many(frames)
+        self.assertEqual(outcomes, [None] * 40)
+        self.assertEqual(len(self.cal.get_all_data()), 40)
+
+    def test_add_many_reports_bad_rows_and_keeps_good_ones(self):
+        frames = [
+            make_frame("ok", BASE, BASE + 60),
+            make_frame("no start", None, BASE + 60),
+            make_frame(None, BASE, BASE + 60, isRecurringEvent=True, recurringEventOptionIndex="x"),
+            make_frame("backwards", BASE + 120, BASE + 60),
+            make_frame("also ok", BASE + DAY, BASE + DAY + 60),
+        ]
+        outcomes = self.cal.add_many(frames)
+        self.assertIsNone(outcomes[0])
+        self.assertIn("invalid", outcomes[1])
+        self.assertIn("invalid", outcomes[2])
+        self.assertIsNotNone(outcomes[3])
+        self.assertIsNone(outcomes[4])
+        names = sorted(f.eventName for f in self.cal.get_all_data())
+        self.assertEqual(names, ["also ok", "ok"])
+
+
+class TestCalendarDataOccurrences(CalendarDataTestCase):
+
+    def weekly(self, name="standup", start=BASE, **kwargs):
+        kwargs.setdefault("recurringEndOptionIndex", 0)
+        return make_frame(
+            name, start, start + 3600,
+            isRecurringEvent=True, recurringEventOptionIndex=2, recurringInterval=1, **kwargs,
+        )
+
+    def occurrence_count(self, event_id):
+        self.sql.execute("SELECT COUNT(*) FROM event_occurrences WHERE event_id = ?;", (event_id,))
+        return self.sql.fetchall()[0][0]
+
+    def test_add_materializes_repeats(self):
+        event_id = self.cal.add_data(self.weekly())
+        self.assertGreater(self.occurrence_count(event_id), 52)
+        buckets = self.cal.find_events_in_range_main_cal(BASE - 60, BASE - 60 + 42 * DAY)
+        self.assertEqual(sorted(buckets), [0, 7, 14, 21, 28, 35])
+        repeat = buckets[7][0]
+        self.assertEqual((repeat[1], repeat[2]), (BASE + 7 * DAY, BASE + 7 * DAY + 3600))
+
+    def test_update_and_delete_refresh_occurrences(self):
+        # recent, so every repeat is inside the materialized window
+        start = float(int(time.time()))
+        event_id = self.cal.add_data(self.weekly(start=start, recurringEndOptionIndex=2, recurringEndCount=3))
+        self.assertEqual(self.occurrence_count(event_id), 2)     # the first is the event itself
+
+        self.cal.update_event(event_id, self.weekly(start=start + DAY, recurringEndOptionIndex=2, recurringEndCount=5))
+        self.assertEqual(self.occurrence_count(event_id), 4)
+        repeats = self.cal.get_all_recurring_events_within_range(start, start + 60 * DAY)
+        self.assertEqual([r[1] for r in sorted(repeats)], [start + DAY + k * 7 * DAY for k in range(1, 5)])
+
+        self.cal.delete_event(event_id)
+        self.assertEqual(self.occurrence_count(event_id), 0)
+
+    def test_direct_sql_update_is_picked_up_on_next_read(self):
+        event_id = self.cal.add_data(self.weekly())
+        with self.sql.transaction() as conn:
+            conn.execute("UPDATE events SET recurring_option = 1 WHERE id = ?;", (event_id,))
+        self.assertEqual(self.occurrence_count(event_id), 0)
+
+        repeats = self.cal.get_all_recurring_events_within_range(BASE, BASE + 3 * DAY)
+        self.assertEqual([r[1] for r in sorted(repeats)], [BASE + DAY, BASE + 2 * DAY, BASE + 3 * DAY])
+
+    def test_windows_past_horizon_expand_on_the_fly(self):
+        self.cal.add_data(self.weekly())
+        window_start = occurrence_horizon() + 3 * 365 * DAY
+        buckets = self.cal.find_events_in_range_main_cal(window_start, window_start + 42 * DAY)
+        self.assertEqual(sum(len(day) for day in buckets.values()), 6)
+
+    def test_old_series_materializes_only_from_the_floor(self):
+        start = float(int(time.time())) - 5 * 365 * DAY
+        event_id = self.cal.add_data(make_frame(
+            "daily", start, start + 600,
+            isRecurringEvent=True, recurringEventOptionIndex=1, recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        floor, horizon = occurrence_floor(), occurrence_horizon()
+        self.sql.execute(
+            "SELECT COUNT(*), MIN(start_date) FROM event_occurrences WHERE event_id = ?;", (event_id,))
+        count, first = self.sql.fetchall()[0]
+        self.assertGreaterEqual(first, floor - DAY)
+        self.assertLessEqual(count, (horizon - floor) / DAY + OCCURRENCE_EXTEND_DAYS + 2)
+
+        # windows before the floor still show the repeats, expanded on the fly
+        repeats = self.cal.get_all_recurring_events_within_range(start + 100 * DAY, start + 106 * DAY)
+        self.assertEqual(len(repeats), 7)
+        lo, hi = floor - 3 * DAY, floor + 3 * DAY
+        around_floor = self.cal.get_all_recurring_events_within_range(lo, hi)
+        expected = [start + k * DAY for k in range(1, 6 * 365) if lo <= start + k * DAY <= hi]
+        self.assertEqual(sorted(r[1] for r in around_floor), expected)
+
+    def test_window_query_scans_both_indexes(self):
+        plan = self.sql.query_plan(SELECT_WINDOW_QUERY, (BASE, BASE + DAY, BASE, BASE + DAY))
+        self.assertTrue(any(EventIndex.START.value in step for step in plan), plan)
+        self.assertTrue(any(step.startswith("SEARCH o USING PRIMARY KEY") for step in plan), plan)
+
+
+class TestCalendarDataUpcoming(CalendarDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # noon, so "today" and the 30-day cutoff are whole local days away
+        today = datetime.now()
+        self.now = datetime(today.year, today.month, today.day, 12).timestamp()
+
+    def at(self, days, hour=9):
+        day = datetime.fromtimestamp(self.now).date()
+        return datetime(day.year, day.month, day.day, hour).timestamp() + days * DAY
+
+    def test_merges_one_off_events_and_repeats_in_start_order(self):
+        series = self.cal.add_data(make_frame(
+            "standup", self.at(-14), self.at(-14) + 3600,
+            isRecurringEvent=True, recurringEventOptionIndex=2, recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        one_off = self.cal.add_data(make_frame("dentist", self.at(3, 15), self.at(3, 16)))
+        frames = self.cal.upcoming(self.now)
+        self.assertEqual(
+            [(f.eventId, f.eventStartDate) for f in frames][:3],
+            [(one_off, self.at(3, 15)), (series, self.at(7)), (series, self.at(14))],
+        )
+        self.assertEqual([f.eventStartDate for f in frames], sorted(f.eventStartDate for f in frames))
+        self.assertEqual(len(frames), 5)    # days 3, 7, 14, 21, 28
+
+    def test_window_runs_from_now_to_the_end_of_the_last_day(self):
+        self.cal.add_data(make_frame("earlier today", self.at(0, 8), self.at(0, 9)))
+        self.cal.add_data(make_frame("later today", self.at(0, 18), self.at(0, 19)))
+        self.cal.add_data(make_frame("last day", self.at(30, 23), self.at(30, 23) + 600))
+        self.cal.add_data(make_frame("too far", self.at(31, 0), self.at(31, 1)))
+        self.assertEqual(
+            [f.eventName for f in self.cal.upcoming(self.now)],
+            ["later today", "last day"],
+        )
+
+    def test_window_past_the_horizon_expands_on_the_fly(self):
+        self.cal.add_data(make_frame(
+            "standup", self.at(0), self.at(0) + 3600,
+            isRecurringEvent=True, recurringEventOptionIndex=2, recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        far = self.at(3 * 365, 12)
+        frames = self.cal.upcoming(far)
+        self.assertTrue(4 <= len(frames) <= 5, len(frames))
+        self.assertTrue(all(far <= f.eventStartDate for f in frames))
+
+    def test_limit(self):
+        for day in range(1, 10):
+            self.cal.add_data(make_frame(f"e{day}", self.at(day), self.at(day) + 60))
+        self.assertEqual([f.eventName for f in self.cal.upcoming(self.now, limit=3)], ["e1", "e2", "e3"])
+
+    def test_query_uses_both_start_indexes(self):
+        plan = self.sql.query_plan(SELECT_UPCOMING_QUERY, (BASE, BASE + DAY, BASE, BASE + DAY, 10))
+        self.assertTrue(any(EventIndex.START.value in step for step in plan), plan)
+        self.assertTrue(any(step.startswith("SEARCH o USING PRIMARY KEY") for step in plan), plan)
+
+
+class TestCalendarDataSnapshot(CalendarDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cal.add_data(make_frame("one-off", BASE + 2 * DAY, BASE + 2 * DAY + 3600))
+        self.cal.add_data(make_frame("same slot", BASE + 2 * DAY, BASE + 2 * DAY + 60))
+        self.cal.add_data(make_frame(
+            "weekly", BASE, BASE + 1800,
+            isRecurringEvent=True, recurringEventOptionIndex=2, recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        self.cal.add_data(make_frame(
+            "monthly x3", BASE + DAY, BASE + DAY + 600,
+            isRecurringEvent=True, recurringEventOptionIndex=3, recurringInterval=1,
+            recurringEndOptionIndex=2, recurringEndCount=3,
+        ))
+
+    def both_paths(self, start, end):
+        self.cal.set_snapshot(False)
+        from_sql = sorted(self.cal.get_events_within_range(start, end))
+        self.cal.set_snapshot(True)
+        from_snapshot = sorted(self.cal.get_events_within_range(start, end))
+        return from_sql, from_snapshot
+
+    def test_matches_sql_path(self):
+        far = occurrence_horizon() + 400 * DAY
+        for start, end in [
+            (BASE - DAY, BASE + 100 * DAY),
+            (BASE + 2 * DAY, BASE + 2 * DAY),       # both ends inclusive
+            (occurrence_floor() - 30 * DAY, occurrence_floor() + 30 * DAY),
+            (occurrence_horizon() - 30 * DAY, occurrence_horizon() + 30 * DAY),
+            (far, far + 42 * DAY),
+        ]:
+            from_sql, from_snapshot = self.both_paths(start, end)
+            self.assertEqual(from_snapshot, from_sql, (start, end))
+            self.assertTrue(from_sql)
+
+    def test_writes_rebuild_it(self):
+        self.cal.set_snapshot(True)
+        before = self.cal.current_snapshot()
+        self.assertIs(self.cal.current_snapshot(), before)
+        event_id = self.cal.add_data(make_frame("new", BASE + 3 * DAY, BASE + 3 * DAY + 60))
+        names = [row[0] for row in self.cal.get_events_within_range(BASE + 3 * DAY, BASE + 3 * DAY)]
+        self.assertEqual(names, ["new"])
+        self.cal.delete_event(event_id)
+        self.assertEqual(self.cal.get_events_within_range(BASE + 3 * DAY, BASE + 3 * DAY), [])
+
+    def test_switched_off_keeps_nothing(self):
+        self.cal.set_snapshot(True)
+        self.cal.find_events_in_range_main_cal(BASE, BASE + 42 * DAY)
+        self.assertIsNotNone(self.cal.snapshot)
+        self.cal.set_snapshot(False)
+        self.assertIsNone(self.cal.snapshot)
+
+
+class TestCalendarDataAlerts(CalendarDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = time.time()
+
+    def test_writes_keep_alerts_in_step(self):
+        event_id = self.cal.add_data(alerting_frame("a", self.now + DAY, ["At time of event", "1 hour before"]))
+        self.assertEqual(self.cal.get_event_alerts(event_id), [
+            (self.now + DAY, event_id, 0, "a"),
+            (self.now + DAY - 3600, event_id, 60, "a"),
+        ])
+        self.cal.update_event(event_id, alerting_frame("a", self.now + 2 * DAY))
+        self.assertEqual(self.cal.get_event_alerts(event_id), [(self.now + 2 * DAY, event_id, 0, "a")])
+        self.cal.delete_event(event_id)
+        self.sql.execute("SELECT COUNT(*) FROM event_alerts;")
+        self.assertEqual(self.sql.fetchall()[0][0], 0)
+
+    def test_raw_writes_are_picked_up_by_refresh(self):
+        # the chat assistant writes SQL directly
+        self.sql.execute(
+            "INSERT INTO events (name, start_date, end_date, is_recurring, is_alerting, alerting_options) "
+            "VALUES ('raw', ?, ?, 0, 1, '[]');", (self.now + DAY, self.now + DAY + 60))
+        self.sql.commit()
+        self.assertEqual(self.cal.next_alerts(), [])
+        self.assertEqual(self.cal.refresh_alerts(self.now), 1)
+        self.assertEqual([row[3] for row in self.cal.next_alerts()], ["raw"])
+
+        self.sql.execute("UPDATE events SET is_alerting = 0;")
+        self.sql.commit()
+        self.cal.refresh_alerts(self.now)
+        self.assertEqual(self.cal.next_alerts(), [])
+
+    def test_next_alerts_pages_by_fire_time(self):
+        for i in range(5):
+            self.cal.add_data(alerting_frame(f"e{i}", self.now + (5 - i) * 3600))
+        first = self.cal.next_alerts(limit=3)
+        rest = self.cal.next_alerts(first[-1][:3], limit=3)
+        self.assertEqual([row[3] for row in first + rest], ["e4", "e3", "e2", "e1", "e0"])
+        self.assertQueryUsesIndex(SELECT_NEXT_ALERTS_QUERY, (0, 0, 0, 3), "idx_event_alerts_next_fire")
+
+    def test_advance_and_overdue(self):
+        event_id = self.cal.add_data(alerting_frame(
+            "daily", self.now + 60, isRecurringEvent=True, recurringEventOptionIndex=1,
+            recurringInterval=1, recurringEndOptionIndex=2, recurringEndCount=2,
+        ))
+        second = self.cal.advance_alert(event_id, 0, self.now + 60)
+        self.assertAlmostEqual(second, self.now + 60 + DAY, delta=3600)    # wall-clock day
+        self.assertIsNone(self.cal.advance_alert(event_id, 0, second))
+        self.assertEqual(self.cal.get_event_alerts(event_id), [])
+
+        once = self.cal.add_data(alerting_frame("once", self.now + 60))
+        # the app was down past its fire time
+        self.assertEqual(self.cal.refresh_alerts(self.now + 120), 1)
+        self.assertEqual(self.cal.get_event_alerts(once), [])
+
+
+class TestCalendarDataMonthCache(CalendarDataTestCase):
+
+    def test_repeat_lookup_hits_cache(self):
+        self.cal.add_data(make_frame("a", BASE + 60, BASE + 120))
+        first = self.cal.find_events_in_range_main_cal(BASE, BASE + 42 * DAY)
+        second = self.cal.find_events_in_range_main_cal(BASE, BASE + 42 * DAY)
+        self.assertIs(first, second)
+        self.assertEqual(self.cal.month_cache.stats()["hits"], 1)
+
+    def test_every_write_invalidates(self):
+        window = (BASE, BASE + 42 * DAY)
+        event_id = self.cal.add_data(make_frame("a", BASE + 60, BASE + 120))
+        self.assertEqual(len(self.cal.find_events_in_range_main_cal(*window)[0]), 1)
+
+        self.cal.add_many([make_frame("b", BASE + 90, BASE + 120)])
+        self.assertEqual(len(self.cal.find_events_in_range_main_cal(*window)[0]), 2)
+
+        self.cal.update_event(event_id, make_frame("a", BASE + DAY + 60, BASE + DAY + 120))
+        self.assertEqual(sorted(self.cal.find_events_in_range_main_cal(*window)), [0, 1])
+
+        self.cal.delete_event(event_id)
+        self.assertEqual(sorted(self.cal.find_events_in_range_main_cal(*window)), [0])
+
+    def test_result_computed_across_a_write_is_not_served(self):
+        window = (BASE, BASE + 42 * DAY)
+        version = self.cal.data_version
+        self.cal.add_data(make_frame("a", BASE + 60, BASE + 120))
+        self.cal.month_cache.put(("main_cal",) + window, version, {})   # raced with the write
+        self.assertEqual(list(self.cal.find_events_in_range_main_cal(*window)), [0])
+
+    def test_prefetch_warms_cache_off_thread(self):
+        self.cal.add_data(make_frame("a", BASE + 60, BASE + 120))
+        window = (BASE, BASE + 42 * DAY)
+        future = self.cal.prefetch_main_cal(*window)
+        self.assertIs(self.cal.prefetch_main_cal(*window) or future, future)
+        future.result(timeout=5)
+        self.assertTrue(self.cal.month_cache.contains(("main_cal",) + window, self.cal.data_version))
+        self.assertIsNone(self.cal.prefetch_main_cal(*window))
+
+        hits = self.cal.month_cache.stats()["hits"]
+        self.cal.find_events_in_range_main_cal(*window)
+        self.assertEqual(self.cal.month_cache.stats()["hits"], hits + 1)
+
+
+class TestCalendarDataAsync(AsyncCalendarTestCase):
+
+    async def test_write_then_read_on_the_executor(self):
+        event_id = await self.cal.add_data_async(make_frame("async", BASE, BASE + 600))
+        record = await self.cal.get_event_async(event_id)
+        self.assertEqual((record.eventName, record.eventStartDate), ("async", BASE))
+        # the executor threads read through their own connections
+        worker_conn = await self.cal.run_async(lambda: self.sql.conn)
+        self.assertIsNot(worker_conn, self.sql.conn)
+
+    async def test_concurrent_range_reads_agree(self):
+        for i in range(30):
+            self.cal.add_data(make_frame(f"e{i}", BASE + i * DAY / 2, BASE + i * DAY / 2 + 600))
+        self.cal.add_data(make_frame(
+            "weekly", BASE, BASE + 600,
+            isRecurringEvent=True, recurringEventOptionIndex=2, recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        ranges = [(BASE + k * DAY, BASE + k * DAY + 42 * DAY) for k in range(4)] * 3
+        expected = [self.cal.find_events_in_range_main_cal(lo, hi) for lo, hi in ranges]
+        self.assertTrue(all(expected))
+        self.cal.month_cache.clear()
+        results = await asyncio.gather(*(
+            self.cal.find_events_in_range_main_cal_async(lo, hi) for lo, hi in ranges
+        ))
+        self.assertEqual(list(results), expected)
+
+    async def test_concurrent_misses_share_one_query(self):
+        window = (BASE, BASE + 42 * DAY)
+        await self.cal.find_events_in_range_main_cal_async(*window)
+        self.cal.add_data(make_frame("a", BASE + 60, BASE + 120))   # every viewer now misses
+        queries = []
+        query = self.cal.get_events_within_range
+
+        def counted(*args):
+            queries.append(args)
+            return query(*args)
+        self.cal.get_events_within_range = counted
+
+        waiters = [asyncio.ensure_future(self.cal.find_events_in_range_main_cal_async(*window))
+                   for _ in range(6)]
+        waiters[0].cancel()   # one client leaving does not cancel the others' query
+        results = await asyncio.gather(*waiters[1:])
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(list(results[0]), [0])
+        self.assertEqual(self.cal._inflight, {})
+
+    async def test_errors_reach_the_awaiting_caller(self):
+        def broken():
+            self.sql.execute("SELECT * FROM no_such_table;")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.cal.run_async(broken)
+        # the executor is still usable afterwards
+        self.assertIsNone(await self.cal.get_event_async(12345))
@@ -0,0 +1,54 @@
+import unittest
+from dbmodule.changes import ChangeBus, EventChange
+from helpers import CalendarTestCase, make_frame
+
+
+class TestChangeBus(unittest.TestCase):
+
+    def test_publish_reaches_every_subscriber_until_unsubscribed(self):
+        bus = ChangeBus()
+        seen = []
+        first = bus.subscribe(lambda change: seen.append(("first", change.event_ids)))
+        bus.subscribe(lambda change: seen.append(("second", change.event_ids)))
+        bus.publish(EventChange(1, (7,)))
+        bus.unsubscribe(first)
+        bus.publish(EventChange(2, None))
+        self.assertEqual(seen, [("first", (7,)), ("second", (7,)), ("second", None)])
+
+    def test_failing_subscriber_does_not_stop_the_others(self):
+        bus = ChangeBus()
+        seen = []
+        bus.subscribe(lambda change: 1 / 0)
+        bus.subscribe(seen.append)
+        with self.assertLogs("dbmodule.changes", level="ERROR"):
+            bus.publish(EventChange(1, None))
+        self.assertEqual(len(seen), 1)
+
+    def test_bound_methods_unsubscribe(self):
+        bus = ChangeBus()
+        seen = []
+        bus.subscribe(seen.append)
+        bus.unsubscribe(seen.append)
+        self.assertEqual(len(bus), 0)
+
+
+class TestCalendarDataPublishes(CalendarTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.changes = []
+        self.cal.changes.subscribe(self.changes.append)
+
+    def test_writes_publish_the_ids_they_touched(self):
+        frame = make_frame("a", 1_700_000_000.0, 1_700_000_600.0)
+        event_id = self.cal.add_data(frame)
+        self.cal.update_event(event_id, frame)
+        self.cal.delete_event(event_id)
+        self.cal.add_many([frame, frame])
+        added = tuple(f.eventId for f in self.cal.get_all_data())
+        self.assertEqual(len(added), 2)
+        self.assertEqual([change.event_ids for change in self.changes],
+                         [(event_id,), (event_id,), (event_id,), added])
+        versions = [change.version for change in self.changes]
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(versions[-1], self.cal.data_version)
@@ -0,0 +1,173 @@
+import unittest
+from types import SimpleNamespace
+from nicegui import Client, ui
+from nicegui.page import page
+from app.components.event_list import (
+    EventCardList,
+    VIRTUAL_LIST_MIN_EVENTS,
+    VIRTUAL_OVERSCAN,
+    VIRTUAL_ROW_HEIGHT,
+)
+
+
+def make_events(count, first_id=0):
+    return [
+        {'id': i, 'title': f'event {i}', 'start_date': '2025-01-01', 'start': '9:00 AM', 'end': '10:00 AM'}
+        for i in range(first_id, first_id + count)
+    ]
+
+
+def height(element):
+    return int(element._style['height'].removesuffix('px'))
+
+
+class EventCardListTestCase(unittest.TestCase):
+    """Lists are built in a client of their own; no browser is involved."""
+
+    def setUp(self):
+        self.client = Client(page('/event-list-test'), request=None)
+        self.addCleanup(self.client.delete)
+        self.end_reached = 0
+
+    def make_list(self):
+        with self.client:
+            container = ui.element('div')
+        return EventCardList(container, on_edit=lambda evt: None, on_delete=lambda evt: None,
+                             on_end_reached=self.on_end_reached)
+
+    def on_end_reached(self):
+        self.end_reached += 1
+
+
+class TestEventCardListVirtual(EventCardListTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.list = self.make_list()
+
+    def scroll(self, position):
+        self.list._on_scroll(SimpleNamespace(args={'verticalPosition': position}))
+
+    def bound_ids(self):
+        return [card.evt['id'] if card.evt is not None else None for card in self.list.pool]
+
+    def assertWindow(self, first, total):
+        pool = len(self.list.pool)
+        self.assertEqual(self.list.first, first)
+        self.assertEqual(self.bound_ids(), list(range(first, first + pool)))
+        self.assertEqual(height(self.list.top_spacer), first * VIRTUAL_ROW_HEIGHT)
+        self.assertEqual(height(self.list.bottom_spacer), (total - first - pool) * VIRTUAL_ROW_HEIGHT)
+
+    def test_first_slice(self):
+        self.list.set_events(make_events(250))
+        self.assertEqual(self.list.mode, 'virtual')
+        self.assertWindow(0, 250)
+
+    def test_scroll_binds_the_window_with_overscan(self):
+        self.list.set_events(make_events(250))
+        self.scroll(20 * VIRTUAL_ROW_HEIGHT + 10)
+        self.assertWindow(20 - VIRTUAL_OVERSCAN, 250)
+        # within the overscan: same window, nothing re-bound
+        self.scroll(20 * VIRTUAL_ROW_HEIGHT + 100)
+        self.assertWindow(20 - VIRTUAL_OVERSCAN, 250)
+        self.assertEqual(self.end_reached, 0)
+
+    def test_last_slice_and_scroll_past_the_end(self):
+        self.list.set_events(make_events(250))
+        last_first = 250 - len(self.list.pool)
+        self.scroll((last_first + VIRTUAL_OVERSCAN) * VIRTUAL_ROW_HEIGHT)
+        self.assertWindow(last_first, 250)
+        self.assertEqual(self.end_reached, 1)
+
+        self.scroll(10 ** 7)
+        self.assertWindow(last_first, 250)
+        self.assertEqual(self.end_reached, 2)
+
+        self.scroll(0)
+        self.assertWindow(0, 250)
+
+    def test_pool_is_reused_when_the_list_shrinks(self):
+        self.list.set_events(make_events(250))
+        self.scroll(10 ** 7)
+        pool = list(self.list.pool)
+
+        events = make_events(120)
+        self.list.set_events(events)
+        self.assertEqual([id(card) for card in self.list.pool], [id(card) for card in pool])
+        self.assertWindow(120 - len(pool), 120)
+
+        # rows removed in place, then patched: the window is pulled back in range
+        del events[VIRTUAL_LIST_MIN_EVENTS + 5:]
+        self.list.patch_many([119])
+        self.assertEqual(self.list.pool, pool)
+        self.assertWindow(len(events) - len(pool), len(events))
+        self.assertTrue(all(card.card.parent_slot.parent.visible for card in pool))
+
+        # below the threshold the grid takes over and the pool is dropped
+        self.list.set_events(make_events(VIRTUAL_LIST_MIN_EVENTS - 1))
+        self.assertEqual(self.list.mode, 'grid')
+        self.assertEqual(self.list.pool, [])
+
+
+class TestEventCardListPatch(EventCardListTestCase):
+    """patch_many() must leave the grid exactly as a full re-render of the same list."""
+
+    def setUp(self):
+        super().setUp()
+        self.list = self.make_list()
+        self.events = make_events(8)
+        self.list.set_events(self.events)
+
+    def cards(self, card_list):
+        by_element = {card.card.id: card for cards in card_list.cards_by_id.values() for card in cards}
+        return [by_element[element.id] for element in card_list.grid.default_slot.children]
+
+    def shown(self, card_list):
+        return [(card.evt['id'], card.title.text, card.badge.text, card.times.text, card.recurring.text)
+                for card in self.cards(card_list)]
+
+    def assertPatched(self, event_ids):
+        kept = {id(card): card.evt['id'] for card in self.cards(self.list) if card.evt['id'] not in event_ids}
+        self.list.patch_many(event_ids)
+        fresh = self.make_list()
+        fresh.set_events(list(self.events))
+        self.assertEqual(self.shown(self.list), self.shown(fresh))
+        # cards of the other events are the same elements, not rebuilt ones
+        self.assertEqual(
+            {id(card): card.evt['id'] for card in self.cards(self.list) if id(card) in kept}, kept)
+        self.assertEqual(len(kept), len([e for e in self.events if e['id'] not in event_ids]))
+
+    def test_insert(self):
+        self.events.insert(3, {**make_events(1, first_id=100)[0], 'start_date': '2025-01-02'})
+        self.assertPatched({100})
+
+    def test_update_in_place_keeps_the_card(self):
+        card = self.cards(self.list)[4]
+        self.events[4] = {**self.events[4], 'title': 'renamed', 'recurring': 'Weekly'}
+        self.assertPatched({4})
+        self.assertIs(self.cards(self.list)[4], card)
+
+    def test_delete(self):
+        del self.events[1]
+        self.assertPatched({1})
+        self.assertNotIn(1, self.list.cards_by_id)
+
+    def test_reorder(self):
+        moved = self.events.pop(0)
+        self.events.insert(5, {**moved, 'start_date': '2025-01-05'})
+        self.assertPatched({0})
+
+    def test_occurrence_rows_come_and_go_in_one_patch(self):
+        series = {'id': 50, 'title': 'standup', 'start': '9:00 AM', 'end': '9:15 AM', 'recurring': 'Daily'}
+        for index, day in ((1, 2), (4, 3), (7, 4)):
+            self.events.insert(index, {**series, 'start_date': f'2025-01-0{day}'})
+        self.list.set_events(self.events)
+
+        # one repeat dropped, one moved, event 6 deleted and a new event added
+        self.events[:] = [e for e in self.events if not (e['id'] == 50 and e['start_date'] == '2025-01-03')]
+        self.events[:] = [e for e in self.events if e['id'] != 6]
+        first = next(i for i, e in enumerate(self.events) if e['id'] == 50)
+        self.events.append({**self.events.pop(first), 'start_date': '2025-01-09'})
+        self.events.insert(0, make_events(1, first_id=200)[0])
+        self.assertPatched({50, 6, 200})
+        self.assertEqual(len(self.list.cards_by_id[50]), 2)
@@ -0,0 +1,64 @@
+import unittest
+from datetime import date
+from app.components.event_search import (
+    EventSearchIndex,
+    normalize,
+    parse_search_date,
+    parse_search_month,
+)
+
+
+def make_event(title, start_date, start='9:00 AM', recurring=None):
+    return {'title': title, 'start_date': start_date, 'start': start, 'end': '10:00 AM', 'recurring': recurring}
+
+
+class TestEventSearchParsing(unittest.TestCase):
+
+    def test_month_names(self):
+        self.assertEqual(parse_search_month('Nov'), 11)
+        self.assertEqual(parse_search_month('november'), 11)
+        self.assertIsNone(parse_search_month('novem'))
+
+    def test_dates(self):
+        self.assertEqual(parse_search_date('2025-01-08'), date(2025, 1, 8))
+        self.assertEqual(parse_search_date('8 Jan 2025'), date(2025, 1, 8))
+        self.assertEqual(parse_search_date('Jan 8'), date(date.today().year, 1, 8))
+        self.assertIsNone(parse_search_date('meeting'))
+
+    def test_normalize_ignores_case_and_accents(self):
+        self.assertEqual(normalize('  Café   MEETING '), 'cafe meeting')
+
+
+class TestEventSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.events = [
+            make_event('Team meeting', '2025-11-03'),
+            make_event('Meet & greet', '2025-12-08', recurring='Weekly'),
+            make_event('Café meetup', '2025-11-24', start='1:00 PM'),
+            make_event('Dentist', '2026-01-08'),
+        ]
+        self.index = EventSearchIndex(self.events, version=1)
+
+    def titles(self, query):
+        return [e['title'] for e in self.index.search(query)]
+
+    def test_substring_over_title_dates_times_and_recurrence(self):
+        self.assertEqual(self.titles('meet'), ['Team meeting', 'Meet & greet', 'Café meetup'])
+        self.assertEqual(self.titles('weekly'), ['Meet & greet'])
+        self.assertEqual(self.titles('1:00 pm'), ['Café meetup'])
+        self.assertEqual(self.titles('cafe'), ['Café meetup'])
+
+    def test_month_and_date_buckets(self):
+        self.assertEqual(self.titles('nov'), ['Team meeting', 'Café meetup'])
+        self.assertEqual(self.titles('2026-01-08'), ['Dentist'])
+
+    def test_longer_query_only_rescans_previous_hits(self):
+        self.titles('meet')
+        self.index._haystacks[3] = 'meeting that must not be rescanned'
+        self.assertEqual(self.titles('meeti'), ['Team meeting'])
+        # a query that doesn't extend the last one starts over
+        self.assertEqual(self.titles('eeting'), ['Team meeting', 'Dentist'])
+
+    def test_empty_query_returns_everything(self):
+        self.assertEqual(len(self.index.search('  ')), 4)
@@ -0,0 +1,69 @@
+from dbmodule import migrations
+from helpers import DatabaseTestCase
+
+
+class TestMigrations(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.saved_steps = list(migrations.MIGRATIONS)
+
+    def tearDown(self):
+        migrations.MIGRATIONS[:] = self.saved_steps
+
+    def test_fresh_database_reaches_latest_version(self):
+        latest = max(m.version for m in migrations.MIGRATIONS)
+        self.assertEqual(migrations.run_migrations(self.sql), latest)
+        # second boot is a no-op
+        self.assertEqual(migrations.run_migrations(self.sql), latest)
+
+    def test_legacy_table_keeps_rows(self):
+        conn = self.sql.conn
+        conn.execute(
+            "CREATE TABLE events (name TEXT, start_date REAL NOT NULL, end_date REAL NOT NULL,"
+            "description TEXT, is_recurring BOOLEAN, is_alerting BOOLEAN, recurring_option INT,"
+            "alerting_options TEXT, recurring_interval INT, recurring_end_options INT DEFAULT 0,"
+            "recurring_end_date REAL, recurring_end_count INT, PRIMARY KEY (start_date, end_date));"
+        )
+        conn.execute("INSERT INTO events (name, start_date, end_date) VALUES ('kept', 1, 2);")
+        conn.commit()
+
+        migrations.run_migrations(self.sql)
+        self.assertEqual(conn.execute("SELECT id, name FROM events;").fetchall(), [(1, "kept")])
+        # existing rows wait for CalendarData to compute their alerts
+        self.assertEqual(conn.execute("SELECT alerts_pending FROM events;").fetchall(), [(1,)])
+
+    def test_failed_step_rolls_back_and_is_not_recorded(self):
+        migrations.run_migrations(self.sql)
+        version = migrations.current_version(self.sql.conn)
+
+        def broken(conn):
+            conn.execute("CREATE TABLE half_done (x INT);")
+            raise RuntimeError("boom")
+
+        migrations.migration(version + 1, "broken step")(broken)
+        with self.assertRaises(RuntimeError):
+            migrations.run_migrations(self.sql)
+
+        self.assertEqual(migrations.current_version(self.sql.conn), version)
+        tables = self.sql.conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'half_done';"
+        ).fetchall()
+        self.assertEqual(tables, [])
+
+    def test_rebuild_table_copies_rows(self):
+        conn = self.sql.conn
+        conn.execute("CREATE TABLE t (a INT, b TEXT);")
+        conn.executemany("INSERT INTO t VALUES (?, ?);", [(i, str(i)) for i in range(7)])
+        conn.commit()
+
+        with self.sql.transaction() as conn:
+            migrations.rebuild_table(
+                conn, "t", "CREATE TABLE {table} (a INT PRIMARY KEY, b TEXT NOT NULL);",
+                ["a", "b"],
+            )
+
+        rows = conn.execute("SELECT a, b FROM t ORDER BY a;").fetchall()
+        self.assertEqual(rows, [(i, str(i)) for i in range(7)])
+        pk = [col[1] for col in conn.execute("PRAGMA table_info(t);") if col[5]]
+        self.assertEqual(pk, ["a"])
@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime
+from dbmodule.record import EventRecord, recurring_label
+from helpers import CalendarTestCase, make_frame
+
+
+def make_row(start, option=0, interval=0, alerts='["15 minutes before"]', end_date=None, end_count=None):
+    # an events row: fields at the positions in dbmodule.schema
+    return ("Lab meeting", start, start + 5400, "room 2", int(option > 0), 1, option, alerts,
+            interval, 0, end_date, end_count, 7)
+
+
+class TestEventRecord(unittest.TestCase):
+
+    def test_reads_like_a_frame(self):
+        start = datetime(2025, 3, 4, 9, 5).timestamp()
+        record = EventRecord(make_row(start))
+        self.assertEqual(
+            (record.eventId, record.eventName, record.eventStartDate, record.eventDescription),
+            (7, "Lab meeting", start, "room 2"),
+        )
+        self.assertEqual(record.selectedAlertCheckboxes, ["15 minutes before"])
+
+    def test_reads_like_an_event_dict(self):
+        record = EventRecord(make_row(datetime(2025, 3, 4, 9, 5).timestamp(), option=2, interval=3))
+        self.assertEqual(
+            (record['start_date'], record['start'], record['end_date'], record['end']),
+            ("2025-03-04", "9:05 AM", "2025-03-04", "10:35 AM"),
+        )
+        self.assertEqual(record.get('recurring'), "Every 3 weeks")
+        self.assertEqual(record.get('missing', 'x'), 'x')
+        self.assertEqual(set(record.as_dict()), set(record.keys()))
+
+    def test_formats_once(self):
+        record = EventRecord(make_row(datetime(2025, 3, 4, 13, 0).timestamp()))
+        first = record['start_date']
+        self.assertIs(record['start_date'], first)
+        self.assertEqual(record['start'], "1:00 PM")
+
+    def test_bad_alert_json_is_empty(self):
+        record = EventRecord(make_row(0, alerts="not json"))
+        self.assertEqual(record['reminders'], [])
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(EventRecord(make_row(0)), "__dict__"))
+
+    def test_recurring_labels(self):
+        self.assertIsNone(recurring_label(0, 1))
+        self.assertEqual(recurring_label(1, 0), "Daily")
+        self.assertEqual(recurring_label(4, 2), "Every 2 years")
+        self.assertIsNone(recurring_label(9, 1))
+
+
+class TestEventRecordRowFactory(CalendarTestCase):
+
+    def test_reads_return_records_and_other_queries_plain_rows(self):
+        event_id = self.cal.add_data(make_frame("standup", 1_700_000_000.0, 1_700_000_600.0))
+
+        record = self.cal.get_event(event_id)
+        self.assertIsInstance(record, EventRecord)
+        self.assertEqual((record['id'], record['title']), (event_id, "standup"))
+
+        # the shared cursor doesn't keep the factory for later statements
+        self.sql.execute("SELECT COUNT(*) FROM events;")
+        self.assertEqual(self.sql.fetchall(), [(1,)])
@@ -0,0 +1,153 @@
+import os
+import random
+import time
+import unittest
+from datetime import datetime
+from dbmodule import recurrence
+from dbmodule.recurrence import DAILY, WEEKLY, MONTHLY, YEARLY, END_NEVER, END_ON_DATE, END_AFTER_COUNT
+
+
+def make_row(start, option, interval=1, end_option=END_NEVER, end_date=None, end_count=None, length=3600):
+    # an events row: fields at the positions in dbmodule.schema
+    return ("e", start, start + length, "", 1, 0, option, "[]", interval,
+            end_option, end_date, end_count, 1)
+
+
+def ts(*args):
+    return datetime(*args).timestamp()
+
+
+def local_starts(starts):
+    return [datetime.fromtimestamp(s) for s in starts]
+
+
+class LocalTimezoneTestCase(unittest.TestCase):
+    """Pins the local timezone (recurrence steps in wall-clock time)."""
+    TZ = "UTC"
+
+    def setUp(self):
+        self._old_tz = os.environ.get("TZ")
+        os.environ["TZ"] = self.TZ
+        time.tzset()
+
+    def tearDown(self):
+        if self._old_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._old_tz
+        time.tzset()
+
+
+class TestRecurrenceCalendarArithmetic(LocalTimezoneTestCase):
+
+    def test_monthly_clamps_to_month_end(self):
+        row = make_row(ts(2024, 1, 31, 9), MONTHLY)
+        starts = recurrence.occurrence_starts(row, ts(2024, 1, 1), ts(2024, 5, 1))
+        self.assertEqual(
+            [(d.month, d.day) for d in local_starts(starts)],
+            [(2, 29), (3, 31), (4, 30)],
+        )
+
+    def test_yearly_leap_day(self):
+        row = make_row(ts(2024, 2, 29, 12), YEARLY)
+        starts = recurrence.occurrence_starts(row, ts(2025, 1, 1), ts(2029, 1, 1))
+        self.assertEqual(
+            [d.date().isoformat() for d in local_starts(starts)],
+            ["2025-02-28", "2026-02-28", "2027-02-28", "2028-02-29"],
+        )
+
+    def test_end_count_includes_first_occurrence(self):
+        row = make_row(ts(2024, 3, 4, 10), WEEKLY, end_option=END_AFTER_COUNT, end_count=3)
+        starts = recurrence.occurrence_starts(row, 0, ts(2030, 1, 1))
+        self.assertEqual([d.day for d in local_starts(starts)], [11, 18])
+
+    def test_end_date_includes_that_day(self):
+        row = make_row(ts(2024, 3, 4, 10), DAILY, interval=2, end_option=END_ON_DATE, end_date=ts(2024, 3, 10))
+        starts = recurrence.occurrence_starts(row, 0, ts(2030, 1, 1))
+        self.assertEqual([d.day for d in local_starts(starts)], [6, 8, 10])
+
+    def test_jumps_straight_to_window(self):
+        first = ts(2021, 1, 1, 8, 30)
+        row = make_row(first, DAILY, interval=3)
+        lo, hi = ts(2024, 6, 1), ts(2024, 7, 1)
+        brute = [s for s in recurrence.occurrence_starts(row, first, hi) if s >= lo]
+        self.assertEqual(recurrence.occurrence_starts(row, lo, hi), brute)
+        self.assertEqual(len(brute), 10)
+
+    def test_window_edges_are_inclusive(self):
+        row = make_row(ts(2024, 1, 1, 9), WEEKLY)
+        edge = ts(2024, 1, 15, 9)
+        self.assertEqual(recurrence.occurrence_starts(row, edge, edge), [edge])
+
+    def test_unknown_option_has_no_repeats(self):
+        self.assertEqual(recurrence.occurrence_starts(make_row(ts(2024, 1, 1), None), 0, ts(2030, 1, 1)), [])
+
+
+class TestRecurrenceDaylightSaving(LocalTimezoneTestCase):
+    TZ = "America/Vancouver"
+
+    def test_weekly_keeps_wall_clock_time_across_dst(self):
+        # DST starts 2024-03-10 in Vancouver
+        row = make_row(ts(2024, 3, 4, 9), WEEKLY)
+        starts = recurrence.occurrence_starts(row, 0, ts(2024, 3, 20))
+        self.assertEqual([(d.day, d.hour) for d in local_starts(starts)], [(11, 9), (18, 9)])
+        self.assertEqual(starts[1] - starts[0], 7 * 86400)
+        self.assertEqual(starts[0] - row[1], 7 * 86400 - 3600)
+
+
+class TestRecurrenceBatch(LocalTimezoneTestCase):
+    TZ = "America/Vancouver"
+
+    def make_rows(self):
+        rnd = random.Random(7)
+        rows = []
+        for i in range(60):
+            # 2:30 falls in the spring-forward gap, 1:30 in the repeated fall-back hour
+            start = ts(rnd.randint(2015, 2030), rnd.randint(1, 12), rnd.randint(1, 28), rnd.choice([1, 2, 9, 23]), 30)
+            start += rnd.choice([0, 3600, 0.5])
+            end_option = rnd.choice([END_NEVER, END_ON_DATE, END_AFTER_COUNT])
+            rows.append(make_row(
+                start, rnd.choice([DAILY, WEEKLY, MONTHLY, YEARLY, None]), interval=rnd.choice([None, 1, 2, 5]),
+                end_option=end_option,
+                end_date=start + rnd.randint(0, 3000) * 86400 if end_option == END_ON_DATE else None,
+                end_count=rnd.randint(0, 30) if end_option == END_AFTER_COUNT else None,
+            ))
+        rows.append(make_row(ts(2024, 1, 31, 9), MONTHLY))
+        rows.append(make_row(ts(2024, 2, 29, 12), YEARLY))
+        return rows
+
+    def one_by_one(self, rows, lo, hi):
+        los = lo if isinstance(lo, list) else [lo] * len(rows)
+        positions, starts = [], []
+        for position, (row, row_lo) in enumerate(zip(rows, los)):
+            row_starts = recurrence.occurrence_starts(row, row_lo, hi)
+            positions.extend([position] * len(row_starts))
+            starts.extend(row_starts)
+        return positions, starts
+
+    def assertBatchMatches(self):
+        rows = self.make_rows()
+        windows = [(0, ts(2035, 1, 1)), (ts(2024, 3, 1), ts(2024, 11, 30)), (ts(2090, 1, 1), ts(2091, 1, 1))]
+        for lo, hi in windows:
+            for row_lo in (lo, [lo + i * 86400 for i in range(len(rows))]):
+                expected = self.one_by_one(rows, row_lo, hi)
+                self.assertEqual(recurrence.occurrence_starts_many(rows, row_lo, hi), expected)
+                self.assertTrue(expected[1])
+
+    @unittest.skipIf(recurrence.np is None, "NumPy not installed")
+    def test_vectorized_matches_one_by_one(self):
+        self.assertBatchMatches()
+
+    def test_without_numpy_matches_one_by_one(self):
+        np, recurrence.np = recurrence.np, None
+        try:
+            self.assertBatchMatches()
+        finally:
+            recurrence.np = np
+
+    def test_expand_rows_keeps_duration(self):
+        rows = [make_row(ts(2024, 1, 1, 9) + i * 60, DAILY, length=900) for i in range(20)]
+        expanded = recurrence.expand_rows(rows, ts(2024, 1, 2), ts(2024, 1, 3, 23))
+        self.assertEqual(len(expanded), 40)
+        self.assertTrue(all(item[2] - item[1] == 900 for item in expanded))
+        self.assertEqual(expanded[0], recurrence.expand_row(rows[0], ts(2024, 1, 2), ts(2024, 1, 3, 23))[0])
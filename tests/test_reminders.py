@@ -0,0 +1,119 @@
+import asyncio
+import time
+import unittest
+from app.reminders import ReminderScheduler
+from dbmodule.alerts import alert_rows, next_fire_at, reminder_minutes
+from helpers import AsyncCalendarTestCase, alerting_frame
+
+
+class TestReminderMinutes(unittest.TestCase):
+
+    def test_labels_and_add_edit_indexes(self):
+        self.assertEqual(reminder_minutes(True, ["1 hour before", "5 minutes before"]), [5, 60])
+        self.assertEqual(reminder_minutes(True, [1, 3]), [15, 1440])
+
+    def test_alerting_without_picks_fires_at_start(self):
+        self.assertEqual(reminder_minutes(True, []), [0])
+        self.assertEqual(reminder_minutes(False, ["1 hour before"]), [])
+
+    def test_alert_rows_of_one_off_event(self):
+        row = ("a", 10_000.0, 10_600.0, "", 0, 1, 0, '["At time of event", "2 hours before"]', 0, 0, None, None, 1)
+        self.assertEqual(alert_rows(row, 0), [(1, 0, 10_000.0), (1, 120, 2_800.0)])
+        # the 2 hour reminder has passed, the other is still ahead
+        self.assertEqual(alert_rows(row, 5_000), [(1, 0, 10_000.0), (1, 120, None)])
+        self.assertEqual(alert_rows(row[:5] + (0,) + row[6:], 0), [])
+
+    def test_next_fire_at_steps_through_repeats(self):
+        # daily, three occurrences in total
+        row = ("a", 100_000.0, 100_600.0, "", 1, 1, 1, "[]", 1, 2, None, 3, 1)
+        self.assertEqual(next_fire_at(row, 15, 0), 100_000.0 - 900)
+        second = next_fire_at(row, 15, 100_000.0 - 900)
+        self.assertEqual(second - (100_000.0 - 900), 86400)
+        third = next_fire_at(row, 15, second)
+        self.assertEqual(third - second, 86400)
+        self.assertIsNone(next_fire_at(row, 15, third))
+
+
+class TestReminderScheduler(AsyncCalendarTestCase):
+
+    async def asyncSetUp(self):
+        self.delivered = []
+        self.scheduler = ReminderScheduler(
+            self.cal, lambda name, start, minutes: self.delivered.append(name),
+        )
+
+    async def asyncTearDown(self):
+        await self.scheduler.stop()
+
+    async def test_fires_loaded_reminders_at_their_time(self):
+        now = time.time()
+        self.cal.add_data(alerting_frame("soon", now + 0.2))
+        self.cal.add_data(alerting_frame("later", now + 30))
+        self.cal.add_data(alerting_frame("quiet", now + 0.2, isAlerting=False))
+        self.scheduler.start()
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.delivered, ["soon"])
+        self.assertEqual(self.scheduler.stats()["pending"], 1)
+
+    async def test_writes_update_the_heap(self):
+        self.scheduler.start()
+        await asyncio.sleep(0.05)
+        now = time.time()
+        moved = await self.cal.add_data_async(alerting_frame("moved", now + 0.3))
+        deleted = await self.cal.add_data_async(alerting_frame("deleted", now + 0.3))
+        await self.cal.add_data_async(alerting_frame("added", now + 0.3))
+        await self.cal.update_event_async(moved, alerting_frame("moved", now + 40))
+        await self.cal.delete_event_async(deleted)
+        await asyncio.sleep(0.6)
+        self.assertEqual(self.delivered, ["added"])
+        self.assertEqual(self.scheduler.stats()["pending"], 1)
+
+    async def test_next_page_is_loaded_when_reached(self):
+        self.scheduler.page_size = 1
+        now = time.time()
+        self.cal.add_data(alerting_frame("first", now + 0.2))
+        self.cal.add_data(alerting_frame("second", now + 0.4))
+        self.scheduler.start()
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.scheduler.stats()["pending"], 1)
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.delivered, ["first", "second"])
+
+    async def test_recurring_alert_advances_to_next_repeat(self):
+        start = time.time() + 0.2 - 86400
+        event_id = self.cal.add_data(alerting_frame(
+            "daily", start, isRecurringEvent=True, recurringEventOptionIndex=1,
+            recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        self.scheduler.start()
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.delivered, ["daily"])
+        # the table now holds tomorrow's fire time, and so does the heap
+        [(fire_at, _, minutes, _)] = self.cal.get_event_alerts(event_id)
+        self.assertAlmostEqual(fire_at, start + 2 * 86400, delta=3600)
+        self.assertEqual(self.scheduler.stats()["pending"], 1)
+
+    async def test_restart_skips_reminders_missed_while_down(self):
+        now = time.time()
+        event_id = self.cal.add_data(alerting_frame(
+            "daily", now + 0.1, isRecurringEvent=True, recurringEventOptionIndex=1,
+            recurringInterval=1, recurringEndOptionIndex=0,
+        ))
+        await asyncio.sleep(0.2)
+        self.scheduler.start()
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.delivered, [])
+        [(fire_at, _, _, _)] = self.cal.get_event_alerts(event_id)
+        self.assertGreater(fire_at, now + 3600)
+
+    async def test_raw_write_announced_by_id_fires(self):
+        # the chat assistant inserts with SQL and publishes the new id
+        self.scheduler.start()
+        await asyncio.sleep(0.05)
+        cursor = self.sql.conn.execute(
+            "INSERT INTO events (name, start_date, end_date, is_recurring, is_alerting) "
+            "VALUES ('raw', ?, ?, 0, 1);", (time.time() + 0.2, time.time() + 600))
+        self.sql.conn.commit()
+        self.cal.mark_changed([cursor.lastrowid])
+        await asyncio.sleep(0.5)
+        self.assertEqual(self.delivered, ["raw"])
@@ -0,0 +1,119 @@
+import threading
+from helpers import DatabaseTestCase
+
+class TestSqlConnections(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.sql.execute("CREATE TABLE t (x INTEGER);")
+        self.sql.commit()
+
+    def test_wal_mode_enabled(self):
+        mode = self.sql.conn.execute("PRAGMA journal_mode;").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_each_thread_gets_its_own_connection(self):
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(self.sql.conn))
+        worker.start()
+        worker.join()
+        self.assertIsNot(seen[0], self.sql.conn)
+        self.assertIs(self.sql.conn, self.sql.conn)
+
+    def test_reader_not_blocked_by_open_write(self):
+        self.sql.conn.execute("INSERT INTO t VALUES (1);")   # uncommitted write
+        rows = []
+
+        def reader():
+            self.sql.execute("SELECT COUNT(*) FROM t;")
+            rows.extend(self.sql.fetchall())
+
+        worker = threading.Thread(target=reader)
+        worker.start()
+        worker.join(timeout=2)
+        self.assertEqual(rows, [(0,)])
+        self.sql.commit()
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.sql.transaction() as conn:
+                conn.execute("INSERT INTO t VALUES (1);")
+                raise RuntimeError("boom")
+        self.sql.execute("SELECT COUNT(*) FROM t;")
+        self.assertEqual(self.sql.fetchall(), [(0,)])
+
+    def committed_count(self):
+        # read from another thread's connection: sees committed rows only
+        rows = []
+        worker = threading.Thread(target=lambda: rows.extend(
+            self.sql.conn.execute("SELECT COUNT(*) FROM t;").fetchall()))
+        worker.start()
+        worker.join(timeout=2)
+        return rows[0][0]
+
+    def test_nested_transaction_leaves_commit_to_outer(self):
+        with self.sql.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (1);")
+            with self.sql.transaction() as inner:
+                inner.execute("INSERT INTO t VALUES (2);")
+            self.assertTrue(conn.in_transaction)
+            self.assertEqual(self.committed_count(), 0)
+            with self.assertRaises(RuntimeError):
+                with self.sql.transaction() as inner:
+                    inner.execute("INSERT INTO t VALUES (3);")
+                    raise RuntimeError("boom")
+            # only the failed inner block was undone
+            self.assertTrue(conn.in_transaction)
+        self.sql.execute("SELECT x FROM t ORDER BY x;")
+        self.assertEqual(self.sql.fetchall(), [(1,), (2,)])
+        self.assertEqual(self.committed_count(), 2)
+
+    def test_pending_bare_write_is_committed_not_nested(self):
+        self.sql.execute("INSERT INTO t VALUES (1);")     # opens an implicit transaction
+        with self.assertRaises(RuntimeError):
+            with self.sql.transaction() as conn:
+                conn.execute("INSERT INTO t VALUES (2);")
+                raise RuntimeError("boom")
+        self.assertEqual(self.committed_count(), 1)
+        with self.sql.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (3);")
+        self.assertEqual(self.committed_count(), 2)
+
+    def test_outer_rollback_undoes_nested_block(self):
+        with self.assertRaises(RuntimeError):
+            with self.sql.transaction():
+                with self.sql.transaction() as inner:
+                    inner.execute("INSERT INTO t VALUES (1);")
+                raise RuntimeError("boom")
+        self.assertEqual(self.committed_count(), 0)
+
+
+class TestSqlMetrics(DatabaseTestCase):
+    sql_options = {"slow_query_ms": 10_000}
+
+    def setUp(self):
+        super().setUp()
+        self.sql.execute("CREATE TABLE t (x INTEGER);")
+        self.sql.executemany("INSERT INTO t VALUES (?);", [(i,) for i in range(5)])
+        self.sql.commit()
+
+    def test_select_records_fetched_rows_and_call_site(self):
+        self.sql.execute("SELECT x FROM t WHERE x < ?;", (3,))
+        self.sql.fetchall()
+        stats = self.sql.metrics.statement("SELECT x FROM t WHERE x < ?;")
+        self.assertEqual(stats["count"], 1)
+        self.assertEqual(stats["rows"], 3)
+        (site,) = stats["call_sites"]
+        self.assertIn("test_sql.py", site)
+        self.assertIn("test_select_records_fetched_rows_and_call_site", site)
+
+    def test_write_records_rowcount(self):
+        stats = self.sql.metrics.statement("INSERT INTO t VALUES (?);")
+        self.assertEqual(stats["rows"], 5)
+
+    def test_slow_queries_are_counted_and_logged(self):
+        self.sql.metrics.slow_query_ms = 0
+        with self.assertLogs("dbmodule.sql", level="WARNING") as logs:
+            self.sql.execute("DELETE FROM t;")
+        self.assertIn("slow query", logs.output[0])
+        self.assertEqual(self.sql.metrics.snapshot()["slow_queries"], 1)